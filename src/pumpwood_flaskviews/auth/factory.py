@@ -5,7 +5,7 @@ import time
 import requests
 import urllib.parse
 from loguru import logger
-from flask import g
+from flask import g, has_request_context
 from flask import request as flask_request
 from pumpwood_communication import exceptions
 from pumpwood_communication.cache import default_cache
@@ -33,6 +33,11 @@ class AuthFactory:
     """Url that will be used to check if user is logged and if it has the right
        permissions"""
     dummy_auth = False
+    ACCESS_SCOPE_G_ATTRIBUTE: str = 'pumpwood_access_scope'
+    """Attribute of `g` used to cache the access scope on the request."""
+    AUTH_HEADER_G_ATTRIBUTE: str = 'pumpwood_auth_header'
+    """Attribute of `g` with the authorization header used outside of a
+       request context, e.g. by background jobs."""
 
     @classmethod
     def _get_authenticated_user(cls, auth_header: dict) -> dict:
@@ -351,13 +356,59 @@ class AuthFactory:
     def get_auth_header(cls) -> dict:
         """Extract the authorization header from the current Flask request.
 
+        Outside of a request context, the header set on `g` attribute
+        `AUTH_HEADER_G_ATTRIBUTE` is returned.
+
         Returns:
             dict:
                 A dictionary containing the 'Authorization' header.
         """
-        token = flask_request.headers.get('Authorization', None)
+        if has_request_context():
+            token = flask_request.headers.get('Authorization', None)
+        else:
+            auth_header = getattr(g, cls.AUTH_HEADER_G_ATTRIBUTE, {})
+            token = auth_header.get('Authorization', None)
         return copy.deepcopy({'Authorization': token})
 
+    @classmethod
+    def get_access_scope(cls, user_scoped: bool = False) -> dict:
+        """Return the access scope of the authenticated user.
+
+        Access scope is composed of superuser flag and sorted row
+        permission ids. Users with the same scope have access to the same
+        rows of models filtered only by row permission, so it can be used
+        on cache keys to share cached data among them. The scope is cached
+        on `g` for the request.
+
+        Args:
+            user_scoped (bool):
+                Add the user pk to the scope. Must be set when the rows
+                visible to the user may depend on more than its row
+                permissions, e.g. remote models with unknown base query.
+
+        Returns:
+            dict:
+                Dictionary with `is_superuser` and `row_permission_set`
+                keys, and `user_pk` if `user_scoped` is True.
+        """
+        access_scope = getattr(g, cls.ACCESS_SCOPE_G_ATTRIBUTE, None)
+        if access_scope is None:
+            user_info = cls.retrieve_authenticated_user()
+            row_permission_set = sorted(
+                x['pk'] for x in user_info.get('all_row_permisson_set', []))
+            access_scope = {
+                'is_superuser': user_info.get('is_superuser', False),
+                'row_permission_set': row_permission_set,
+                'user_pk': user_info.get('pk')}
+            setattr(g, cls.ACCESS_SCOPE_G_ATTRIBUTE, access_scope)
+
+        scope = {
+            'is_superuser': access_scope['is_superuser'],
+            'row_permission_set': list(access_scope['row_permission_set'])}
+        if user_scoped:
+            scope['user_pk'] = access_scope['user_pk']
+        return scope
+
     @classmethod
     def user_has_row_permission(cls, row_permission_id: int,
                                 raise_error: bool = True) -> bool:
@@ -1,7 +1,8 @@
 """Module to use g object to set cache in request."""
 from .cache import PumpwoodFlaskGCache, PumpwoodFlaskGDiskCache
+from .result import PumpwoodResultCache
 
 
 __all__ = [
-    PumpwoodFlaskGCache, PumpwoodFlaskGDiskCache
+    PumpwoodFlaskGCache, PumpwoodFlaskGDiskCache, PumpwoodResultCache
 ]
@@ -94,6 +94,49 @@ class PumpwoodFlaskGCache:
         cache_dict[hash_str] = value
         return True
 
+    @classmethod
+    def get_many(cls, hash_dicts: list[dict],
+                 copy_value: bool = False) -> list[Any]:
+        """Retrieve many values from the request-scoped cache.
+
+        Args:
+            hash_dicts (list[dict]):
+                Dictionaries representing the cache keys.
+            copy_value (bool):
+                If True, returns deepcopies of the cached data.
+
+        Returns:
+            list[Any]:
+                Cached values in the order of `hash_dicts`, None for keys
+                not found.
+        """
+        cache_dict = cls.get_cache_dict()
+        values = [
+            cache_dict.get(cls.generate_hash(hash_dict=hash_dict))
+            for hash_dict in hash_dicts]
+        if copy_value:
+            return copy.deepcopy(values)
+        return values
+
+    @classmethod
+    def set_many(cls, hash_dicts: list[dict], values: list[Any]) -> bool:
+        """Store many values in the request-scoped cache.
+
+        Args:
+            hash_dicts (list[dict]):
+                Dictionaries representing the cache keys.
+            values (list[Any]):
+                Values to be cached in the order of `hash_dicts`.
+
+        Returns:
+            bool:
+                Always returns True.
+        """
+        cache_dict = cls.get_cache_dict()
+        for hash_dict, value in zip(hash_dicts, values):
+            cache_dict[cls.generate_hash(hash_dict=hash_dict)] = value
+        return True
+
 
 class PumpwoodFlaskGDiskCache:
     """A dual-layer cache leveraging both `g` (RAM) and `DiskCache`.
@@ -161,3 +204,76 @@ class PumpwoodFlaskGDiskCache:
                 hash_dict=hash_dict, value=value, expire=expire,
                 tag_dict=tag_dict)
         return True
+
+    @classmethod
+    def get_many(cls, hash_dicts: list[dict],
+                 copy_value: bool = False) -> list[Any]:
+        """Retrieve many values from the multi-layer cache.
+
+        All keys are checked on the request-scoped `g` object first, only
+        the missing keys are queried on DiskCache and the values found
+        are set on `g` object. DiskCache is queried one key at a time
+        using the public `default_cache.get`, since pumpwood_communication
+        does not implement a batch API.
+
+        Args:
+            hash_dicts (list[dict]):
+                Dictionaries representing the cache keys.
+            copy_value (bool):
+                If True, returns deepcopies of the values cached on `g`.
+
+        Returns:
+            list[Any]:
+                Cached values in the order of `hash_dicts`, None for keys
+                missing from both layers.
+        """
+        values = PumpwoodFlaskGCache.get_many(
+            hash_dicts=hash_dicts, copy_value=copy_value)
+        found_hash_dicts = []
+        found_values = []
+        for i, hash_dict in enumerate(hash_dicts):
+            if values[i] is not None:
+                continue
+            values[i] = default_cache.get(hash_dict=hash_dict)
+            if values[i] is not None:
+                found_hash_dicts.append(hash_dict)
+                found_values.append(values[i])
+
+        # Set disk cache found on g object to reduce calls on disk cache
+        PumpwoodFlaskGCache.set_many(
+            hash_dicts=found_hash_dicts, values=found_values)
+        return values
+
+    @classmethod
+    def set_many(cls, hash_dicts: list[dict], values: list[Any],
+                 expire: int | None = None, tag_dict: dict | None = None,
+                 set_g_only: bool = False) -> bool:
+        """Store many values in both request-scoped and disk caches.
+
+        Values are set on DiskCache one at a time using the public
+        `default_cache.set`, which keeps its enable, default expire and
+        retry rules.
+
+        Args:
+            hash_dicts (list[dict]):
+                Dictionaries representing the cache keys.
+            values (list[Any]):
+                Values to store in the order of `hash_dicts`.
+            expire (int | None):
+                Seconds until the global cache entries expire.
+            tag_dict (dict | None):
+                Metadata tags used for bulk eviction.
+            set_g_only (bool):
+                Set the cache on G object only.
+
+        Returns:
+            bool:
+                Always returns True.
+        """
+        PumpwoodFlaskGCache.set_many(hash_dicts=hash_dicts, values=values)
+        if not set_g_only:
+            for hash_dict, value in zip(hash_dicts, values):
+                default_cache.set(
+                    hash_dict=hash_dict, value=value, expire=expire,
+                    tag_dict=tag_dict)
+        return True
@@ -0,0 +1,348 @@
+"""Module to cache end-point results across requests."""
+import time
+import uuid
+import threading
+from typing import Any, Callable
+from dataclasses import dataclass
+from loguru import logger
+from pumpwood_communication.cache import default_cache
+from pumpwood_communication.type import PumpwoodDataclassMixin
+from pumpwood_flaskviews.config import RESULT_CACHE_COALESCE_TIMEOUT
+
+
+@dataclass
+class PumpwoodResultCacheHash(PumpwoodDataclassMixin):
+    """Cache hash components for end-point results."""
+
+    model_class: str
+    """SQLAlchemy model class name."""
+    end_point: str
+    """End-point associated with the result (e.g., 'list', 'aggregate')."""
+    payload: dict
+    """Normalised end-point payload."""
+    access_scope: dict
+    """Access scope of the user, results are shared only between users
+       that would have the same rows returned."""
+    context: str = 'flaskviews--result-cache'
+    """Context identifier for the cache entry."""
+
+
+@dataclass
+class PumpwoodResultInFlightHash(PumpwoodDataclassMixin):
+    """Cache hash components for results being computed by a process."""
+
+    result_hash: str
+    """Hash of the result being computed."""
+    context: str = 'flaskviews--result-in-flight'
+    """Context identifier for the cache entry."""
+
+
+@dataclass
+class PumpwoodResultGenerationHash(PumpwoodDataclassMixin):
+    """Cache hash components for the generation of model results."""
+
+    model_class: str
+    """SQLAlchemy model class name."""
+    context: str = 'flaskviews--result-generation'
+    """Context identifier for the cache entry."""
+
+
+class PumpwoodResultCache:
+    """Cache end-point results on `default_cache` tagged by model class.
+
+    Results are tagged using the model class, so all cached results of a
+    model can be evicted when its data is changed. Eviction also changes
+    the model generation, results computed while it changed are not
+    stored, since they may have read data before the write. `default_cache`
+    is local to the host, eviction does not reach results cached on other
+    hosts and they are kept until expire.
+    """
+
+    TAG_CONTEXT: str = 'flaskviews--result-cache'
+    """Context used on the model class tag."""
+    IN_FLIGHT_TAG_CONTEXT: str = 'flaskviews--result-in-flight'
+    """Context used on the tag of in-flight markers."""
+    IN_FLIGHT_POLL_INTERVAL: float = 0.05
+    """Seconds between cache checks while waiting for other process."""
+
+    _locks: dict[str, threading.Lock] = {}
+    """Locks of results being computed on this process by hash."""
+    _locks_waiters: dict[str, int] = {}
+    """Number of threads using each lock, used to clean up locks."""
+    _locks_guard: threading.Lock = threading.Lock()
+    """Lock used to change `_locks` and `_locks_waiters`."""
+
+    @classmethod
+    def normalise_payload(cls, payload: dict) -> dict:
+        """Remove empty arguments from payload.
+
+        Arguments set as None, empty dictionaries or empty lists have
+        the same effect as not passing them, removing them will make
+        equivalent payloads share the same cache.
+
+        Args:
+            payload (dict):
+                End-point payload.
+
+        Returns:
+            dict:
+                Payload without empty arguments.
+        """
+        return {
+            key: value for key, value in payload.items()
+            if value is not None and value != {} and value != []}
+
+    @classmethod
+    def get_tag_dict(cls, model_class: str) -> dict:
+        """Return the tag dictionary associated with the model class.
+
+        Args:
+            model_class (str):
+                SQLAlchemy model class name.
+
+        Returns:
+            dict:
+                Tag dictionary used on `default_cache`.
+        """
+        return {'context': cls.TAG_CONTEXT, 'model_class': model_class}
+
+    @classmethod
+    def build_hash_dict(cls, model_class: str, end_point: str,
+                        payload: dict, access_scope: dict
+                        ) -> PumpwoodResultCacheHash:
+        """Build the hash dict for the end-point result.
+
+        Args:
+            model_class (str):
+                SQLAlchemy model class name.
+            end_point (str):
+                End-point associated with the result.
+            payload (dict):
+                End-point payload, it will be normalised.
+            access_scope (dict):
+                Access scope of the user.
+
+        Returns:
+            PumpwoodResultCacheHash:
+                Hash dict used to get and set the cache.
+        """
+        return PumpwoodResultCacheHash(
+            model_class=model_class, end_point=end_point,
+            payload=cls.normalise_payload(payload),
+            access_scope=access_scope)
+
+    @classmethod
+    def get(cls, hash_dict: PumpwoodResultCacheHash) -> Any:
+        """Get a cached result.
+
+        Args:
+            hash_dict (PumpwoodResultCacheHash):
+                Hash dict of the result.
+
+        Returns:
+            Any:
+                Cached result or None if not found.
+        """
+        cached_result = default_cache.get(hash_dict=hash_dict)
+        if cached_result is not None:
+            logger.info("Result cache retrieved from disk cache")
+        return cached_result
+
+    @classmethod
+    def set(cls, hash_dict: PumpwoodResultCacheHash, value: Any,
+            expire: int) -> bool:
+        """Store a result tagged by model class.
+
+        Args:
+            hash_dict (PumpwoodResultCacheHash):
+                Hash dict of the result.
+            value (Any):
+                End-point result.
+            expire (int):
+                Seconds until the cache expires.
+
+        Returns:
+            bool:
+                True if the result was stored.
+        """
+        tag_dict = cls.get_tag_dict(model_class=hash_dict.model_class)
+        return default_cache.set(
+            hash_dict=hash_dict, value=value, expire=expire,
+            tag_dict=tag_dict)
+
+    @classmethod
+    def get_generation(cls, model_class: str) -> str | None:
+        """Return the generation of the model class results.
+
+        Args:
+            model_class (str):
+                SQLAlchemy model class name.
+
+        Returns:
+            str | None:
+                Token changed on each eviction, None if the model was not
+                evicted since the generation expired.
+        """
+        return default_cache.get(
+            hash_dict=PumpwoodResultGenerationHash(model_class=model_class))
+
+    @classmethod
+    def evict(cls, model_class: str) -> bool:
+        """Evict all cached results of the model class.
+
+        A new generation is set before the results are evicted, so results
+        being computed while data changed are not stored after eviction.
+        It is a random token and not a counter, concurrent evictions can
+        not set the same value.
+
+        Args:
+            model_class (str):
+                SQLAlchemy model class name.
+
+        Returns:
+            bool:
+                True if eviction was successful, False if cache could not
+                be reached. `default_cache` returns the number of removed
+                entries on success and False on lock timeout.
+        """
+        is_set = default_cache.set(
+            hash_dict=PumpwoodResultGenerationHash(model_class=model_class),
+            value=uuid.uuid4().hex)
+        tag_dict = cls.get_tag_dict(model_class=model_class)
+        is_evicted = default_cache.evict(tag_dict=tag_dict) is not False
+        return is_set and is_evicted
+
+    @classmethod
+    def _acquire_lock(cls, result_hash: str) -> threading.Lock:
+        """Return the process lock associated with result hash.
+
+        Args:
+            result_hash (str):
+                Hash of the result.
+
+        Returns:
+            threading.Lock:
+                Lock that must be released using `_release_lock`.
+        """
+        with cls._locks_guard:
+            lock = cls._locks.get(result_hash)
+            if lock is None:
+                lock = threading.Lock()
+                cls._locks[result_hash] = lock
+            cls._locks_waiters[result_hash] = \
+                cls._locks_waiters.get(result_hash, 0) + 1
+        lock.acquire()
+        return lock
+
+    @classmethod
+    def _release_lock(cls, result_hash: str, lock: threading.Lock) -> None:
+        """Release process lock and remove it if no thread is waiting.
+
+        Args:
+            result_hash (str):
+                Hash of the result.
+            lock (threading.Lock):
+                Lock returned by `_acquire_lock`.
+        """
+        lock.release()
+        with cls._locks_guard:
+            cls._locks_waiters[result_hash] -= 1
+            if cls._locks_waiters[result_hash] == 0:
+                del cls._locks_waiters[result_hash]
+                del cls._locks[result_hash]
+
+    @classmethod
+    def _wait_in_flight(cls, hash_dict: PumpwoodResultCacheHash,
+                        in_flight_hash: PumpwoodResultInFlightHash,
+                        timeout: int) -> Any:
+        """Wait other process computing the same result.
+
+        Args:
+            hash_dict (PumpwoodResultCacheHash):
+                Hash dict of the result.
+            in_flight_hash (PumpwoodResultInFlightHash):
+                Hash dict of the in-flight marker.
+            timeout (int):
+                Maximum seconds waiting for the result.
+
+        Returns:
+            Any:
+                Result cached by other process or None if marker was
+                removed or timeout was reached without result.
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if default_cache.get(hash_dict=in_flight_hash) is None:
+                break
+            time.sleep(cls.IN_FLIGHT_POLL_INTERVAL)
+        return default_cache.get(hash_dict=hash_dict)
+
+    @classmethod
+    def get_or_compute(cls, hash_dict: PumpwoodResultCacheHash,
+                       function: Callable[[], Any], expire: int) -> Any:
+        """Get cached result or compute it coalescing concurrent misses.
+
+        Threads of the same process requesting the same result wait the
+        first one to compute it. Between processes an in-flight marker is
+        set on `default_cache` and other processes poll the cache until
+        the result is stored, the marker is removed or
+        `PUMPWOOD_FLASKVIEWS__RESULT_CACHE_COALESCE_TIMEOUT` is reached.
+        The marker is not atomic, so processes missing at the same instant
+        may still compute the result more than once. Cache is host-local,
+        processes of other hosts never wait on the marker. Results are not
+        stored if model generation changed while they were computed.
+
+        Args:
+            hash_dict (PumpwoodResultCacheHash):
+                Hash dict of the result.
+            function (Callable[[], Any]):
+                Function without arguments that returns the result.
+            expire (int):
+                Seconds until the cache expires.
+
+        Returns:
+            Any:
+                Cached or computed result.
+        """
+        result = cls.get(hash_dict=hash_dict)
+        if result is not None:
+            return result
+
+        result_hash = default_cache.generate_hash(hash_dict=hash_dict)
+        lock = cls._acquire_lock(result_hash=result_hash)
+        try:
+            # Other thread may have computed result while waiting the lock
+            result = cls.get(hash_dict=hash_dict)
+            if result is not None:
+                return result
+
+            in_flight_hash = PumpwoodResultInFlightHash(
+                result_hash=result_hash)
+            in_flight_tag = {
+                'context': cls.IN_FLIGHT_TAG_CONTEXT,
+                'result_hash': result_hash}
+            if 0 < RESULT_CACHE_COALESCE_TIMEOUT:
+                result = cls._wait_in_flight(
+                    hash_dict=hash_dict, in_flight_hash=in_flight_hash,
+                    timeout=RESULT_CACHE_COALESCE_TIMEOUT)
+                if result is not None:
+                    return result
+                default_cache.set(
+                    hash_dict=in_flight_hash, value=True,
+                    expire=RESULT_CACHE_COALESCE_TIMEOUT,
+                    tag_dict=in_flight_tag)
+
+            try:
+                generation = cls.get_generation(
+                    model_class=hash_dict.model_class)
+                result = function()
+                is_same_generation = generation == cls.get_generation(
+                    model_class=hash_dict.model_class)
+                if is_same_generation:
+                    cls.set(hash_dict=hash_dict, value=result, expire=expire)
+            finally:
+                if 0 < RESULT_CACHE_COALESCE_TIMEOUT:
+                    default_cache.evict(tag_dict=in_flight_tag)
+            return result
+        finally:
+            cls._release_lock(result_hash=result_hash, lock=lock)
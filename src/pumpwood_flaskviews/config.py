@@ -17,3 +17,44 @@ AUTHORIZATION_CACHE_EXPIRE = int(
    permission cache."""
 
 MICROSERVICE_URL = os.getenv('MICROSERVICE_URL')
+
+STATEMENT_TIMEOUT = int(
+    os.getenv('PUMPWOOD_FLASKVIEWS__STATEMENT_TIMEOUT', 0))
+"""Default statement timeout in milliseconds applied to view end-points
+   not listed on view `statement_timeout`, 0 disables the timeout."""
+
+READ_REPLICA_STICKY_EXPIRE = int(
+    os.getenv('PUMPWOOD_FLASKVIEWS__READ_REPLICA_STICKY_EXPIRE', 5))
+"""Time in seconds that read-only requests of a token are routed to the
+   primary database after a write, keeping read-your-writes semantics."""
+
+RESULT_CACHE_COALESCE_TIMEOUT = int(
+    os.getenv('PUMPWOOD_FLASKVIEWS__RESULT_CACHE_COALESCE_TIMEOUT', 30))
+"""Maximum time in seconds a process waits other process computing the
+   same cached result before computing it, 0 disables the wait."""
+
+BULK_SAVE_AUTOFILL_CHUNK_SIZE = int(
+    os.getenv('PUMPWOOD_FLASKVIEWS__BULK_SAVE_AUTOFILL_CHUNK_SIZE', 1000))
+"""Maximum number of keys on each remote autofill fetch of bulk save."""
+
+BULK_SAVE_AUTOFILL_N_PARALLEL = int(
+    os.getenv('PUMPWOOD_FLASKVIEWS__BULK_SAVE_AUTOFILL_N_PARALLEL', 0)) or None
+"""Number of concurrent remote autofill fetches of bulk save, if not set
+   the microservice `N_PARALLEL` default is used."""
+
+BULK_SAVE_JOB_SPOOL_PATH = os.getenv(
+    'PUMPWOOD_FLASKVIEWS__BULK_SAVE_JOB_SPOOL_PATH',
+    os.path.join(os.getcwd(), 'pumpwood_bulk_save'))
+"""Directory where bodies of asynchronous bulk save jobs are spooled, on
+   a sub-directory for each process. Default `pumpwood_bulk_save` on the
+   working directory of the app."""
+
+BULK_SAVE_JOB_MAX_WORKERS = int(
+    os.getenv('PUMPWOOD_FLASKVIEWS__BULK_SAVE_JOB_MAX_WORKERS', 2))
+"""Number of asynchronous bulk save jobs run at the same time by each
+   process."""
+
+BULK_SAVE_JOB_STATUS_EXPIRE = int(
+    os.getenv('PUMPWOOD_FLASKVIEWS__BULK_SAVE_JOB_STATUS_EXPIRE', 86400))
+"""Time in seconds that asynchronous bulk save job status is kept after
+   its last update."""
@@ -6,3 +6,24 @@ class PumpWoodFlaskViewEndPointFoundError(PumpWoodException):
 
     status_code = 404
 
+
+class PumpWoodFlaskViewStatementTimeoutError(PumpWoodException):
+    """Raised when a database statement exceeds the end-point timeout."""
+
+    status_code = 408
+
+    def to_dict(self) -> dict:
+        """Serialize exception as a registered Pumpwood exception type.
+
+        Clients rebuild errors using `type` from pumpwood_communication
+        `exceptions_dict`, this class is not registered there so it is
+        serialized as `PumpWoodQueryException` keeping the 408 status
+        code, which clients use when raising the mapped exception.
+
+        Returns:
+            dict:
+                Exception serialized with `type` PumpWoodQueryException.
+        """
+        rv = super().to_dict()
+        rv["type"] = "PumpWoodQueryException"
+        return rv
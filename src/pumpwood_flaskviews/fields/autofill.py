@@ -21,8 +21,9 @@ from pumpwood_flaskviews.cache import PumpwoodFlaskGDiskCache
 class AutoFillFieldCacheHash(PumpwoodDataclassMixin):
     """Cache hash components for AutoFill field lookups."""
 
-    authorization_token: str | None
-    """Request Authorization header value."""
+    access_scope: dict
+    """Access scope of the user if user permission is applied, empty
+       dictionary otherwise."""
     model_class: str
     """Target model class for the autofill lookup."""
     pk: str | int
@@ -188,8 +189,11 @@ class AutoFillFieldLocal(Field):
 
         # Build primary keys dictionary
         pk = self._build_fk(data=data, primary_keys=primary_keys)
+        access_scope = {}
+        if self._apply_user_permission:
+            access_scope = model_class.base_query.get_access_scope()
         hash_dict = AutoFillFieldCacheHash(
-            authorization_token=AuthFactory.get_auth_header()['Authorization'],
+            access_scope=access_scope,
             model_class=model_class.__name__.lower(),
             pk=pk, field=self._fill_field,
             apply_user_permission=self._apply_user_permission)
@@ -297,6 +301,7 @@ class AutoFillFieldMicroservice(Field):
                  source: str, fill_field: str,
                  complementary_source: dict[str, str] = {},
                  apply_user_permission: bool = False,
+                 row_permission_scoped: bool = False,
                  *args, **kwargs):
         """Initialize the microservice autofill field.
 
@@ -318,6 +323,11 @@ class AutoFillFieldMicroservice(Field):
             apply_user_permission (bool):
                 If True, forwards request auth and skips logged-in
                 microservice credentials.
+            row_permission_scoped (bool):
+                Set True if the remote model base query filters only by
+                row permission, cached values are then shared among users
+                with the same access scope. If False cached values are
+                kept per user.
             *args:
                 Positional arguments forwarded to Marshmallow Field.
             **kwargs:
@@ -347,6 +357,7 @@ class AutoFillFieldMicroservice(Field):
         self._fill_field = fill_field
         self._complementary_source = complementary_source
         self._apply_user_permission = apply_user_permission
+        self._row_permission_scoped = row_permission_scoped
         super().__init__(*args, **kwargs)
 
     @classmethod
@@ -439,8 +450,14 @@ class AutoFillFieldMicroservice(Field):
 
         # Build primary keys dictionary
         pk = self._build_fk(data=data, primary_keys=primary_keys)
+        access_scope = {}
+        if self._apply_user_permission:
+            # Remote base query is not known, keep cache per user unless
+            # remote model is declared as filtered only by row permission
+            access_scope = AuthFactory.get_access_scope(
+                user_scoped=not self._row_permission_scoped)
         hash_dict = AutoFillFieldCacheHash(
-            authorization_token=AuthFactory.get_auth_header()['Authorization'],
+            access_scope=access_scope,
             model_class=self.model_class.lower(),
             pk=pk, field=self._fill_field,
             apply_user_permission=self._apply_user_permission)
@@ -594,6 +594,19 @@ class ValidateForeignKeyFieldLocal(Integer):
         model_class.default_query_get(
             pk=object_pk, raise_error=True, use_cache=True)
 
+    def prefetch_obj_access(self, object_pks: list[int]) -> None:
+        """Retrieve many related objects with one query.
+
+        Objects are set on request cache, so `_validate_obj_access` of
+        each deserialized value does not query the database.
+
+        Args:
+            object_pks (list[int]):
+                Primary keys of the related objects.
+        """
+        model_class = self._get_model_class()
+        model_class.default_query_get_many(pks=object_pks, use_cache=True)
+
     def _deserialize(self, value, attr, data, **kwargs):
         """Deserialize integer FK and validate related object access.
 
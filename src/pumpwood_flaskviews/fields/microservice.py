@@ -26,8 +26,9 @@ class MicroserviceForeignKeyFieldCacheHash(PumpwoodDataclassMixin):
     and field selection are part of the cache key.
     """
 
-    authorization_token: str
-    """Request authorization token."""
+    access_scope: dict
+    """Access scope used to fetch the object, empty dictionary if the
+       logged microservice is used."""
     model_class: str
     """Model class for the autofill field."""
     object_pk: str | int
@@ -137,10 +138,11 @@ class MicroserviceForeignKeyField(Field):
             dict:
                 A dictionary containing the object data or error metadata.
         """
+        # Data is fetched using the logged microservice, so it does not
+        # depend on the user access scope
         hash_dict = MicroserviceForeignKeyFieldCacheHash(
-            authorization_token=AuthFactory.get_auth_header()['Authorization'],
-            model_class=self.model_class, object_pk=object_pk,
-            fields=self.fields)
+            access_scope={}, model_class=self.model_class,
+            object_pk=object_pk, fields=self.fields)
         g_cached_data = PumpwoodFlaskGCache.get(hash_dict=hash_dict)
         if g_cached_data is not None:
             return g_cached_data
@@ -570,7 +572,8 @@ class ValidateForeignKeyFieldMicroservice(Integer):
     """
 
     def __init__(self, *args, model_class: str,
-                 not_logged_microservice: PumpWoodMicroService, **kwargs):
+                 not_logged_microservice: PumpWoodMicroService,
+                 row_permission_scoped: bool = False, **kwargs):
         """Class constructor.
 
         Args:
@@ -580,6 +583,11 @@ class ValidateForeignKeyFieldMicroservice(Integer):
             not_logged_microservice (PumpWoodMicroService):
                 Microservice client used to retrieve the related
                 object. Request auth is forwarded via auth_header.
+            row_permission_scoped (bool):
+                Set True if the remote model base query filters only by
+                row permission, cached access is then shared among users
+                with the same access scope. If False cached access is
+                kept per user.
             *args:
                 Positional arguments forwarded to IntField.
             **kwargs:
@@ -593,6 +601,7 @@ class ValidateForeignKeyFieldMicroservice(Integer):
 
         self.model_class = model_class
         self.microservice = not_logged_microservice
+        self.row_permission_scoped = row_permission_scoped
         super().__init__(*args, **kwargs)
 
     def _validate_obj_access(self, object_pk: str | int) -> dict | None:
@@ -618,10 +627,12 @@ class ValidateForeignKeyFieldMicroservice(Integer):
         auth_header = AuthFactory.get_auth_header()
         # Use just the pk as field to retrieve the object since it is not
         # necessary to retrieve the object data, just the access.
+        access_scope = AuthFactory.get_access_scope(
+            user_scoped=not self.row_permission_scoped)
+        access_scope['base_filter_skip'] = get_base_filter_skip()
         hash_dict = MicroserviceForeignKeyFieldCacheHash(
-            authorization_token=auth_header['Authorization'],
-            model_class=self.model_class, object_pk=object_pk,
-            fields=['pk'])
+            access_scope=access_scope, model_class=self.model_class,
+            object_pk=object_pk, fields=['pk'])
         g_cached_data = PumpwoodFlaskGCache.get(hash_dict=hash_dict)
         if g_cached_data is not None:
             # Check if it is an error and raise it.
@@ -649,6 +660,49 @@ class ValidateForeignKeyFieldMicroservice(Integer):
 
         PumpwoodFlaskGCache.set(hash_dict=hash_dict, value=obj)
 
+    def prefetch_obj_access(self, object_pks: list[int]) -> None:
+        """Retrieve many related objects with one list request.
+
+        Objects returned are set on request cache, so
+        `_validate_obj_access` of each deserialized value does not call
+        the microservice. Pks not returned are not cached and are
+        retrieved on deserialization to raise the error of the object.
+
+        Args:
+            object_pks (list[int]):
+                Primary keys of the related objects.
+
+        Raises:
+            PumpWoodUnauthorized:
+                If the request auth token is invalid or expired.
+        """
+        auth_header = AuthFactory.get_auth_header()
+        base_filter_skip = get_base_filter_skip()
+        access_scope = AuthFactory.get_access_scope(
+            user_scoped=not self.row_permission_scoped)
+        access_scope['base_filter_skip'] = base_filter_skip
+
+        def get_hash_dict(object_pk):
+            return MicroserviceForeignKeyFieldCacheHash(
+                access_scope=access_scope, model_class=self.model_class,
+                object_pk=object_pk, fields=['pk'])
+
+        object_pks = list(dict.fromkeys(object_pks))
+        cached_data = PumpwoodFlaskGCache.get_many(
+            hash_dicts=[get_hash_dict(pk) for pk in object_pks])
+        missing_pks = [
+            pk for pk, data in zip(object_pks, cached_data) if data is None]
+        if len(missing_pks) == 0:
+            return None
+
+        objs = self.microservice.list_without_pag(
+            model_class=self.model_class,
+            filter_dict={'id__in': missing_pks}, fields=['pk'],
+            auth_header=auth_header, base_filter_skip=base_filter_skip)
+        PumpwoodFlaskGCache.set_many(
+            hash_dicts=[get_hash_dict(obj['pk']) for obj in objs],
+            values=objs)
+
     def _deserialize(self, value, attr, data, **kwargs):
         """Deserialize integer FK and validate related object access.
 
@@ -1,20 +1,27 @@
 """Functions and classes for flask/SQLAlchemy models."""
 from typing import Literal
 from dataclasses import dataclass
+from loguru import logger
 from sqlalchemy.orm import DeclarativeBase
-from sqlalchemy import Column, BigInteger
+from sqlalchemy import Column, BigInteger, tuple_
 from flask_sqlalchemy.query import Query
 from pumpwood_flaskviews.query import (
-    BaseQueryABC, BaseQueryNoFilter, SqlalchemyQueryMisc)
+    BaseQueryABC, BaseQueryNoFilter, SqlalchemyQueryMisc, open_composite_pk)
 from pumpwood_flaskviews.auth import AuthFactory
 from pumpwood_communication.serializers import CompositePkBase64Converter
 from pumpwood_communication.exceptions import (
-    PumpWoodObjectDoesNotExist, PumpWoodOtherException)
+    PumpWoodObjectDoesNotExist, PumpWoodOtherException,
+    PumpWoodQueryException)
 from pumpwood_communication.cache import default_cache
 from pumpwood_communication.type import PumpwoodDataclassMixin
 from pumpwood_flaskviews.cache import PumpwoodFlaskGCache
 
 
+_partition_warned_models: set[str] = set()
+"""Models that already logged the list without partition filter warning,
+   it is logged once per model and process to not flood the logs."""
+
+
 def _try_convert_int(value: str):
     """Helper function to set type of the pk at error payload.
 
@@ -42,8 +49,9 @@ class FlaskPumpWoodBaseModelCacheHash(PumpwoodDataclassMixin):
     times during a single request.
     """
 
-    authorization_token: str
-    """Request authorization token."""
+    access_scope: dict
+    """Access scope of the base query filter, objects are shared between
+       users with the same scope."""
     model_class: str
     """SQLAlchemy model class name for cache key generation."""
     object_pk: str | int | dict
@@ -79,6 +87,11 @@ class FlaskPumpWoodBaseModel(DeclarativeBase):
        that tables with more than one partition at least the first one must
        be specified on the queries."""
 
+    table_partition_required: bool = False
+    """If True, list queries without a filter on the first `table_partition`
+       column will raise `PumpWoodQueryException`. If False a warning will
+       be logged."""
+
     HASH_DICT = {
         'context': 'flaskviews--model-query-retrieve',
         'model_class': None, 'pk': None, 'get-type': None
@@ -110,6 +123,71 @@ class FlaskPumpWoodBaseModel(DeclarativeBase):
             'get-type': get_type}
         return default_cache._generate_hash(hash_dict)
 
+    @classmethod
+    def check_table_partition_filter(cls, filter_dict: dict | None,
+                                     raise_error: bool | None = None
+                                     ) -> bool:
+        """Check if filter_dict restricts the first table partition column.
+
+        Postgres only prunes partitions at plan time if the partition
+        column is used as filter. Composite primary keys carrying the
+        partition column are considered since they are opened as filters.
+
+        Args:
+            filter_dict (dict | None):
+                Dictionary used in filter operations.
+            raise_error (bool | None):
+                Raise error if partition column is not filtered. If None,
+                `table_partition_required` attribute will be used.
+
+        Returns:
+            bool:
+                True if first partition column is present on filter or
+                if model is not partitioned.
+
+        Raises:
+            PumpWoodQueryException:
+                If partition column is not filtered and raise_error is True.
+        """
+        if len(cls.table_partition) == 0:
+            return True
+
+        filter_dict = {} if filter_dict is None else filter_dict
+        raise_error = (
+            cls.table_partition_required if raise_error is None
+            else raise_error)
+        if 1 < len(cls.__table__.primary_key.columns):
+            filter_dict = open_composite_pk(
+                query_dict=filter_dict, is_filter=True)
+
+        partition_column = cls.table_partition[0]
+        filter_columns = set([
+            key.split('__')[0] for key in filter_dict.keys()])
+        if partition_column in filter_columns:
+            return True
+
+        msg = (
+            "Model [{model_class}] is partitioned by [{partition_column}] "
+            "and it was not used on filter_dict. Query will scan all "
+            "partitions, filter by [{partition_column}] to reduce "
+            "query time.")
+        if raise_error:
+            raise PumpWoodQueryException(
+                message=msg, payload={
+                    "model_class": cls.__name__,
+                    "partition_column": partition_column,
+                    "table_partition": cls.table_partition,
+                    "filter_dict": list(filter_dict.keys())})
+        # Warn only once per model, further queries are logged as debug
+        msg_fmt = msg.format(
+            model_class=cls.__name__, partition_column=partition_column)
+        if cls.__name__ in _partition_warned_models:
+            logger.debug(msg_fmt)
+        else:
+            _partition_warned_models.add(cls.__name__)
+            logger.warning(msg_fmt)
+        return False
+
     @classmethod
     def default_filter_query(cls, query: Query | None = None,
                              filter_dict: dict | None = None,
@@ -183,6 +261,9 @@ class FlaskPumpWoodBaseModel(DeclarativeBase):
         exclude_dict = {} if exclude_dict is None else exclude_dict
         order_by = [] if order_by is None else order_by
 
+        # Check if list is using partition to help Postgres pruning
+        cls.check_table_partition_filter(filter_dict=filter_dict)
+
         tmp_base_query = cls.default_filter_query(
             query=base_query, filter_dict=filter_dict,
             exclude_dict=exclude_dict, order_by=order_by)
@@ -239,7 +320,7 @@ class FlaskPumpWoodBaseModel(DeclarativeBase):
         # for default query uses the base query filter and the query do not.
         # Unify leads to cache inconstency.
         hash_dict = FlaskPumpWoodBaseModelCacheHash(
-            authorization_token=AuthFactory.get_auth_header()['Authorization'],
+            access_scope=cls.base_query.get_access_scope(),
             model_class=cls.__name__, object_pk=pk,
             get_type='default')
         if use_cache:
@@ -262,6 +343,19 @@ class FlaskPumpWoodBaseModel(DeclarativeBase):
                 # on filter_by
                 converted_pk = {'id': converted_pk}
 
+        # Partition values carried by composite primary key are used as
+        # filters, gets using only the id will scan all partitions
+        has_partition = any(
+            col in converted_pk.keys() for col in cls.table_partition)
+        if len(cls.table_partition) != 0 and not has_partition:
+            msg = (
+                "Get of partitioned model [{model_class}] without partition "
+                "columns {table_partition} on pk [{pk}], query will scan all "
+                "partitions.").format(
+                    model_class=cls.__name__,
+                    table_partition=cls.table_partition, pk=pk)
+            logger.debug(msg)
+
         # Use base query to filter object acording to user's permission,
         # it is necessary to use filter_by on request because it is
         # applied over a previous id
@@ -307,6 +401,98 @@ class FlaskPumpWoodBaseModel(DeclarativeBase):
             PumpwoodFlaskGCache.set(hash_dict=hash_dict, value=model_object)
         return model_object
 
+    @classmethod
+    def default_query_get_many(cls, pks: list[str | int],
+                               use_cache: bool = True) -> dict:
+        """Get many model_class objects using pumpwood pks on few queries.
+
+        Primary keys are grouped by their columns and each group is
+        retrieved with one query using the default filter. Objects and
+        not found errors are set on request cache as on
+        `default_query_get`, so following gets of the same pks do not
+        query the database.
+
+        Args:
+            pks (list[str | int]):
+                Pumpwood primary keys, integers or base64 strings coding
+                composite primary keys.
+            use_cache (bool):
+                If local cache may be used to retrieve data and to store
+                the retrieved objects.
+
+        Returns:
+            dict:
+                Objects indexed by the pks received, None for pks not
+                found.
+        """
+        pks = list(dict.fromkeys(pks))
+        access_scope = cls.base_query.get_access_scope()
+        hash_dicts = [
+            FlaskPumpWoodBaseModelCacheHash(
+                access_scope=access_scope, model_class=cls.__name__,
+                object_pk=pk, get_type='default')
+            for pk in pks]
+        results = {}
+        if use_cache:
+            cache_values = PumpwoodFlaskGCache.get_many(hash_dicts=hash_dicts)
+            for pk, cache_data in zip(pks, cache_values):
+                if cache_data is not None:
+                    results[pk] = (
+                        None if isinstance(cache_data, Exception)
+                        else cache_data)
+        cached_pks = set(results.keys())
+
+        # Group pks by the columns of the converted pk, each group is
+        # retrieved with a (composite) IN filter
+        pk_groups = {}
+        for pk in pks:
+            if pk in cached_pks:
+                continue
+            converted_pk = CompositePkBase64Converter.load(pk)
+            if isinstance(converted_pk, (int, float)):
+                converted_pk = {'id': converted_pk}
+            columns = tuple(sorted(converted_pk.keys()))
+            values = tuple(converted_pk[col] for col in columns)
+            pk_groups.setdefault(columns, {})[values] = pk
+
+        for columns, pk_values in pk_groups.items():
+            model_columns = [getattr(cls, col) for col in columns]
+            in_values = list(pk_values.keys())
+            if len(columns) == 1:
+                pk_filter = model_columns[0].in_([x[0] for x in in_values])
+            else:
+                pk_filter = tuple_(*model_columns).in_(in_values)
+            model_object_results = cls.default_filter_query()\
+                .filter(pk_filter).all()
+            for model_object in model_object_results:
+                values = tuple(getattr(model_object, col) for col in columns)
+                pk = pk_values.get(values)
+                if pk is not None:
+                    results[pk] = model_object
+
+        to_cache_hash_dicts = []
+        to_cache_values = []
+        for pk, hash_dict in zip(pks, hash_dicts):
+            if pk in cached_pks:
+                continue
+            if pk in results.keys():
+                to_cache_hash_dicts.append(hash_dict)
+                to_cache_values.append(results[pk])
+                continue
+
+            # Not found objects are cached as errors as on default_query_get
+            results[pk] = None
+            message = "Requested object {model_class}[{pk}] not found."
+            to_cache_hash_dicts.append(hash_dict)
+            to_cache_values.append(PumpWoodObjectDoesNotExist(
+                message=message, payload={
+                    "model_class": cls.__name__,
+                    "pk": _try_convert_int(pk)}))
+        if use_cache:
+            PumpwoodFlaskGCache.set_many(
+                hash_dicts=to_cache_hash_dicts, values=to_cache_values)
+        return results
+
     @classmethod
     def query_list(cls, filter_dict: dict | None = None,
                    exclude_dict: dict | None = None,
@@ -391,8 +577,7 @@ class FlaskPumpWoodBaseModel(DeclarativeBase):
         # for default query uses the base query filter and the query do not.
         # Unify leads to cache inconstency.
         hash_dict = FlaskPumpWoodBaseModelCacheHash(
-            authorization_token=AuthFactory.get_auth_header()['Authorization'],
-            model_class=cls.__name__, object_pk=pk,
+            access_scope={}, model_class=cls.__name__, object_pk=pk,
             get_type='query')
         if use_cache:
             cache_data = PumpwoodFlaskGCache.get(hash_dict=hash_dict)
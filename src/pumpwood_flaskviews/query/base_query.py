@@ -49,6 +49,24 @@ class BaseQueryABC(ABC):
         """
         pass
 
+    def get_access_scope(self) -> dict:
+        """Return the access scope that affects the base query filter.
+
+        It is used on cache keys to share results among users that would
+        have the same rows returned. Default implementation considers that
+        the filter depends on the logged user, subclasses may return a
+        less restrictive scope.
+
+        Returns:
+            dict:
+                Dictionary identifying the rows that can be accessed.
+        """
+        user_info = AuthFactory.retrieve_authenticated_user()
+        return {
+            'base_query': self.__class__.__name__,
+            'user': user_info['pk'],
+            'is_skip': self.check_for_skip_arg()}
+
     @staticmethod
     def validate_skip_arg(base_filter_skip: list[str]) -> list[str]:
         """Validate base_filter_skip retrieved from URL parameters.
@@ -162,6 +180,15 @@ class BaseQueryNoFilter(BaseQueryABC):
             query = model.query
         return query
 
+    def get_access_scope(self) -> dict:
+        """Return the access scope that affects the base query filter.
+
+        Returns:
+            dict:
+                Empty dictionary, no filter is applied.
+        """
+        return {}
+
 
 class BaseQueryRowPermission(BaseQueryABC):
     """Class to query builder."""
@@ -224,6 +251,22 @@ class BaseQueryRowPermission(BaseQueryABC):
                 temp_col.in_(row_permission_set),
                 temp_col.is_(None)))
 
+    def get_access_scope(self) -> dict:
+        """Return the access scope that affects the base query filter.
+
+        Returns:
+            dict:
+                Row permission ids used on filter or `is_skip` if a
+                superuser requested to skip the filter.
+        """
+        access_scope = AuthFactory.get_access_scope()
+        is_skip = self.check_for_skip_arg()
+        if is_skip and access_scope['is_superuser']:
+            return {'base_query': 'BaseQueryRowPermission', 'is_skip': True}
+        return {
+            'base_query': 'BaseQueryRowPermission',
+            'row_permission_set': access_scope['row_permission_set']}
+
 
 class BaseQueryOwner(BaseQueryABC):
     """Class to query builder."""
@@ -284,6 +327,20 @@ class BaseQueryOwner(BaseQueryABC):
             resp_query = query.filter(temp_col == user_info['pk'])
             return resp_query
 
+    def get_access_scope(self) -> dict:
+        """Return the access scope that affects the base query filter.
+
+        Returns:
+            dict:
+                Owner pk used on filter or `is_skip` if a superuser
+                requested to skip the filter.
+        """
+        user_info = AuthFactory.retrieve_authenticated_user()
+        is_skip = self.check_for_skip_arg()
+        if is_skip and user_info['is_superuser']:
+            return {'base_query': 'BaseQueryOwner', 'is_skip': True}
+        return {'base_query': 'BaseQueryOwner', 'owner': user_info['pk']}
+
 
 class BaseFilterDeleted(BaseQueryABC):
     """Class to base filter for deleted objects."""
@@ -343,3 +400,20 @@ class BaseFilterDeleted(BaseQueryABC):
             temp_col = getattr(model, self.deleted_col)
             resp_query = query.filter(temp_col.is_(False))
             return resp_query
+
+    def get_access_scope(self) -> dict:
+        """Return the access scope that affects the base query filter.
+
+        Returns:
+            dict:
+                Deleted filter is the same for all users, only a superuser
+                skipping the filter changes the scope.
+        """
+        is_skip = self.check_for_skip_arg()
+        if not is_skip:
+            return {'base_query': 'BaseFilterDeleted', 'is_skip': False}
+
+        user_info = AuthFactory.retrieve_authenticated_user()
+        return {
+            'base_query': 'BaseFilterDeleted',
+            'is_skip': user_info['is_superuser']}
@@ -1,4 +1,5 @@
 """Build sqlalchemy queries from filter_dict, exclude_dict and order_by."""
+import re
 import copy
 import numpy as np
 import pandas as pd
@@ -7,6 +8,11 @@ from sqlalchemy.sql import operators
 from sqlalchemy import func
 from sqlalchemy import inspect
 from sqlalchemy import desc
+from sqlalchemy import distinct
+from sqlalchemy import literal_column
+from sqlalchemy.orm import aliased
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from pumpwood_flaskviews.query.builders import SqlalchemyOrderBy
 from pumpwood_communication.exceptions import (
     PumpWoodQueryException, PumpWoodNotImplementedError)
@@ -411,10 +417,341 @@ class SqlalchemyQueryMisc():
 
         return q
 
+    _aggregate_trunc_units = [
+        'microseconds', 'milliseconds', 'second', 'minute', 'hour', 'day',
+        'week', 'month', 'quarter', 'year', 'decade', 'century',
+        'millennium']
+    """Units accepted by `date_trunc` on group by clauses."""
+
+    _aggregate_bucket_pattern = re.compile(
+        r"^\d+ (microsecond|millisecond|second|minute|hour|day|week|month|"
+        r"year)s?$")
+    """Intervals accepted by `time_bucket` on group by clauses."""
+
+    _aggregate_functions = {
+        'sum': lambda c, item: func.sum(c),
+        'mean': lambda c, item: func.avg(c),
+        'count': lambda c, item: func.count(c),
+        'min': lambda c, item: func.min(c),
+        'max': lambda c, item: func.max(c),
+        'std': lambda c, item: func.stddev_pop(c),
+        'var': lambda c, item: func.var_pop(c),
+        'count_distinct': lambda c, item: func.count(distinct(c)),
+        'median': lambda c, item: func.percentile_cont(0.5).within_group(c),
+        'percentile_cont':
+            lambda c, item: func.percentile_cont(
+                item['percentile']).within_group(c),
+        'first':
+            lambda c, item: postgresql.array_agg(
+                aggregate_order_by(c, item['order_by']))[1],
+        'last':
+            lambda c, item: postgresql.array_agg(
+                aggregate_order_by(c, desc(item['order_by'])))[1],
+    }
+    """Aggregation functions, they receive the column and agg item."""
+
+    @classmethod
+    def _aggregate_get_column(cls, subquery_columns: dict, field: str,
+                              clause: str, object_model):
+        """Get column from aggregation subquery.
+
+        Args:
+            subquery_columns (dict):
+                Columns of the aggregation subquery indexed by name.
+            field (str):
+                Name of the field.
+            clause (str):
+                Clause that is using the column, used on error message.
+            object_model:
+                SQLAlchemy declarative model.
+
+        Returns:
+            Column of the subquery.
+
+        Raises:
+            PumpWoodQueryException:
+                If field is not a string or is not found on subquery.
+        """
+        if type(field) is not str:
+            msg = (
+                "Field [{field}] used on {clause} clause must be a "
+                "string")
+            raise PumpWoodQueryException(
+                message=msg, payload={'field': field, 'clause': clause})
+
+        temp_col = subquery_columns.get(field)
+        if temp_col is None:
+            msg = (
+                "Field [{field}] used on {clause} clause "
+                "not found on model [{model}].")
+            raise PumpWoodQueryException(
+                message=msg, payload={
+                    'field': field, 'clause': clause,
+                    'model': object_model.__name__})
+        return temp_col
+
+    @classmethod
+    def _aggregate_fields(cls, group_by: list[str | dict],
+                          agg: dict) -> list[str]:
+        """Return fields used on group by and aggregation clauses.
+
+        Args:
+            group_by (list[str | dict]):
+                Group by definitions.
+            agg (dict):
+                Aggregation definitions.
+
+        Returns:
+            list[str]:
+                Unique fields in order of appearance.
+        """
+        fields = []
+        for g_col in group_by:
+            fields.append(
+                g_col.get('field') if isinstance(g_col, dict) else g_col)
+        for item in agg.values():
+            if isinstance(item, dict):
+                fields.append(item.get('field'))
+                fields.append(item.get('order_by'))
+        return list(dict.fromkeys(
+            x for x in fields if isinstance(x, str)))
+
+    @classmethod
+    def _aggregate_join_related(cls, object_model, query: Query,
+                                fields: list[str]) -> Query:
+        """Add related model fields to aggregation query using joins.
+
+        Fields with relationship paths separated by "__", as used on
+        filter_dict, are validated with `get_related_models_and_columns`
+        and joined using aliases, so they do not conflict with joins
+        used on filters. Joins are left outer joins to not remove rows
+        without the related objects from aggregation. Related columns are
+        labeled with the path. Only to-one relationships are joined, to-many
+        paths would repeat the base rows and inflate the aggregations.
+
+        Args:
+            object_model:
+                SQLAlchemy declarative model.
+            query (Query):
+                Query that will be aggregated.
+            fields (list[str]):
+                Fields used on group by and aggregation clauses.
+
+        Returns:
+            Query:
+                Query with joins and related columns added.
+
+        Raises:
+            PumpWoodQueryException:
+                If path is not valid, ends with an operation or uses a
+                to-many relationship.
+        """
+        join_aliases = {}
+        for field in fields:
+            if '__' not in field:
+                continue
+
+            # Validate path with the same rules used on filters
+            tokens = field.split('__')
+            if tokens[-1] in cls._underscore_operators.keys():
+                msg = (
+                    "Field [{field}] used on aggregation must not end "
+                    "with an operation [{operation}]")
+                raise PumpWoodQueryException(
+                    message=msg, payload={
+                        'field': field, 'operation': tokens[-1]})
+            cls.get_related_models_and_columns(
+                object_model=object_model, query_dict={field: None})
+
+            # Join relationships reusing aliases of common paths
+            actual_model = object_model
+            for i, token in enumerate(tokens[:-1]):
+                path = '__'.join(tokens[:i + 1])
+                if path not in join_aliases.keys():
+                    relationship = inspect(actual_model)\
+                        .mapper.relationships[token]
+                    if relationship.uselist:
+                        msg = (
+                            "Field [{field}] used on aggregation crosses "
+                            "the to-many relationship [{relationship}], "
+                            "it would repeat rows and inflate the "
+                            "aggregation. Aggregate the related model "
+                            "instead")
+                        raise PumpWoodQueryException(
+                            message=msg, payload={
+                                'field': field, 'relationship': path})
+                    alias = aliased(relationship.mapper.class_)
+                    query = query.outerjoin(
+                        getattr(actual_model, token).of_type(alias))
+                    join_aliases[path] = alias
+                actual_model = join_aliases[path]
+
+            # Treat pk and JSON keys as on filters
+            column_name, *json_key = tokens[-1].split('->')
+            if column_name == 'pk':
+                column_name = inspect(actual_model)\
+                    .mapper.primary_key[0].key
+            column = getattr(actual_model, column_name)
+            if len(json_key) != 0:
+                column = column[json_key[0]].astext
+            query = query.add_columns(column.label(field))
+        return query
+
+    @classmethod
+    def _aggregate_group_by(cls, subquery_columns: dict,
+                            g_col: str | dict, object_model):
+        """Build group by statement.
+
+        Group by may be a field name or a dictionary with `field` and
+        `trunc` (date_trunc unit) or `bucket` (TimescaleDB time_bucket
+        interval) keys. Results will be labeled with the field name or
+        with the `label` key if set.
+
+        Args:
+            subquery_columns (dict):
+                Columns of the aggregation subquery indexed by name.
+            g_col (str | dict):
+                Group by definition.
+            object_model:
+                SQLAlchemy declarative model.
+
+        Returns:
+            Labeled group by column.
+
+        Raises:
+            PumpWoodQueryException:
+                If group by definition is not valid.
+        """
+        if not isinstance(g_col, dict):
+            return cls._aggregate_get_column(
+                subquery_columns=subquery_columns, field=g_col,
+                clause='group by', object_model=object_model)
+
+        field = g_col.get('field')
+        trunc = g_col.get('trunc')
+        bucket = g_col.get('bucket')
+        label = g_col.get('label', field)
+        temp_col = cls._aggregate_get_column(
+            subquery_columns=subquery_columns, field=field,
+            clause='group by', object_model=object_model)
+
+        if (trunc is None) == (bucket is None):
+            msg = (
+                "Group by dictionary [{group_by}] must set one of "
+                "'trunc' or 'bucket' keys")
+            raise PumpWoodQueryException(
+                message=msg, payload={'group_by': g_col})
+
+        # Units are validated and set as literal so group by and select
+        # statements are the same expression for the database
+        if trunc is not None:
+            if trunc not in cls._aggregate_trunc_units:
+                msg = (
+                    "Group by trunc [{trunc}] is not valid, it must be one "
+                    "of {units}")
+                raise PumpWoodQueryException(
+                    message=msg, payload={
+                        'trunc': trunc,
+                        'units': cls._aggregate_trunc_units})
+            return func.date_trunc(
+                literal_column("'{}'".format(trunc)), temp_col)\
+                .label(label)
+
+        is_valid_bucket = (
+            isinstance(bucket, str) and
+            cls._aggregate_bucket_pattern.match(bucket) is not None)
+        if not is_valid_bucket:
+            msg = (
+                "Group by bucket [{bucket}] is not valid, it must be an "
+                "interval as '15 minutes' or '1 day'")
+            raise PumpWoodQueryException(
+                message=msg, payload={'bucket': bucket})
+        return func.time_bucket(
+            literal_column("INTERVAL '{}'".format(bucket)), temp_col)\
+            .label(label)
+
+    @classmethod
+    def _aggregate_function(cls, subquery_columns: dict, key: str,
+                            item: dict, object_model):
+        """Build aggregation function statement.
+
+        Args:
+            subquery_columns (dict):
+                Columns of the aggregation subquery indexed by name.
+            key (str):
+                Label of the aggregation result.
+            item (dict):
+                Aggregation definition with `field` and `function` keys.
+                `percentile_cont` requires `percentile` key, `first` and
+                `last` use `order_by` key to order values (default 'id').
+            object_model:
+                SQLAlchemy declarative model.
+
+        Returns:
+            Labeled aggregation function.
+
+        Raises:
+            PumpWoodQueryException:
+                If aggregation definition is not valid.
+            PumpWoodNotImplementedError:
+                If function is not implemented.
+        """
+        # Validate if fields are correctly passed to aggregation
+        # function.
+        field = item.get('field')
+        function = item.get('function')
+
+        is_not_val_arg_type = (
+            (type(field) is not str) or (type(function) is not str))
+        if is_not_val_arg_type:
+            msg = (
+                "agg key [{key}] field [{field}] or function "
+                "[{function}] are not strings or are None")
+            raise PumpWoodQueryException(
+                message=msg, payload={
+                    'key': key, 'field': field,
+                    'function': function})
+
+        orm_fun = cls._aggregate_functions.get(function)
+        if orm_fun is None:
+            msg = (
+                "agg key [{key}] function [{function}] is not implemented")
+            raise PumpWoodNotImplementedError(
+                message=msg, payload={
+                    'key': key, 'function': function})
+
+        fun_item = {}
+        if function == 'percentile_cont':
+            percentile = item.get('percentile')
+            is_valid_percentile = (
+                isinstance(percentile, (int, float)) and
+                not isinstance(percentile, bool) and
+                0 <= percentile <= 1)
+            if not is_valid_percentile:
+                msg = (
+                    "agg key [{key}] function [percentile_cont] must set "
+                    "'percentile' key with a number between 0 and 1, "
+                    "received [{percentile}]")
+                raise PumpWoodQueryException(
+                    message=msg, payload={
+                        'key': key, 'percentile': percentile})
+            fun_item['percentile'] = percentile
+        elif function in ('first', 'last'):
+            fun_item['order_by'] = cls._aggregate_get_column(
+                subquery_columns=subquery_columns,
+                field=item.get('order_by', 'id'),
+                clause='aggregation order by', object_model=object_model)
+
+        model_field = cls._aggregate_get_column(
+            subquery_columns=subquery_columns, field=field,
+            clause='aggregation function [{}]'.format(key),
+            object_model=object_model)
+        return orm_fun(model_field, fun_item).label(key)
+
     @classmethod
     def aggregate(cls, session, object_model,
-                  query: Query, group_by: list[str],
-                  agg: dict, order_by: list[str] = []) -> Query:
+                  query: Query, group_by: list[str | dict],
+                  agg: dict, order_by: list[str] | None = None) -> Query:
         """Aggregate results using group_by and agg.
 
         Args:
@@ -425,76 +762,45 @@ class SqlalchemyQueryMisc():
             query (flask_sqlalchemy.query.Query):
                 SQLAlchmy query that will be aggreted using group_by and
                 agg parameters. Is is possible.
-            group_by (list[str]):
-                Group by columns that will used.
+            group_by (list[str | dict]):
+                Group by columns that will used, related model fields
+                may be used with "__" relationship paths. Dictionaries with
+                `field` and `trunc` or `bucket` keys will group by
+                truncated timestamps, ex.:
+                `{"field": "time", "trunc": "hour"}` and
+                `{"field": "time", "bucket": "15 minutes"}`.
             agg (dict):
                 Aggregation clauses that will be used at on query.
+                Functions: sum, mean, count, min, max, std, var,
+                count_distinct, median, percentile_cont (with `percentile`
+                key), first and last (with `order_by` key).
             order_by (str[str]):
                 Columns to be used on ordering of the results from
                 aggregation.
         """
+        order_by = [] if order_by is None else order_by
+
+        # Add related model fields to the query before grouping
+        query = cls._aggregate_join_related(
+            object_model=object_model, query=query,
+            fields=cls._aggregate_fields(group_by=group_by, agg=agg))
         subquery = query.subquery()
         subquery_columns = dict([
             (col.key, col) for col in list(subquery.c)])
 
         # Creating 'Group By' statements
-        model_group_by = []
-        for g_col in group_by:
-            temp_col = subquery_columns.get(g_col)
-            if temp_col is not None:
-                model_group_by.append(temp_col)
-            else:
-                msg = (
-                    "Field [{field}] used on group by clause "
-                    "not found on model [{model}]. Related model "
-                    "fields are not implemented yet.")
-                raise PumpWoodQueryException(
-                    message=msg, payload={
-                        'field': g_col, 'model': object_model.__name__})
+        model_group_by = [
+            cls._aggregate_group_by(
+                subquery_columns=subquery_columns, g_col=g_col,
+                object_model=object_model)
+            for g_col in group_by]
 
         # Creating 'Aggregation Function' statements
-        dict_orm_fun = {
-            'sum': func.sum, 'mean': func.avg, 'count': func.count,
-            'min': func.min, 'max': func.max, 'std': func.stddev_pop,
-            'var': func.var_pop}
-        model_agg = []
-        for key, item in agg.items():
-            # Validate if fields are correctly passed to aggregation
-            # function.
-            field = item.get('field')
-            function = item.get('function')
-
-            is_not_val_arg_type = (
-                (type(field) is not str) or (type(function) is not str))
-            if is_not_val_arg_type:
-                msg = (
-                    "agg key [{key}] field [{field}] or function "
-                    "[{function}] are not strings or are None")
-                raise PumpWoodQueryException(
-                    message=msg, payload={
-                        'key': key, 'field': field,
-                        'function': function})
-
-            django_orm_fun = dict_orm_fun.get(function)
-            if django_orm_fun is None:
-                msg = (
-                    "agg key [{key}] function [{function}] is not implemented")
-                raise PumpWoodNotImplementedError(
-                    message=msg, payload={
-                        'key': key, 'function': function})
-
-            model_field = subquery_columns.get(field)
-            if model_field is None:
-                msg = (
-                    "Field [{field}] used on aggregation function clause "
-                    "[{key}] not found on model [{model}]. Related model "
-                    "fields are not implemented yet.")
-                raise PumpWoodQueryException(
-                    message=msg, payload={
-                        'field': field, 'model': object_model.__name__,
-                        'key': key})
-            agg_field = django_orm_fun(model_field).label(key)
-            model_agg.append(agg_field)
+        model_agg = [
+            cls._aggregate_function(
+                subquery_columns=subquery_columns, key=key, item=item,
+                object_model=object_model)
+            for key, item in agg.items()]
 
         query_statments = model_group_by + model_agg
         result_query = session.query(*query_statments)\
@@ -1,7 +1,10 @@
 """Modules to help use SQLAlchemy at Pumpwood Systems."""
 from .connection import get_session, PumpwoodDBGuard
 from .types import CacheableChoiceType
+from .timeout import StatementTimeout
+from .routing import PumpwoodRoutingSession, ReadReplicaRouter
 
 __all__ = [
-    get_session, CacheableChoiceType, PumpwoodDBGuard
+    get_session, CacheableChoiceType, PumpwoodDBGuard, StatementTimeout,
+    PumpwoodRoutingSession, ReadReplicaRouter
 ]
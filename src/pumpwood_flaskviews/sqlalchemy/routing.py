@@ -0,0 +1,194 @@
+"""Module to route read-only requests to database read replicas."""
+import time
+from flask import (
+    g, has_app_context, has_request_context, request, after_this_request)
+from dataclasses import dataclass
+from flask_sqlalchemy.session import Session
+from pumpwood_communication.cache import default_cache
+from pumpwood_communication.type import PumpwoodDataclassMixin
+from pumpwood_flaskviews.config import READ_REPLICA_STICKY_EXPIRE
+
+
+@dataclass
+class ReadReplicaStickyCacheHash(PumpwoodDataclassMixin):
+    """Cache hash components for read-your-writes sticky primary window."""
+
+    authorization_token: str | None
+    """Request Authorization header value."""
+    context: str = 'flaskviews--read-replica-sticky'
+    """Context identifier for the cache entry."""
+
+
+class PumpwoodRoutingSession(Session):
+    """Flask SQLAlchemy session that routes statements to a read replica.
+
+    When a bind key is set for the request using `ReadReplicaRouter`,
+    statements that would use the default database are executed on the
+    replica engine. Models with explicit `__bind_key__` are not changed.
+
+    Example:
+        >>> db = SQLAlchemy(
+        >>>     model_class=FlaskPumpWoodBaseModel,
+        >>>     session_options={"class_": PumpwoodRoutingSession})
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        """Return the engine used on the statement.
+
+        Args:
+            mapper:
+                Mapper associated with the statement.
+            clause:
+                Clause that will be executed.
+            bind:
+                Explicit bind, if set it will be returned.
+            **kwargs:
+                Other arguments passed by SQLAlchemy.
+
+        Returns:
+            Engine used to execute the statement.
+        """
+        engine = super().get_bind(
+            mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if bind is not None:
+            return engine
+
+        bind_key = ReadReplicaRouter.get_request_bind()
+        if bind_key is None:
+            return engine
+
+        # Route only statements that would run on the default database
+        if engine is self._db.engines.get(None):
+            return self._db.engines[bind_key]
+        return engine
+
+
+class ReadReplicaRouter:
+    """Set the database bind used by the request.
+
+    Bind key is stored on the g object, so it is valid only for the
+    current request. After writes a sticky window is set forcing requests
+    to use primary database and keeping read-your-writes semantics.
+
+    The end of the window is returned to the client on `STICKY_HEADER`
+    header and `STICKY_COOKIE` cookie, clients that send one of them back
+    are kept on primary on any host. The window is also stored for the
+    token on host-local `default_cache`, it only applies to requests
+    handled by the same host and is not set if cache is disabled.
+    """
+
+    G_ATTRIBUTE: str = 'pumpwood_db_bind'
+    """Attribute at g object used to set the bind key of the request."""
+    STICKY_HEADER: str = 'X-PUMPWOOD-Read-Primary-Until'
+    """Header with the end of the sticky primary window as an epoch
+       timestamp, returned after writes and read from requests."""
+    STICKY_COOKIE: str = 'pumpwood-read-primary-until'
+    """Cookie with the end of the sticky primary window as an epoch
+       timestamp, browsers send it back on next requests."""
+
+    @classmethod
+    def set_request_bind(cls, bind_key: str | None) -> None:
+        """Set the bind key used on the request.
+
+        Args:
+            bind_key (str | None):
+                Key of the engine at `SQLALCHEMY_BINDS`, None will use
+                primary database.
+        """
+        setattr(g, cls.G_ATTRIBUTE, bind_key)
+
+    @classmethod
+    def get_request_bind(cls) -> str | None:
+        """Get the bind key set for the request.
+
+        Returns:
+            str | None:
+                Key of the engine or None if primary should be used.
+        """
+        if not has_app_context():
+            return None
+        return getattr(g, cls.G_ATTRIBUTE, None)
+
+    @classmethod
+    def mark_write(cls, authorization_token: str | None) -> bool:
+        """Start the sticky primary window for the token after writes.
+
+        Args:
+            authorization_token (str | None):
+                Request Authorization header value.
+
+        Returns:
+            bool:
+                True if sticky window was set.
+        """
+        if READ_REPLICA_STICKY_EXPIRE <= 0:
+            return False
+
+        # Return the window to client so it is kept across hosts
+        if has_request_context():
+            sticky_until = "{:.3f}".format(
+                time.time() + READ_REPLICA_STICKY_EXPIRE)
+
+            @after_this_request
+            def set_sticky_marker(response):
+                response.headers[cls.STICKY_HEADER] = sticky_until
+                response.set_cookie(
+                    cls.STICKY_COOKIE, value=sticky_until,
+                    max_age=READ_REPLICA_STICKY_EXPIRE, httponly=True,
+                    samesite='Lax')
+                return response
+
+        hash_dict = ReadReplicaStickyCacheHash(
+            authorization_token=authorization_token)
+        default_cache.set(
+            hash_dict=hash_dict, value=True,
+            expire=READ_REPLICA_STICKY_EXPIRE)
+        return True
+
+    @classmethod
+    def get_client_sticky_until(cls) -> float | None:
+        """Get the end of the sticky window sent by the client.
+
+        Values further than `READ_REPLICA_STICKY_EXPIRE` seconds in the
+        future are ignored so clients can not pin requests on primary.
+
+        Returns:
+            float | None:
+                Epoch timestamp of the end of the window, None if not
+                sent or not valid.
+        """
+        if not has_request_context():
+            return None
+        value = request.headers.get(cls.STICKY_HEADER)
+        if value is None:
+            value = request.cookies.get(cls.STICKY_COOKIE)
+        try:
+            sticky_until = float(value)
+        except (TypeError, ValueError):
+            return None
+        if time.time() + READ_REPLICA_STICKY_EXPIRE < sticky_until:
+            return None
+        return sticky_until
+
+    @classmethod
+    def is_sticky(cls, authorization_token: str | None) -> bool:
+        """Check if token has written recently and must use primary.
+
+        Args:
+            authorization_token (str | None):
+                Request Authorization header value.
+
+        Returns:
+            bool:
+                True if token is inside the sticky primary window.
+        """
+        if READ_REPLICA_STICKY_EXPIRE <= 0:
+            return False
+
+        sticky_until = cls.get_client_sticky_until()
+        if sticky_until is not None and time.time() < sticky_until:
+            return True
+
+        hash_dict = ReadReplicaStickyCacheHash(
+            authorization_token=authorization_token)
+        return default_cache.get(hash_dict=hash_dict) is not None
@@ -0,0 +1,185 @@
+"""Module to apply statement timeouts on request transactions."""
+from flask import g, request, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import scoped_session
+from sqlalchemy.sql import text
+from pumpwood_communication.exceptions import PumpWoodWrongParameters
+
+
+class StatementTimeout:
+    """Apply per end-point statement timeouts using `SET LOCAL`.
+
+    Timeout is set using `set_config(..., is_local=true)`, which is the
+    function form of `SET LOCAL statement_timeout`. It is valid only
+    for the current transaction, so the value is discarded when the
+    request session is committed, rolled back or removed. Timeout is kept
+    on `g` and set again by an `after_begin` listener on each transaction
+    that session begins, e.g. chunks of bulk save that commit each
+    chunk, parallel sub-queries and asynchronous jobs that copy `g`.
+    """
+
+    REQUEST_HEADER: str = 'X-PUMPWOOD-Statement-Timeout'
+    """Header used by clients to lower the statement timeout of a request,
+       value must be an integer with milliseconds."""
+
+    QUERY_CANCELED_PGCODE: str = '57014'
+    """Postgres error code raised when statement timeout is reached."""
+
+    G_ATTRIBUTE: str = 'pumpwood_statement_timeout'
+    """Attribute at g object used to keep the timeout applied on request."""
+
+    @classmethod
+    def get_request_timeout(cls) -> int | None:
+        """Get the statement timeout requested by client header.
+
+        Returns:
+            int | None:
+                Timeout in milliseconds or None if header is not set.
+
+        Raises:
+            PumpWoodWrongParameters:
+                If header value is not a positive integer.
+        """
+        header_value = request.headers.get(cls.REQUEST_HEADER)
+        if header_value is None:
+            return None
+
+        try:
+            timeout = int(header_value)
+        except ValueError:
+            timeout = None
+
+        if timeout is None or timeout <= 0:
+            msg = (
+                "Header [{header}] must be a positive integer with the "
+                "statement timeout in milliseconds, received [{value}]")
+            raise PumpWoodWrongParameters(
+                message=msg, payload={
+                    "header": cls.REQUEST_HEADER, "value": header_value})
+        return timeout
+
+    @classmethod
+    def resolve(cls, view_timeout: int | None) -> int | None:
+        """Resolve the statement timeout for the request.
+
+        Client header can only lower the timeout set on the view, if view
+        does not set a timeout the header value is used.
+
+        Args:
+            view_timeout (int | None):
+                Timeout in milliseconds set on the view for the end-point,
+                None or 0 indicates that there is no timeout.
+
+        Returns:
+            int | None:
+                Timeout in milliseconds or None if no timeout should be
+                applied.
+        """
+        request_timeout = cls.get_request_timeout()
+        timeouts = [
+            x for x in [view_timeout, request_timeout]
+            if x is not None and 0 < x]
+        if len(timeouts) == 0:
+            return None
+        return min(timeouts)
+
+    @classmethod
+    def apply(cls, session, timeout: int | None) -> bool:
+        """Set statement timeout on session transactions of the request.
+
+        Timeout is set on the current transaction, if session has begun
+        one, and on the transactions begun later by `after_begin`.
+
+        Args:
+            session:
+                SQLAlchemy session used on the request.
+            timeout (int | None):
+                Timeout in milliseconds, if None nothing is done.
+
+        Returns:
+            bool:
+                True if timeout was applied, False if timeout is not set
+                or the database is not Postgres.
+        """
+        if timeout is None:
+            return False
+
+        dialect_name = session.get_bind().dialect.name
+        if dialect_name != 'postgresql':
+            return False
+
+        if isinstance(session, scoped_session):
+            session = session()
+        cls.register(session=session)
+        setattr(g, cls.G_ATTRIBUTE, timeout)
+        if session.in_transaction():
+            cls._set_config(connection=session.connection(), timeout=timeout)
+        return True
+
+    @classmethod
+    def register(cls, session) -> None:
+        """Register `after_begin` listener on the class of the session.
+
+        Flask-SQLAlchemy sessions are created by a session maker with its
+        own class, so the listener is called only for sessions of the
+        database of the view.
+
+        Args:
+            session:
+                SQLAlchemy session used on the request.
+        """
+        session_class = type(session)
+        if not event.contains(session_class, 'after_begin', cls.after_begin):
+            event.listen(session_class, 'after_begin', cls.after_begin)
+
+    @classmethod
+    def after_begin(cls, session, transaction, connection) -> None:
+        """Set the timeout of `g` on transactions begun by the session.
+
+        Args:
+            session:
+                SQLAlchemy session beginning the transaction.
+            transaction:
+                SQLAlchemy session transaction.
+            connection:
+                Connection of the transaction.
+        """
+        if not has_app_context():
+            return
+        timeout = cls.get_applied_timeout()
+        if timeout is None or connection.dialect.name != 'postgresql':
+            return
+        cls._set_config(connection=connection, timeout=timeout)
+
+    @classmethod
+    def _set_config(cls, connection, timeout: int) -> None:
+        """Set statement timeout on connection current transaction."""
+        connection.execute(
+            text("SELECT set_config('statement_timeout', :timeout, true)"),
+            {"timeout": "{}ms".format(int(timeout))})
+
+    @classmethod
+    def get_applied_timeout(cls) -> int | None:
+        """Return the timeout applied on the current request.
+
+        Returns:
+            int | None:
+                Timeout in milliseconds or None if not applied.
+        """
+        return getattr(g, cls.G_ATTRIBUTE, None)
+
+    @classmethod
+    def is_timeout_error(cls, error: Exception) -> bool:
+        """Check if a database error was raised by statement timeout.
+
+        Args:
+            error (Exception):
+                SQLAlchemy or psycopg2 error.
+
+        Returns:
+            bool:
+                True if error is associated with a canceled statement.
+        """
+        original_error = getattr(error, 'orig', None) or error
+        pgcode = getattr(original_error, 'pgcode', None)
+        return pgcode == cls.QUERY_CANCELED_PGCODE
@@ -1,6 +1,8 @@
 """Auxilary module for view functions."""
 from .fill_options import AuxFillOptions
+from .result_format import AuxResultFormat
+from .partition_split import AuxPartitionSplit
 
 __all__ = [
-    AuxFillOptions
+    AuxFillOptions, AuxResultFormat, AuxPartitionSplit
 ]
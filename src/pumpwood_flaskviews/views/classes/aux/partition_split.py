@@ -0,0 +1,300 @@
+"""Split requests along a partition column and run them in parallel."""
+import datetime
+import pandas as pd
+from typing import Any, Callable
+from loguru import logger
+from concurrent.futures import ThreadPoolExecutor
+from flask import g, copy_current_request_context
+from sqlalchemy.pool import QueuePool
+from pumpwood_flaskviews.sqlalchemy import (
+    StatementTimeout, ReadReplicaRouter)
+
+
+class AuxPartitionSplit:
+    """Split a request filter in disjoint filters along a column.
+
+    Filters are split if they have a `[column]__in` list, the values are
+    sorted and divided in contiguous groups, or a closed range using
+    `[column]__gte`/`[column]__gt` and `[column]__lt`/`[column]__lte`
+    with numbers, dates or datetimes, which is divided in sub-ranges.
+    Splits are ordered by column, so results can be concatenated keeping
+    the order when `order_by` is empty or starts with the split column.
+    """
+
+    LOWER_OPERATORS: list[str] = ['gte', 'gt']
+    """Operators that set the lower bound of a range filter."""
+    UPPER_OPERATORS: list[str] = ['lt', 'lte']
+    """Operators that set the upper bound of a range filter."""
+    G_ATTRIBUTES: list[str] = [
+        'user', ReadReplicaRouter.G_ATTRIBUTE, StatementTimeout.G_ATTRIBUTE]
+    """Attributes of `g` copied to threads, other attributes may hold ORM
+       objects bound to the request session and are not shared."""
+
+    @classmethod
+    def get_split_column(cls, model_class: Any,
+                         split_column: str | None = None) -> str | None:
+        """Return the column used to split requests.
+
+        Args:
+            model_class (Any):
+                SQLAlchemy model of the view.
+            split_column (str | None):
+                Column set on view, if None first `table_partition` of the
+                model is used.
+
+        Returns:
+            str | None:
+                Split column or None if model is not partitioned.
+        """
+        if split_column is not None:
+            return split_column
+        table_partition = getattr(model_class, 'table_partition', [])
+        if len(table_partition) == 0:
+            return None
+        return table_partition[0]
+
+    @classmethod
+    def _get_bound(cls, filter_dict: dict, column: str,
+                   operators: list[str]) -> tuple[str, Any] | None:
+        """Return filter key and value of a range bound.
+
+        Args:
+            filter_dict (dict):
+                Request filter dictionary.
+            column (str):
+                Split column.
+            operators (list[str]):
+                Operators associated with the bound.
+
+        Returns:
+            tuple[str, Any] | None:
+                Filter key and value or None if bound is not set.
+        """
+        bounds = [
+            ('{}__{}'.format(column, operator),
+             filter_dict['{}__{}'.format(column, operator)])
+            for operator in operators
+            if '{}__{}'.format(column, operator) in filter_dict.keys()]
+        if len(bounds) != 1:
+            return None
+        return bounds[0]
+
+    @classmethod
+    def _split_range(cls, lower: Any, upper: Any,
+                     n_splits: int) -> list[Any] | None:
+        """Return inner boundaries dividing the range in sub-ranges.
+
+        Args:
+            lower (Any):
+                Lower bound of the range.
+            upper (Any):
+                Upper bound of the range.
+            n_splits (int):
+                Number of sub-ranges.
+
+        Returns:
+            list[Any] | None:
+                Ordered inner boundaries with the type of the bounds, or
+                None if bounds can not be split.
+        """
+        is_number = all(
+            isinstance(x, (int, float)) and not isinstance(x, bool)
+            for x in [lower, upper])
+        if is_number:
+            boundaries = [
+                lower + (upper - lower) * i / n_splits
+                for i in range(1, n_splits)]
+            if isinstance(lower, int) and isinstance(upper, int):
+                boundaries = [int(x) for x in boundaries]
+            boundaries = [x for x in boundaries if lower < x < upper]
+        else:
+            try:
+                lower_time = pd.Timestamp(lower)
+                upper_time = pd.Timestamp(upper)
+            except (ValueError, TypeError):
+                return None
+
+            # Keep date boundaries for date only filters
+            is_date = all(
+                (isinstance(x, str) and len(x) == 10) or
+                (isinstance(x, datetime.date) and
+                 not isinstance(x, datetime.datetime))
+                for x in [lower, upper])
+            boundaries = [
+                lower_time + (upper_time - lower_time) * i / n_splits
+                for i in range(1, n_splits)]
+            if is_date:
+                boundaries = [x.normalize() for x in boundaries]
+            boundaries = [
+                (x.date() if is_date else x.floor('s')).isoformat()
+                for x in boundaries if lower_time < x < upper_time]
+
+        boundaries = sorted(set(boundaries))
+        if len(boundaries) == 0:
+            return None
+        return boundaries
+
+    @classmethod
+    def split_filter_dict(cls, filter_dict: dict, order_by: list[str],
+                          column: str | None, n_splits: int
+                          ) -> list[dict] | None:
+        """Split filter dictionary in disjoint filters along column.
+
+        Args:
+            filter_dict (dict):
+                Request filter dictionary.
+            order_by (list[str]):
+                Request order by, it must be empty or start with the split
+                column for results to be merged in order.
+            column (str | None):
+                Split column.
+            n_splits (int):
+                Maximum number of filters returned.
+
+        Returns:
+            list[dict] | None:
+                Filters ordered as `order_by`, or None if request can not
+                be split.
+        """
+        if column is None or n_splits < 2:
+            return None
+
+        reverse = False
+        if len(order_by) != 0:
+            if order_by[0] not in [column, '-' + column]:
+                logger.warning(
+                    "Request can not be split by [{}], order_by must be "
+                    "empty or start with split column".format(column))
+                return None
+            reverse = order_by[0].startswith('-')
+
+        split_filters = None
+        in_key = '{}__in'.format(column)
+        in_values = filter_dict.get(in_key)
+        if isinstance(in_values, list) and 1 < len(in_values):
+            try:
+                values = sorted(set(in_values))
+            except TypeError:
+                logger.warning(
+                    "Request can not be split by [{}], '__in' values can "
+                    "not be sorted".format(column))
+                return None
+            n_splits = min(n_splits, len(values))
+            split_filters = [
+                {**filter_dict, in_key: values[
+                    len(values) * i // n_splits:
+                    len(values) * (i + 1) // n_splits]}
+                for i in range(n_splits)]
+
+        lower_bound = cls._get_bound(
+            filter_dict=filter_dict, column=column,
+            operators=cls.LOWER_OPERATORS)
+        upper_bound = cls._get_bound(
+            filter_dict=filter_dict, column=column,
+            operators=cls.UPPER_OPERATORS)
+        if split_filters is None and None not in [lower_bound, upper_bound]:
+            lower_key, lower = lower_bound
+            upper_key, upper = upper_bound
+            boundaries = cls._split_range(
+                lower=lower, upper=upper, n_splits=n_splits)
+            if boundaries is not None:
+                base_filter = {
+                    key: value for key, value in filter_dict.items()
+                    if key not in [lower_key, upper_key]}
+                gte_key = '{}__gte'.format(column)
+                lt_key = '{}__lt'.format(column)
+                split_filters = []
+                for i in range(len(boundaries) + 1):
+                    split_filter = dict(base_filter)
+                    if i == 0:
+                        split_filter[lower_key] = lower
+                    else:
+                        split_filter[gte_key] = boundaries[i - 1]
+                    if i == len(boundaries):
+                        split_filter[upper_key] = upper
+                    else:
+                        split_filter[lt_key] = boundaries[i]
+                    split_filters.append(split_filter)
+
+        if split_filters is None:
+            logger.warning(
+                "Request can not be split by [{}], filter_dict must have "
+                "an '__in' list or a closed range on column".format(column))
+            return None
+        if reverse:
+            split_filters.reverse()
+        return split_filters
+
+    @classmethod
+    def get_g_attributes(cls) -> dict:
+        """Return `G_ATTRIBUTES` set on `g` to be copied to other threads.
+
+        Returns:
+            dict:
+                Attributes set on `g` for the request.
+        """
+        return {
+            key: getattr(g, key) for key in cls.G_ATTRIBUTES
+            if hasattr(g, key)}
+
+    @classmethod
+    def get_pool_max_workers(cls, engine: Any, max_workers: int) -> int:
+        """Limit number of threads to the connections of engine pool.
+
+        One connection is kept for the request session. Pools without a
+        fixed size are not limited. Threads still wait for connections
+        used by other requests up to the pool `pool_timeout`.
+
+        Args:
+            engine (Any):
+                SQLAlchemy engine used by the threads.
+            max_workers (int):
+                Maximum number of threads set on view.
+
+        Returns:
+            int:
+                Number of threads, at least one.
+        """
+        pool = engine.pool
+        if not isinstance(pool, QueuePool) or pool._max_overflow < 0:
+            return max_workers
+        pool_capacity = pool.size() + pool._max_overflow - 1
+        return max(1, min(max_workers, pool_capacity))
+
+    @classmethod
+    def run(cls, function: Callable, kwargs_list: list[dict],
+            max_workers: int) -> list:
+        """Run function in parallel threads with the request context.
+
+        Each thread pushes a copy of the request context with a new
+        application context, so Flask-SQLAlchemy opens a different session
+        and pooled connection for each thread. Only `G_ATTRIBUTES` of `g`
+        (user, request bind and statement timeout) are copied to the
+        threads.
+
+        Args:
+            function (Callable):
+                Function to be called with each kwargs.
+            kwargs_list (list[dict]):
+                Keyword arguments of each call.
+            max_workers (int):
+                Maximum number of threads.
+
+        Returns:
+            list:
+                Results of each call in the same order of `kwargs_list`.
+        """
+        g_attributes = cls.get_g_attributes()
+
+        def build_worker(kwargs: dict) -> Callable:
+            @copy_current_request_context
+            def worker():
+                for key, value in g_attributes.items():
+                    setattr(g, key, value)
+                return function(**kwargs)
+            return worker
+
+        workers = [build_worker(kwargs) for kwargs in kwargs_list]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(worker) for worker in workers]
+            return [future.result() for future in futures]
@@ -0,0 +1,136 @@
+"""Auxiliary functions to format query results without pandas."""
+import datetime
+import pandas as pd
+from typing import Any, Sequence
+from pumpwood_communication.exceptions import PumpWoodWrongParameters
+
+
+class AuxResultFormat:
+    """Build pandas `to_dict` compatible outputs from query results.
+
+    Results are built directly from the cursor rows, avoiding creating a
+    DataFrame and converting it back to Python objects. Output shapes
+    are the same of `pd.DataFrame(rows).to_dict(format)`, including
+    results with no rows, in which pandas does not have columns.
+    Datetime values are boxed as `pd.Timestamp` as pandas does, so they
+    are serialized the same way (naive values without offset).
+    """
+
+    FORMATS: list[str] = [
+        'dict', 'list', 'split', 'tight', 'records', 'index']
+    """Formats that can be used on results."""
+
+    @classmethod
+    def validate_format(cls, format: str) -> str:
+        """Validate if format is implemented.
+
+        Args:
+            format (str):
+                Pandas `to_dict` orient.
+
+        Returns:
+            str:
+                Validated format.
+
+        Raises:
+            PumpWoodWrongParameters:
+                If format is not implemented.
+        """
+        if format not in cls.FORMATS:
+            msg = (
+                "Format [{format}] is not implemented, it must be one "
+                "of {formats}")
+            raise PumpWoodWrongParameters(
+                message=msg, payload={
+                    "format": format, "formats": cls.FORMATS})
+        return format
+
+    @classmethod
+    def box_datetimes(cls, rows: Sequence[Sequence[Any]]
+                      ) -> Sequence[Sequence[Any]]:
+        """Box datetime values as `pd.Timestamp`.
+
+        Pandas converts datetime columns to `datetime64`, returning
+        `pd.Timestamp` on `to_dict`. They are serialized by `pumpJsonDump`
+        without offset if naive, while `datetime.datetime` objects are
+        serialized as UTC. Column types are checked using the first value
+        that is not None.
+
+        Args:
+            rows (Sequence[Sequence[Any]]):
+                Rows returned from query.
+
+        Returns:
+            Sequence[Sequence[Any]]:
+                Rows with datetime values boxed, rows are returned
+                unchanged if there is no datetime column.
+        """
+        if len(rows) == 0:
+            return rows
+
+        datetime_columns = []
+        for i in range(len(rows[0])):
+            first_value = next(
+                (row[i] for row in rows if row[i] is not None), None)
+            if isinstance(first_value, datetime.datetime):
+                datetime_columns.append(i)
+        if len(datetime_columns) == 0:
+            return rows
+
+        boxed_rows = [list(row) for row in rows]
+        for row in boxed_rows:
+            for i in datetime_columns:
+                if row[i] is not None:
+                    row[i] = pd.Timestamp(row[i])
+        return boxed_rows
+
+    @classmethod
+    def to_dict(cls, columns: list[str], rows: Sequence[Sequence[Any]],
+                format: str = 'list') -> dict | list:
+        """Convert rows to pandas `to_dict` compatible format.
+
+        Args:
+            columns (list[str]):
+                Name of the columns of the result.
+            rows (Sequence[Sequence[Any]]):
+                Rows returned from query.
+            format (str):
+                Pandas `to_dict` orient, one of 'dict', 'list', 'split',
+                'tight', 'records' and 'index'.
+
+        Returns:
+            dict | list:
+                Results on the requested format.
+        """
+        cls.validate_format(format=format)
+
+        # Pandas DataFrame built from an empty list does not have columns
+        n_rows = len(rows)
+        if n_rows == 0:
+            columns = []
+        columns = list(columns)
+        rows = cls.box_datetimes(rows=rows)
+
+        if format == 'records':
+            return [dict(zip(columns, row)) for row in rows]
+        if format == 'index':
+            return {
+                i: dict(zip(columns, row)) for i, row in enumerate(rows)}
+        if format in ('split', 'tight'):
+            results = {
+                'index': list(range(n_rows)), 'columns': columns,
+                'data': [list(row) for row in rows]}
+            if format == 'tight':
+                results['index_names'] = [None]
+                results['column_names'] = [None]
+            return results
+
+        # Columnar formats extract each column from rows, it is much faster
+        # than transposing using zip(*rows) for large results
+        column_values = [
+            [row[i] for row in rows] for i in range(len(columns))]
+        if format == 'list':
+            return dict(zip(columns, column_values))
+        return {
+            col: dict(enumerate(values))
+            for col, values in zip(columns, column_values)}
@@ -1,2 +1,8 @@
 """Module for data associated views on Pumpwood."""
 from .view import PumpWoodDataFlaskView
+from .rollup import AggregateRollup
+
+
+__all__ = [
+    PumpWoodDataFlaskView, AggregateRollup
+]
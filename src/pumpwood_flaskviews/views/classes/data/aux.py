@@ -2,6 +2,7 @@
 import pandas as pd
 from typing import Any
 from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
 from pumpwood_communication.type import (
     PumpwoodDataclassMixin, BulkSaveMicroserviceAutoFillField,
     BulkSaveLocalAutoFillField, BulkSaveDefaultField,
@@ -10,6 +11,8 @@ from pumpwood_communication.microservices import PumpWoodMicroService
 from pumpwood_communication.exceptions import (
     PumpWoodOtherException, PumpWoodDataLoadingException)
 from pumpwood_flaskviews.cache import PumpwoodFlaskGDiskCache
+from pumpwood_flaskviews.config import (
+    BULK_SAVE_AUTOFILL_CHUNK_SIZE, BULK_SAVE_AUTOFILL_N_PARALLEL)
 
 BulkSaveField = (
     str
@@ -35,7 +38,18 @@ class BulkSaveAutoFillFieldCacheHash(PumpwoodDataclassMixin):
 
 
 class FillBulkSaveFields:
-    """Fill bulk save fields."""
+    """Fill bulk save fields.
+
+    Fields are filled in groups of consecutive fields that do not read
+    columns written by other fields of the group. Remote keys of all
+    autofill fields of a group are fetched concurrently in chunks.
+    """
+
+    AUTOFILL_CHUNK_SIZE: int = BULK_SAVE_AUTOFILL_CHUNK_SIZE
+    """Maximum number of keys on `id__in` filter of each remote fetch."""
+    AUTOFILL_N_PARALLEL: int | None = BULK_SAVE_AUTOFILL_N_PARALLEL
+    """Number of concurrent remote fetches, if None the microservice
+       default is used."""
 
     @classmethod
     def run(
@@ -64,17 +78,299 @@ class FillBulkSaveFields:
             PumpWoodOtherException:
                 If `expected_cols_bulk_save` contains duplicate columns.
         """
-        for field in fields:
-            if isinstance(field, BulkSaveMicroserviceAutoFillField):
-                data = data.pipe(
-                    cls.fill_auto_microservice, field=field,
-                    microservice=microservice)
-            elif isinstance(field, BulkSaveLocalAutoFillField):
-                data = data.pipe(cls.fill_auto_local, field=field)
-            elif isinstance(field, BulkSaveDefaultField):
-                data = data.pipe(cls.fill_default, field=field)
+        for group in cls.get_fill_groups(fields=fields):
+            data = cls.fill_group(
+                data=data, fields=group, microservice=microservice)
         return cls.validate_data(data=data, fields=fields)
 
+    @classmethod
+    def get_fill_groups(cls, fields: list[BulkSaveField]
+                        ) -> list[list[MixinBulkSaveField]]:
+        """Split fill fields in groups that can be filled together.
+
+        A new group is started when a field reads a column written by the
+        current group or writes a column read or written by it, so groups
+        can be filled concurrently keeping the order of the fields.
+
+        Args:
+            fields (list[BulkSaveField]):
+                View `expected_cols_bulk_save` entries.
+
+        Returns:
+            list[list[MixinBulkSaveField]]:
+                Ordered groups of autofill and default fields.
+        """
+        groups = []
+        group = []
+        group_reads = set()
+        group_writes = set()
+        for field in fields:
+            if not isinstance(field, MixinBulkSaveField):
+                continue
+            reads = {getattr(field, 'object_fk_column', None), field.field}
+            writes = {field.field}
+            if isinstance(field, BulkSaveDefaultField):
+                reads = {field.field}
+            depends = (
+                len(reads & group_writes) != 0 or
+                len(writes & (group_reads | group_writes)) != 0)
+            if depends:
+                groups.append(group)
+                group = []
+                group_reads = set()
+                group_writes = set()
+            group.append(field)
+            group_reads.update(reads)
+            group_writes.update(writes)
+        if len(group) != 0:
+            groups.append(group)
+        return groups
+
+    @classmethod
+    def fill_group(cls, data: pd.DataFrame,
+                   fields: list[MixinBulkSaveField],
+                   microservice: PumpWoodMicroService | None
+                   ) -> pd.DataFrame:
+        """Fill a group of independent fields.
+
+        Cached values are read for all autofill fields, local keys are
+        queried on database and remote keys of all fields are fetched
+        concurrently in chunks of `AUTOFILL_CHUNK_SIZE` keys.
+
+        Args:
+            data (pd.DataFrame):
+                Bulk save data to fill the fields.
+            fields (list[MixinBulkSaveField]):
+                Group returned by `get_fill_groups`.
+            microservice (PumpWoodMicroService | None):
+                Microservice used for remote autofill lookups.
+
+        Returns:
+            pd.DataFrame:
+                Input dataframe with group fields filled.
+
+        Raises:
+            PumpWoodDataLoadingException:
+                If `object_fk_column` is missing from the payload or
+                related keys cannot be resolved.
+            PumpWoodOtherException:
+                If a local related model does not expose `fill_col`.
+        """
+        auto_fill_maps = {}
+        remote_fetches = []
+        for i, field in enumerate(fields):
+            if isinstance(field, BulkSaveDefaultField):
+                continue
+            cls._validate_object_fk_column(data=data, field=field)
+            data = cls._normalize_fk_column(data=data, field=field)
+            unique_fk_columns = \
+                data[field.object_fk_column].unique().tolist()
+            model_class = cls._get_fill_model_name(field=field)
+
+            # Get data from localcache if avaiable and allowed
+            map_fk_fill_data = {}
+            if field.use_cache:
+                map_fk_fill_data = cls.get_field_cache_many(
+                    model_class=model_class, pks=unique_fk_columns,
+                    field=field.fill_col)
+            missing_cache = [
+                fk_pk for fk_pk in unique_fk_columns
+                if fk_pk not in map_fk_fill_data.keys()]
+            auto_fill_maps[i] = (unique_fk_columns, map_fk_fill_data)
+            if len(missing_cache) == 0:
+                continue
+
+            # Fetch local data from database, remote data is fetched
+            # concurrently for all fields
+            if isinstance(field, BulkSaveLocalAutoFillField):
+                fetched_data = cls._fetch_local(
+                    field=field, pks=missing_cache)
+                cls._update_fill_map(
+                    field=field, map_fk_fill_data=map_fk_fill_data,
+                    fetched_data=fetched_data)
+            else:
+                for start in range(
+                        0, len(missing_cache), cls.AUTOFILL_CHUNK_SIZE):
+                    remote_fetches.append((i, missing_cache[
+                        start:start + cls.AUTOFILL_CHUNK_SIZE]))
+
+        fetched_chunks = cls._fetch_microservice(
+            fields=fields, remote_fetches=remote_fetches,
+            microservice=microservice)
+        for (i, _), fetched_data in zip(remote_fetches, fetched_chunks):
+            cls._update_fill_map(
+                field=fields[i], map_fk_fill_data=auto_fill_maps[i][1],
+                fetched_data=fetched_data)
+
+        for i, field in enumerate(fields):
+            if isinstance(field, BulkSaveDefaultField):
+                data = cls.fill_default(data=data, field=field)
+                continue
+
+            # Validate if all foreign keys are set on the map dictonary
+            unique_fk_columns, map_fk_fill_data = auto_fill_maps[i]
+            cls.validate_fks(
+                unique_fk_columns=unique_fk_columns,
+                map_fk_fill_data=map_fk_fill_data,
+                related_model_name=cls._get_fill_model_name(field=field),
+                field_name=field.field)
+            data[field.field] = \
+                data[field.object_fk_column].map(map_fk_fill_data)
+        return data
+
+    @classmethod
+    def _get_fill_pk_type(cls, field: MixinBulkSaveField) -> type | None:
+        """Return Python type of the pk of an autofill related model.
+
+        Remote objects are fetched and cached by `id`, which is an integer
+        on Pumpwood models.
+
+        Args:
+            field (MixinBulkSaveField):
+                Autofill field definition from the view.
+
+        Returns:
+            type | None:
+                Python type of the related `id` column or None if it is
+                not known.
+        """
+        if not isinstance(field, BulkSaveLocalAutoFillField):
+            return int
+        try:
+            return field.cls_fill_model_class.__table__.c['id']\
+                .type.python_type
+        except (AttributeError, KeyError, NotImplementedError):
+            return None
+
+    @classmethod
+    def _normalize_fk_column(cls, data: pd.DataFrame,
+                             field: MixinBulkSaveField) -> pd.DataFrame:
+        """Cast integer foreign keys read as floats to integers.
+
+        Keys read from CSV or integer columns with nulls are floats, their
+        hash dicts would not match the integer pks values are cached
+        under. Null keys are set as None.
+
+        Args:
+            data (pd.DataFrame):
+                Bulk save data to fill the fields.
+            field (MixinBulkSaveField):
+                Autofill field definition from the view.
+
+        Returns:
+            pd.DataFrame:
+                Input dataframe with `object_fk_column` cast if related
+                pk is an integer and all keys are integral.
+        """
+        fk_values = data[field.object_fk_column]
+        if not pd.api.types.is_float_dtype(fk_values):
+            return data
+        if cls._get_fill_pk_type(field=field) is not int:
+            return data
+
+        not_null = fk_values.notna()
+        if not (fk_values[not_null] % 1 == 0).all():
+            return data
+        data[field.object_fk_column] = fk_values.astype('Int64')\
+            .astype(object).where(not_null, None)
+        return data
+
+    @classmethod
+    def _get_fill_model_name(cls, field: MixinBulkSaveField) -> str:
+        """Return model class name of an autofill field."""
+        if isinstance(field, BulkSaveLocalAutoFillField):
+            return field.cls_fill_model_class.__name__
+        return field.fill_model_class
+
+    @classmethod
+    def _update_fill_map(cls, field: MixinBulkSaveField,
+                         map_fk_fill_data: dict, fetched_data: dict
+                         ) -> None:
+        """Add fetched values to fill map and cache them by their pk."""
+        map_fk_fill_data.update(fetched_data)
+        cls.set_field_cache_many(
+            model_class=cls._get_fill_model_name(field=field),
+            values=fetched_data, field=field.fill_col)
+
+    @classmethod
+    def _fetch_local(cls, field: BulkSaveLocalAutoFillField,
+                     pks: list) -> dict:
+        """Query fill values of local related objects.
+
+        Args:
+            field (BulkSaveLocalAutoFillField):
+                Local autofill definition from the view.
+            pks (list):
+                Primary keys of the related objects.
+
+        Returns:
+            dict:
+                Fill values by pk of the related objects.
+
+        Raises:
+            PumpWoodOtherException:
+                If the related model does not expose `fill_col`.
+        """
+        fetched_data = {}
+        fk_objects = field.cls_fill_model_class.query_list(
+            filter_dict={"id__in": pks})
+        for fk_obj in fk_objects:
+            if not hasattr(fk_obj, field.fill_col):
+                msg = (
+                    "Foreign object [{model_class}] used to fill the "
+                    "value does not have the expected field [{fill_col}]."
+                ).format(
+                    fill_col=field.fill_col,
+                    model_class=field.cls_fill_model_class.__name__)
+                raise PumpWoodOtherException(msg)
+            fetched_data[fk_obj.id] = getattr(fk_obj, field.fill_col)
+        return fetched_data
+
+    @classmethod
+    def _fetch_microservice(cls, fields: list[MixinBulkSaveField],
+                            remote_fetches: list[tuple[int, list]],
+                            microservice: PumpWoodMicroService | None
+                            ) -> list[dict]:
+        """Fetch chunks of remote fill values concurrently.
+
+        Chunks are fetched on a local thread pool with up to
+        `AUTOFILL_N_PARALLEL` threads, or the microservice default.
+        `PumpWoodMicroService.parallel_call` is not used since it writes
+        progress to stdout on each call.
+
+        Args:
+            fields (list[MixinBulkSaveField]):
+                Group of fields being filled.
+            remote_fetches (list[tuple[int, list]]):
+                Index of the field on group and chunk of keys.
+            microservice (PumpWoodMicroService | None):
+                Microservice used for remote autofill lookups.
+
+        Returns:
+            list[dict]:
+                Fill values by pk for each fetch, in the same order.
+        """
+        function_args = [{
+            'model_class': fields[i].fill_model_class,
+            'filter_dict': {"id__in": pks},
+            'fields': ['id', fields[i].fill_col]}
+            for i, pks in remote_fetches]
+        if len(function_args) == 0:
+            return []
+        if len(function_args) == 1:
+            results = [microservice.list_without_pag(**function_args[0])]
+        else:
+            n_parallel = microservice.get_n_parallel(
+                n_parallel=cls.AUTOFILL_N_PARALLEL)
+            max_workers = min(n_parallel, len(function_args))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(
+                    lambda kwargs: microservice.list_without_pag(**kwargs),
+                    function_args))
+        return [
+            {fk_obj['id']: fk_obj[fields[i].fill_col] for fk_obj in result}
+            for (i, _), result in zip(remote_fetches, results)]
+
     @classmethod
     def get_field_cache(
             cls, model_class: str, pk: str | int, field: str) -> Any:
@@ -121,6 +417,57 @@ class FillBulkSaveFields:
         return PumpwoodFlaskGDiskCache.set(
             hash_dict=hash_dict, value=value)
 
+    @classmethod
+    def get_field_cache_many(
+            cls, model_class: str, pks: list[str | int],
+            field: str) -> dict:
+        """Get cached autofill values for many related objects.
+
+        Args:
+            model_class (str):
+                Model class of the objects used to fill values.
+            pks (list[str | int]):
+                Primary keys of the related objects.
+            field (str):
+                Attribute name to read from the cached objects.
+
+        Returns:
+            dict:
+                Cached values by pk, pks not cached are not returned.
+        """
+        hash_dicts = [
+            BulkSaveAutoFillFieldCacheHash(
+                model_class=model_class, pk=pk, field=field)
+            for pk in pks]
+        values = PumpwoodFlaskGDiskCache.get_many(hash_dicts=hash_dicts)
+        return {
+            pk: value for pk, value in zip(pks, values)
+            if value is not None}
+
+    @classmethod
+    def set_field_cache_many(
+            cls, model_class: str, values: dict, field: str) -> bool:
+        """Set cached autofill values for many related objects.
+
+        Args:
+            model_class (str):
+                Model class of the objects used to fill values.
+            values (dict):
+                Values to store by pk of the related object.
+            field (str):
+                Attribute name stored in the cache entries.
+
+        Returns:
+            bool:
+                Value returned by the cache backend after storing.
+        """
+        hash_dicts = [
+            BulkSaveAutoFillFieldCacheHash(
+                model_class=model_class, pk=pk, field=field)
+            for pk in values.keys()]
+        return PumpwoodFlaskGDiskCache.set_many(
+            hash_dicts=hash_dicts, values=list(values.values()))
+
     @classmethod
     def _validate_object_fk_column(
             cls, data: pd.DataFrame, field: MixinBulkSaveField) -> None:
@@ -195,56 +542,7 @@ class FillBulkSaveFields:
             PumpWoodOtherException:
                 If the related model does not expose `fill_col`.
         """
-        cls._validate_object_fk_column(data=data, field=field)
-        unique_fk_columns = data[field.object_fk_column].unique().tolist()
-        map_fk_fill_data = {}
-        missing_cache = []
-
-        # Get data from localcache if avaiable and allowed
-        for fk_pk in unique_fk_columns:
-            if not field.use_cache:
-                missing_cache.append(fk_pk)
-            else:
-                cached_value = cls.get_field_cache(
-                    model_class=field.cls_fill_model_class.__name__,
-                    pk=fk_pk, field=field.fill_col)
-                if cached_value is None:
-                    missing_cache.append(int(fk_pk))
-                else:
-                    map_fk_fill_data[fk_pk] = cached_value
-
-        # Fetch data from database
-        if len(missing_cache) != 0:
-            fk_objects = field.cls_fill_model_class.query_list(
-                filter_dict={"id__in": missing_cache})
-            for fk_obj in fk_objects:
-                if not hasattr(fk_obj, field.fill_col):
-                    msg = (
-                        "Foreign object [{model_class}] used to fill the "
-                        "value does not have the expected field [{fill_col}]."
-                    ).format(
-                        fill_col=field.fill_col,
-                        model_class=field.cls_fill_model_class.__name__)
-                    raise PumpWoodOtherException(msg)
-
-                fk_fill_value = getattr(fk_obj, field.fill_col)
-                map_fk_fill_data[fk_obj.id] = fk_fill_value
-
-                # Set cache
-                cls.set_field_cache(
-                    model_class=field.cls_fill_model_class.__name__,
-                    pk=fk_pk, field=field.fill_col, value=fk_fill_value)
-
-        # Validate if all foreign keys are set on the map dictonary
-        cls.validate_fks(
-            unique_fk_columns=unique_fk_columns,
-            map_fk_fill_data=map_fk_fill_data,
-            related_model_name=field.cls_fill_model_class.__name__,
-            field_name=field.field)
-
-        data[field.field] = \
-            data[field.object_fk_column].map(map_fk_fill_data)
-        return data
+        return cls.fill_group(data=data, fields=[field], microservice=None)
 
     @classmethod
     def fill_auto_microservice(cls, data: pd.DataFrame,
@@ -271,49 +569,8 @@ class FillBulkSaveFields:
                 If `object_fk_column` is missing from the payload or
                 related keys cannot be resolved.
         """
-        cls._validate_object_fk_column(data=data, field=field)
-        unique_fk_columns = data[field.object_fk_column].unique().tolist()
-        map_fk_fill_data = {}
-        missing_cache = []
-
-        # Get data from localcache if avaiable and allowed
-        for fk_pk in unique_fk_columns:
-            if not field.use_cache:
-                missing_cache.append(fk_pk)
-            else:
-                cached_value = cls.get_field_cache(
-                    model_class=field.fill_model_class,
-                    pk=fk_pk, field=field.fill_col)
-                if cached_value is None:
-                    missing_cache.append(fk_pk)
-                else:
-                    map_fk_fill_data[fk_pk] = cached_value
-
-        # Fetch data from database
-        if len(missing_cache) != 0:
-            fk_objects = microservice.list_without_pag(
-                model_class=field.fill_model_class,
-                filter_dict={"id__in": missing_cache},
-                fields=['id', field.fill_col])
-            for fk_obj in fk_objects:
-                fk_fill_value = fk_obj[field.fill_col]
-                map_fk_fill_data[fk_obj['id']] = fk_fill_value
-
-                # Set cache
-                cls.set_field_cache(
-                    model_class=field.fill_model_class,
-                    pk=fk_pk, field=field.fill_col, value=fk_fill_value)
-
-        # Validate if all foreign keys are set on the map dictonary
-        cls.validate_fks(
-            unique_fk_columns=unique_fk_columns,
-            map_fk_fill_data=map_fk_fill_data,
-            related_model_name=field.fill_model_class,
-            field_name=field.field)
-
-        data[field.field] = \
-            data[field.object_fk_column].map(map_fk_fill_data)
-        return data
+        return cls.fill_group(
+            data=data, fields=[field], microservice=microservice)
 
     @classmethod
     def fill_default(cls, data: pd.DataFrame, field: BulkSaveDefaultField
@@ -0,0 +1,464 @@
+"""Coerce and validate bulk save data using model column types."""
+import math
+import decimal
+import numbers
+import numpy as np
+import pandas as pd
+from typing import Any
+from sqlalchemy import inspect as alchemy_inspect
+from sqlalchemy import types as sqltypes
+from pumpwood_communication.exceptions import PumpWoodDataLoadingException
+
+
+class BulkSaveCoerce:
+    """Coerce bulk save columns to the types of the model columns.
+
+    Columns are converted with vectorized pandas functions before data is
+    sent to database, values that can not be converted, nulls on not
+    nullable columns and strings longer than column length are reported
+    together on a compact error report. Columns with types that are not
+    known (`TypeDecorator`, geometry, arrays) are sent as received.
+
+    Integer and decimal columns are parsed with `pd.to_numeric` and
+    validated with vectorized integrality and range masks. Values of
+    object columns with more than `FLOAT_EXACT_LENGTH` characters (big
+    integers, high precision text and decimals) are parsed value by value
+    without passing through float, so they are not rounded. Values that
+    can not be represented exactly are reported.
+
+    Datetimes follow Postgres casts of the received text. On columns with
+    timezone, naive values are kept naive, so database interprets them on
+    the session time zone, and values with offsets are kept as aware
+    timestamps. On naive datetime and date columns offsets are ignored
+    and the wall time is kept.
+    """
+
+    BOOLEAN_VALUES: dict[str, bool] = {
+        'true': True, 't': True, 'yes': True, 'y': True, '1': True,
+        '1.0': True, 'false': False, 'f': False, 'no': False, 'n': False,
+        '0': False, '0.0': False}
+    """Text representation of boolean values."""
+
+    JSON_TYPES: tuple = (dict, list, str, int, float, bool)
+    """Python types accepted on JSON columns."""
+
+    INTEGER_RANGE: tuple[int, int] = (-2 ** 63, 2 ** 63 - 1)
+    """Minimum and maximum values of integer columns."""
+
+    FLOAT_EXACT_LENGTH: int = 15
+    """Maximum number of characters of values parsed through float, text
+       with up to 15 significant digits round trips exactly."""
+
+    N_EXAMPLES: int = 5
+    """Number of invalid rows and values returned on error report."""
+
+    OFFSET_PATTERN: str = (
+        r'(?P<time>[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?)'
+        r'\s*(?:Z|[+-]\d{2}(?::?\d{2})?)$')
+    """Pattern of UTC offsets at the end of ISO 8601 text, only after a
+       time part so date only values are not matched."""
+
+    @classmethod
+    def get_column_kind(cls, column: Any) -> str | None:
+        """Return the coercion associated with column type.
+
+        Args:
+            column (Any):
+                SQLAlchemy table column.
+
+        Returns:
+            str | None:
+                `integer`, `float`, `decimal`, `boolean`, `datetime`,
+                `date`, `json` or `string`, None if column is not
+                coerced.
+        """
+        column_type = column.type
+        if isinstance(column_type, sqltypes.TypeDecorator):
+            return None
+        if isinstance(column_type, sqltypes.Integer):
+            return 'integer'
+        if isinstance(column_type, sqltypes.Float):
+            return 'float'
+        if isinstance(column_type, sqltypes.Numeric):
+            return 'decimal' if column_type.asdecimal else 'float'
+        if isinstance(column_type, sqltypes.Boolean):
+            return 'boolean'
+        if isinstance(column_type, sqltypes.DateTime):
+            return 'datetime'
+        if isinstance(column_type, sqltypes.Date):
+            return 'date'
+        if isinstance(column_type, sqltypes.JSON):
+            return 'json'
+        if isinstance(column_type, sqltypes.String):
+            return 'string'
+        return None
+
+    @classmethod
+    def _to_object(cls, values: pd.Series, is_null: pd.Series) -> pd.Series:
+        """Convert series to object with None on null values."""
+        return values.astype(object).where(~is_null, None)
+
+    @classmethod
+    def _get_exact_mask(cls, values: pd.Series,
+                        is_null: pd.Series) -> pd.Series:
+        """Return mask of values that must not be parsed through float.
+
+        Only object columns may hold values that float does not represent
+        exactly, they are found by the length of their text.
+
+        Args:
+            values (pd.Series):
+                Column values received on bulk save.
+            is_null (pd.Series):
+                Mask of null values.
+
+        Returns:
+            pd.Series:
+                True for not null values with more than
+                `FLOAT_EXACT_LENGTH` characters on object columns.
+        """
+        if values.dtype != object:
+            return pd.Series(False, index=values.index)
+        text_length = values.astype(str).str.strip().str.len()
+        return (text_length > cls.FLOAT_EXACT_LENGTH) & ~is_null
+
+    @classmethod
+    def _to_numeric(cls, values: pd.Series, mask: pd.Series) -> pd.Series:
+        """Parse values of mask with `pd.to_numeric`, NaN elsewhere."""
+        numeric = pd.to_numeric(values.where(mask), errors='coerce')
+        if pd.api.types.is_bool_dtype(numeric):
+            numeric = numeric.astype('int64')
+        return numeric
+
+    @classmethod
+    def _coerce_integer(cls, values: pd.Series, is_null: pd.Series
+                        ) -> pd.Series:
+        """Coerce values to Python integers.
+
+        Args:
+            values (pd.Series):
+                Column values received on bulk save.
+            is_null (pd.Series):
+                Mask of null values.
+
+        Returns:
+            pd.Series:
+                Object series with integers, None for null and invalid
+                values.
+        """
+        exact = cls._get_exact_mask(values=values, is_null=is_null)
+        numeric = cls._to_numeric(values=values, mask=~exact & ~is_null)
+        if pd.api.types.is_integer_dtype(numeric):
+            valid = numeric.notna()
+        else:
+            # Upper bound is exclusive since float(2 ** 63 - 1) is 2 ** 63
+            valid = (
+                np.isfinite(numeric) & (numeric % 1 == 0) &
+                (cls.INTEGER_RANGE[0] <= numeric) &
+                (numeric < float(cls.INTEGER_RANGE[1] + 1)))
+
+        # Values are set on an object array, pandas would cast integers
+        # to float when setting them on a series with nulls
+        coerced = np.full(len(values), None, dtype=object)
+        coerced[valid.to_numpy()] = numeric[valid].astype('int64')\
+            .to_numpy(dtype=object)
+        if exact.any():
+            coerced[exact.to_numpy()] = [
+                cls._parse_integer(value=x) for x in values[exact]]
+        return pd.Series(coerced, index=values.index, dtype=object)
+
+    @classmethod
+    def _coerce_decimal(cls, values: pd.Series, is_null: pd.Series,
+                        precision: int | None, scale: int | None
+                        ) -> pd.Series:
+        """Coerce values to decimals.
+
+        Args:
+            values (pd.Series):
+                Column values received on bulk save.
+            is_null (pd.Series):
+                Mask of null values.
+            precision (int | None):
+                Precision of the column, None if not limited.
+            scale (int | None):
+                Scale of the column.
+
+        Returns:
+            pd.Series:
+                Object series with decimals, None for null and invalid
+                values.
+        """
+        exact = cls._get_exact_mask(values=values, is_null=is_null)
+        numeric = cls._to_numeric(values=values, mask=~exact & ~is_null)
+        valid = numeric.notna() & np.isfinite(numeric.astype(float))
+        if precision is not None:
+            integer_digits = precision - (scale or 0)
+            valid = valid & (numeric.abs() < 10.0 ** integer_digits)
+
+        # Float text representation is the shortest that round trips
+        coerced = np.full(len(values), None, dtype=object)
+        coerced[valid.to_numpy()] = numeric[valid].astype(str)\
+            .map(decimal.Decimal).to_numpy(dtype=object)
+        if exact.any():
+            coerced[exact.to_numpy()] = [
+                cls._parse_decimal(
+                    value=x, precision=precision, scale=scale)
+                for x in values[exact]]
+        return pd.Series(coerced, index=values.index, dtype=object)
+
+    @classmethod
+    def _parse_integer(cls, value: Any) -> int | None:
+        """Parse a value as an exact integer.
+
+        Args:
+            value (Any):
+                Value received on bulk save, not null.
+
+        Returns:
+            int | None:
+                Integer value, None if value is not integral or is out of
+                `INTEGER_RANGE`.
+        """
+        if isinstance(value, numbers.Integral):
+            parsed = int(value)
+        elif isinstance(value, float):
+            if not math.isfinite(value) or not value.is_integer():
+                return None
+            parsed = int(value)
+        else:
+            try:
+                number = decimal.Decimal(str(value).strip())
+            except decimal.InvalidOperation:
+                return None
+            if not number.is_finite() or number != number.to_integral():
+                return None
+            parsed = int(number)
+        if not cls.INTEGER_RANGE[0] <= parsed <= cls.INTEGER_RANGE[1]:
+            return None
+        return parsed
+
+    @classmethod
+    def _parse_decimal(cls, value: Any, precision: int | None,
+                       scale: int | None) -> decimal.Decimal | None:
+        """Parse a value as a decimal keeping all its digits.
+
+        Args:
+            value (Any):
+                Value received on bulk save, not null.
+            precision (int | None):
+                Precision of the column, None if not limited.
+            scale (int | None):
+                Scale of the column.
+
+        Returns:
+            decimal.Decimal | None:
+                Decimal value, None if value is not a finite number or
+                has more integer digits than the column accepts.
+        """
+        if isinstance(value, bool):
+            value = int(value)
+        try:
+            # Float text representation is the shortest that round trips
+            number = decimal.Decimal(str(value).strip())
+        except decimal.InvalidOperation:
+            return None
+        if not number.is_finite():
+            return None
+        if precision is not None and number != 0:
+            integer_digits = precision - (scale or 0)
+            if number.adjusted() + 1 > integer_digits:
+                return None
+        return number
+
+    @classmethod
+    def _coerce_datetime(cls, values: pd.Series,
+                         timezone: bool) -> pd.Series:
+        """Parse ISO 8601 datetimes as Postgres casts them.
+
+        Args:
+            values (pd.Series):
+                Column values received on bulk save, text or datetimes.
+            timezone (bool):
+                If column type has timezone.
+
+        Returns:
+            pd.Series:
+                Datetime series with wall time of values if `timezone` is
+                False. If True, an object series with naive timestamps for
+                naive values and UTC timestamps for values with offsets.
+        """
+        is_str = values.map(lambda x: isinstance(x, str))
+        is_aware = values.map(
+            lambda x: getattr(x, 'tzinfo', None) is not None)
+        text = values.where(is_str, '').astype(str).str.strip()
+        wall_text = text.str.replace(
+            cls.OFFSET_PATTERN, r'\g<time>', regex=True)
+        has_offset = (wall_text != text) | is_aware
+
+        # Remove offsets keeping wall time of the values
+        wall_values = values.where(
+            ~is_aware, values[is_aware].map(lambda x: x.replace(tzinfo=None)))
+        wall_values = wall_values.where(~is_str, wall_text)
+        parsed = pd.to_datetime(
+            wall_values, errors='coerce', format='ISO8601')
+        if not timezone or not has_offset.any():
+            return parsed
+
+        aware = pd.to_datetime(
+            values[has_offset], errors='coerce', format='ISO8601',
+            utc=True)
+        parsed = parsed.astype(object)
+        parsed[has_offset] = aware.astype(object)
+        return parsed
+
+    @classmethod
+    def coerce_column(cls, values: pd.Series, column: Any, kind: str
+                      ) -> tuple[pd.Series, pd.Series, str | None]:
+        """Coerce one column.
+
+        Args:
+            values (pd.Series):
+                Column values received on bulk save.
+            column (Any):
+                SQLAlchemy table column.
+            kind (str):
+                Value returned by `get_column_kind`.
+
+        Returns:
+            tuple[pd.Series, pd.Series, str | None]:
+                Coerced values, mask of invalid values and error type.
+        """
+        is_null = values.isna()
+        if kind == 'integer':
+            if pd.api.types.is_integer_dtype(values.dtype):
+                return cls._to_object(values, is_null), \
+                    pd.Series(False, index=values.index), None
+            coerced = cls._coerce_integer(values=values, is_null=is_null)
+            return cls._to_object(coerced, coerced.isna()), \
+                coerced.isna() & ~is_null, 'invalid'
+        if kind == 'decimal':
+            precision = column.type.precision
+            scale = column.type.scale
+            coerced = cls._coerce_decimal(
+                values=values, is_null=is_null, precision=precision,
+                scale=scale)
+            return cls._to_object(coerced, coerced.isna()), \
+                coerced.isna() & ~is_null, 'invalid'
+        if kind == 'float':
+            coerced = pd.to_numeric(values, errors='coerce')
+            return coerced, coerced.isna() & ~is_null, 'invalid'
+        if kind == 'boolean':
+            if pd.api.types.is_bool_dtype(values):
+                return values, pd.Series(False, index=values.index), None
+            coerced = values.astype(str).str.strip().str.lower()\
+                .map(cls.BOOLEAN_VALUES)
+            return cls._to_object(coerced, coerced.isna()), \
+                coerced.isna() & ~is_null, 'invalid'
+        if kind in ['datetime', 'date']:
+            timezone = getattr(column.type, 'timezone', False)
+            coerced = cls._coerce_datetime(values=values, timezone=timezone)
+            invalid = coerced.isna() & ~is_null
+            if kind == 'date':
+                coerced = pd.to_datetime(coerced).dt.date
+            return cls._to_object(coerced, coerced.isna()), invalid, \
+                'invalid'
+        if kind == 'json':
+            invalid = ~values.map(
+                lambda x: isinstance(x, cls.JSON_TYPES)) & ~is_null
+            return values, invalid, 'invalid'
+        if kind == 'string':
+            length = getattr(column.type, 'length', None)
+            if length is None:
+                return values, pd.Series(False, index=values.index), None
+            is_str = values.map(lambda x: isinstance(x, str))
+            too_long = values.where(is_str, '').str.len() > length
+            return values, too_long, 'length'
+        return values, pd.Series(False, index=values.index), None
+
+    @classmethod
+    def _error_entry(cls, values: pd.Series, mask: pd.Series, column: str,
+                     kind: str, error: str) -> dict:
+        """Build compact report of invalid rows of a column."""
+        examples = values[mask].head(cls.N_EXAMPLES)
+        return {
+            'column': column, 'type': kind, 'error': error,
+            'n_rows': int(mask.sum()),
+            'rows': examples.index.tolist(),
+            'values': [str(x) for x in examples.tolist()]}
+
+    @classmethod
+    def run(cls, model_class: Any, data: pd.DataFrame
+            ) -> tuple[pd.DataFrame, list[dict]]:
+        """Coerce data columns and return invalid values report.
+
+        Args:
+            model_class (Any):
+                SQLAlchemy model of the view.
+            data (pd.DataFrame):
+                Bulk save data returned by `FillBulkSaveFields.run`.
+
+        Returns:
+            tuple[pd.DataFrame, list[dict]]:
+                Coerced data and list of errors by column, with `column`,
+                `type`, `error` (`invalid`, `length` or `null`),
+                `n_rows` and examples of invalid `rows` and `values`.
+        """
+        mapper = alchemy_inspect(model_class)
+        coerced_data = data.copy()
+        errors = []
+        for attribute in mapper.column_attrs:
+            if attribute.key not in data.columns:
+                continue
+            column = attribute.columns[0]
+            values = data[attribute.key]
+            kind = cls.get_column_kind(column=column)
+            if kind is not None:
+                coerced, invalid, error = cls.coerce_column(
+                    values=values, column=column, kind=kind)
+                coerced_data[attribute.key] = coerced
+                if invalid.any():
+                    errors.append(cls._error_entry(
+                        values=values, mask=invalid, column=attribute.key,
+                        kind=kind, error=error))
+
+            # Autoincrement primary keys may be sent as null
+            is_autoincrement = (
+                column.primary_key and
+                column is column.table.autoincrement_column)
+            if not column.nullable and not is_autoincrement:
+                is_null = values.isna()
+                if is_null.any():
+                    errors.append(cls._error_entry(
+                        values=values, mask=is_null, column=attribute.key,
+                        kind=kind, error='null'))
+        return coerced_data, errors
+
+    @classmethod
+    def coerce(cls, model_class: Any, data: pd.DataFrame) -> pd.DataFrame:
+        """Coerce data columns raising the report if values are invalid.
+
+        Args:
+            model_class (Any):
+                SQLAlchemy model of the view.
+            data (pd.DataFrame):
+                Bulk save data returned by `FillBulkSaveFields.run`.
+
+        Returns:
+            pd.DataFrame:
+                Data with columns converted to model column types.
+
+        Raises:
+            PumpWoodDataLoadingException:
+                If any value can not be converted, is null on a not
+                nullable column or is longer than column length.
+        """
+        coerced_data, errors = cls.run(model_class=model_class, data=data)
+        if len(errors) != 0:
+            msg = (
+                "Bulk save data has invalid values on columns {columns}, "
+                "check 'errors' for the rows of each column")
+            raise PumpWoodDataLoadingException(
+                message=msg, payload={
+                    "columns": [x['column'] for x in errors],
+                    "errors": errors})
+        return coerced_data
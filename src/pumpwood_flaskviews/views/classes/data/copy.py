@@ -0,0 +1,273 @@
+"""Insert bulk save data using Postgres `COPY ... FROM STDIN`."""
+import io
+import pandas as pd
+from typing import Any
+from loguru import logger
+from sqlalchemy import inspect as alchemy_inspect
+from sqlalchemy import types as sqltypes
+from sqlalchemy import Table, Column, MetaData, select
+from sqlalchemy.dialects import postgresql
+
+
+class BulkSaveCopy:
+    """Stream validated bulk save data to Postgres using COPY.
+
+    Data is written on an in-memory CSV buffer and sent using the raw
+    psycopg connection of the session, so it is inserted on the same
+    transaction of the request. COPY does not run SQLAlchemy bind
+    processors and Python side defaults, so it is used only if all columns
+    have plain types and columns missing on data do not have Python side
+    defaults other than scalars, which are filled on the buffer.
+    """
+
+    DRIVERS: list[str] = ['psycopg2', 'psycopg']
+    """Postgres drivers with COPY support."""
+
+    NULL: str = '\\N'
+    """String used to represent null values on CSV buffer."""
+
+    TYPES: tuple = (
+        sqltypes.Integer, sqltypes.Float, sqltypes.Numeric,
+        sqltypes.String, sqltypes.Boolean, sqltypes.Date,
+        sqltypes.DateTime, sqltypes.Time, sqltypes.Uuid)
+    """Column types that can be written as text on CSV buffer."""
+
+    @classmethod
+    def is_available(cls, session, model_class: Any) -> bool:
+        """Check if database driver of the model supports COPY.
+
+        Args:
+            session:
+                SQLAlchemy session used on the request.
+            model_class (Any):
+                SQLAlchemy model of the view.
+
+        Returns:
+            bool:
+                True if model database is Postgres connected using psycopg.
+        """
+        dialect = session.get_bind(
+            mapper=alchemy_inspect(model_class)).dialect
+        return dialect.name == 'postgresql' and dialect.driver in cls.DRIVERS
+
+    @classmethod
+    def get_copy_columns(cls, model_class: Any,
+                         data: pd.DataFrame) -> dict[str, Any] | None:
+        """Map data columns to table columns if they can be copied.
+
+        Args:
+            model_class (Any):
+                SQLAlchemy model of the view.
+            data (pd.DataFrame):
+                Validated bulk save data.
+
+        Returns:
+            dict[str, Any] | None:
+                Table columns by model attribute key, including columns
+                missing on data with scalar defaults, or None if data must
+                be inserted using `bulk_insert_mappings`.
+        """
+        mapper = alchemy_inspect(model_class)
+        copy_columns = {}
+        for attribute in mapper.column_attrs:
+            column = attribute.columns[0]
+            is_type_decorator = isinstance(
+                column.type, sqltypes.TypeDecorator)
+            if attribute.key in data.columns:
+                if is_type_decorator or not isinstance(
+                        column.type, cls.TYPES):
+                    logger.info(
+                        "Column [{}] can not be copied, using insert "
+                        "mappings".format(attribute.key))
+                    return None
+                copy_columns[attribute.key] = column
+                continue
+
+            # Python side defaults are not applied by COPY
+            default = column.default
+            if default is None:
+                continue
+            if not getattr(default, 'is_scalar', False):
+                logger.info(
+                    "Column [{}] has a non scalar Python default, using "
+                    "insert mappings".format(attribute.key))
+                return None
+            if is_type_decorator or not isinstance(column.type, cls.TYPES):
+                return None
+            copy_columns[attribute.key] = column
+        return copy_columns
+
+    @classmethod
+    def to_buffer(cls, data: pd.DataFrame,
+                  copy_columns: dict[str, Any]) -> io.StringIO:
+        """Write data on a CSV buffer with columns in copy order.
+
+        Args:
+            data (pd.DataFrame):
+                Validated bulk save data.
+            copy_columns (dict[str, Any]):
+                Columns returned by `get_copy_columns`.
+
+        Returns:
+            io.StringIO:
+                Buffer positioned at the start.
+        """
+        copy_data = pd.DataFrame(index=data.index)
+        for key, column in copy_columns.items():
+            if key in data.columns:
+                values = data[key]
+            else:
+                values = pd.Series(
+                    column.default.arg, index=data.index, dtype=object)
+
+            # Integer columns with nulls are float on pandas, coerced
+            # columns are objects with exact integers written as received
+            is_integer = isinstance(column.type, sqltypes.Integer)
+            if is_integer and pd.api.types.is_float_dtype(values):
+                values = values.astype('Int64')
+            copy_data[key] = values
+
+        buffer = io.StringIO()
+        copy_data.to_csv(
+            buffer, index=False, header=False, na_rep=cls.NULL)
+        buffer.seek(0)
+        return buffer
+
+    @classmethod
+    def copy(cls, session, model_class: Any, data: pd.DataFrame) -> bool:
+        """Insert data using COPY on session transaction.
+
+        Args:
+            session:
+                SQLAlchemy session used on the request.
+            model_class (Any):
+                SQLAlchemy model of the view.
+            data (pd.DataFrame):
+                Validated bulk save data.
+
+        Returns:
+            bool:
+                True if data was inserted, False if COPY is not available
+                and data must be inserted using `bulk_insert_mappings`.
+        """
+        if not cls.is_available(session=session, model_class=model_class):
+            return False
+        copy_columns = cls.get_copy_columns(
+            model_class=model_class, data=data)
+        if copy_columns is None:
+            return False
+        if len(data) == 0:
+            return True
+
+        connection = session.connection(
+            bind_arguments={'mapper': alchemy_inspect(model_class)})
+        preparer = connection.dialect.identifier_preparer
+        cls._copy_buffer(
+            connection=connection,
+            table_name=preparer.format_table(model_class.__table__),
+            data=data, copy_columns=copy_columns)
+        return True
+
+    @classmethod
+    def _copy_buffer(cls, connection, table_name: str, data: pd.DataFrame,
+                     copy_columns: dict[str, Any]) -> None:
+        """Send data to a table using COPY on the raw connection.
+
+        Args:
+            connection:
+                SQLAlchemy connection of the session transaction.
+            table_name (str):
+                Quoted name of the table receiving data.
+            data (pd.DataFrame):
+                Validated bulk save data.
+            copy_columns (dict[str, Any]):
+                Columns returned by `get_copy_columns`.
+        """
+        preparer = connection.dialect.identifier_preparer
+        sql = "COPY {table} ({columns}) FROM STDIN WITH " \
+            "(FORMAT csv, NULL '{null}')".format(
+                table=table_name,
+                columns=", ".join([
+                    preparer.quote(column.name)
+                    for column in copy_columns.values()]),
+                null=cls.NULL)
+        buffer = cls.to_buffer(data=data, copy_columns=copy_columns)
+
+        dbapi_connection = connection.connection.dbapi_connection
+        with dbapi_connection.cursor() as cursor:
+            if hasattr(cursor, 'copy_expert'):
+                cursor.copy_expert(sql, buffer)
+            else:
+                with cursor.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
+
+    @classmethod
+    def upsert(cls, session, model_class: Any, data: pd.DataFrame,
+               conflict_columns: list[str]) -> bool:
+        """Upsert data using COPY to a staging table on session transaction.
+
+        Data is copied to a temporary table created like the model table
+        and moved using `INSERT ... SELECT ... ON CONFLICT DO UPDATE`,
+        columns present on data and not on conflict target are updated.
+
+        Args:
+            session:
+                SQLAlchemy session used on the request.
+            model_class (Any):
+                SQLAlchemy model of the view.
+            data (pd.DataFrame):
+                Validated bulk save data.
+            conflict_columns (list[str]):
+                Attributes of the conflict target.
+
+        Returns:
+            bool:
+                True if data was upserted, False if COPY is not available
+                and data must be upserted using executemany.
+        """
+        if not cls.is_available(session=session, model_class=model_class):
+            return False
+        copy_columns = cls.get_copy_columns(
+            model_class=model_class, data=data)
+        if copy_columns is None:
+            return False
+        if len(data) == 0:
+            return True
+
+        connection = session.connection(
+            bind_arguments={'mapper': alchemy_inspect(model_class)})
+        preparer = connection.dialect.identifier_preparer
+        table_name = preparer.format_table(model_class.__table__)
+        staging_table = Table(
+            "pumpwood_upsert_{}".format(model_class.__table__.name),
+            MetaData(), *[
+                Column(column.name, column.type)
+                for column in copy_columns.values()])
+        staging_name = preparer.format_table(staging_table)
+        columns = [column.name for column in copy_columns.values()]
+        conflict = [copy_columns[key].name for key in conflict_columns]
+        update = [
+            column.name for key, column in copy_columns.items()
+            if key in data.columns and key not in conflict_columns]
+
+        connection.exec_driver_sql(
+            "CREATE TEMP TABLE {staging} (LIKE {table} INCLUDING DEFAULTS) "
+            "ON COMMIT DROP".format(staging=staging_name, table=table_name))
+        cls._copy_buffer(
+            connection=connection, table_name=staging_name, data=data,
+            copy_columns=copy_columns)
+        insert_statement = postgresql.insert(model_class.__table__)\
+            .from_select(columns, select(*[
+                staging_table.c[column] for column in columns]))
+        if len(update) == 0:
+            insert_statement = insert_statement.on_conflict_do_nothing(
+                index_elements=conflict)
+        else:
+            insert_statement = insert_statement.on_conflict_do_update(
+                index_elements=conflict, set_={
+                    column: insert_statement.excluded[column]
+                    for column in update})
+        connection.execute(insert_statement)
+        connection.exec_driver_sql(
+            "DROP TABLE {staging}".format(staging=staging_name))
+        return True
@@ -0,0 +1,165 @@
+"""Remove bulk save rows duplicated on payload or already on table."""
+import uuid
+import pandas as pd
+from typing import Any
+from sqlalchemy import (
+    inspect as alchemy_inspect, Table, Column, MetaData, select, exists,
+    and_, literal)
+from pumpwood_communication import exceptions
+from pumpwood_flaskviews.views.classes.data.upsert import BulkSaveUpsert
+
+
+class BulkSaveDedupe:
+    """Deduplicate bulk save data on key columns.
+
+    Rows with repeated keys on payload are dropped, keys are then loaded
+    on a temporary table and rows whose keys already exist on the model
+    table are removed with an anti-join, so only new rows are inserted.
+    Keys on nullable columns are compared with `IS NOT DISTINCT FROM`, so
+    null keys match, and other columns with `=`, which Postgres can use on
+    index and hash joins.
+    """
+
+    @classmethod
+    def get_key_columns(cls, model_class: Any, data: pd.DataFrame,
+                        dedupe_columns: list[str] | None) -> list[str]:
+        """Return columns used to identify duplicated rows.
+
+        Args:
+            model_class (Any):
+                SQLAlchemy model of the view.
+            data (pd.DataFrame):
+                Validated bulk save data.
+            dedupe_columns (list[str] | None):
+                Columns set on request, if None primary key or unique
+                constraint columns present on data are used, else all
+                data columns.
+
+        Returns:
+            list[str]:
+                Attribute keys used on deduplication.
+
+        Raises:
+            PumpWoodWrongParameters:
+                If dedupe columns are not model columns present on data.
+        """
+        if dedupe_columns is not None:
+            column_keys = {
+                attribute.key
+                for attribute in alchemy_inspect(model_class).column_attrs}
+            missing_columns = []
+            if isinstance(dedupe_columns, list):
+                missing_columns = \
+                    set(dedupe_columns) - (set(data.columns) & column_keys)
+            if not isinstance(dedupe_columns, list) or \
+                    len(dedupe_columns) == 0 or len(missing_columns) != 0:
+                msg = (
+                    "dedupe_columns must be a non empty list of model "
+                    "columns present on data, missing {missing}")
+                raise exceptions.PumpWoodWrongParameters(
+                    message=msg, payload={
+                        "missing": sorted(missing_columns)})
+            return dedupe_columns
+        try:
+            return BulkSaveUpsert.get_conflict_columns(
+                model_class=model_class, data=data, conflict_columns=None)
+        except exceptions.PumpWoodWrongParameters:
+            return list(data.columns)
+
+    @classmethod
+    def drop_payload_duplicates(cls, data: pd.DataFrame,
+                                key_columns: list[str],
+                                keep: str) -> pd.DataFrame:
+        """Drop rows with repeated keys.
+
+        Args:
+            data (pd.DataFrame):
+                Validated bulk save data.
+            key_columns (list[str]):
+                Columns returned by `get_key_columns`.
+            keep (str):
+                `first` or `last`, row kept for each repeated key.
+
+        Returns:
+            pd.DataFrame:
+                Data without repeated keys.
+        """
+        return data.drop_duplicates(subset=key_columns, keep=keep)
+
+    @classmethod
+    def existing_keys_query(cls, model_columns: list[Column],
+                            temp_columns: list[Column]) -> Any:
+        """Return query of keys on temporary table present on model table.
+
+        Args:
+            model_columns (list[Column]):
+                Key columns of model table.
+            temp_columns (list[Column]):
+                Key columns of temporary table, same order of
+                `model_columns`.
+
+        Returns:
+            Any:
+                SQLAlchemy select of temporary table keys.
+        """
+        key_filters = [
+            model_col.is_not_distinct_from(temp_col)
+            if model_col.nullable else model_col == temp_col
+            for model_col, temp_col in zip(model_columns, temp_columns)]
+        return select(*temp_columns).where(exists(
+            select(literal(1)).where(and_(*key_filters))))
+
+    @classmethod
+    def drop_existing(cls, session, model_class: Any, data: pd.DataFrame,
+                      key_columns: list[str]) -> pd.DataFrame:
+        """Drop rows whose keys already exist on model table.
+
+        Keys are inserted on a temporary table on session transaction and
+        the existing ones are selected with an `EXISTS` join against the
+        model table.
+
+        Args:
+            session:
+                SQLAlchemy session used on the request.
+            model_class (Any):
+                SQLAlchemy model of the view.
+            data (pd.DataFrame):
+                Validated bulk save data without repeated keys.
+            key_columns (list[str]):
+                Columns returned by `get_key_columns`.
+
+        Returns:
+            pd.DataFrame:
+                Rows with keys not present on model table.
+        """
+        if len(data) == 0:
+            return data
+
+        mapper = alchemy_inspect(model_class)
+        model_columns = [
+            mapper.column_attrs[key].columns[0] for key in key_columns]
+        temp_table = Table(
+            "pumpwood_dedupe_{}".format(uuid.uuid4().hex), MetaData(),
+            *[Column(col.name, col.type) for col in model_columns],
+            prefixes=['TEMPORARY'], postgresql_on_commit='DROP')
+        temp_columns = [temp_table.c[col.name] for col in model_columns]
+
+        # Table is not dropped on errors, since the transaction may be
+        # aborted, it is removed with the rollback on Postgres
+        connection = session.connection(bind_arguments={'mapper': mapper})
+        temp_table.create(connection)
+        key_data = data[key_columns].astype(object)\
+            .where(data[key_columns].notna(), None)
+        key_data.columns = [col.name for col in model_columns]
+        connection.execute(temp_table.insert(), key_data.to_dict('records'))
+        existing_query = cls.existing_keys_query(
+            model_columns=model_columns, temp_columns=temp_columns)
+        existing_keys = pd.DataFrame(
+            connection.execute(existing_query).all(), columns=key_columns)
+        temp_table.drop(connection)
+
+        if len(existing_keys) == 0:
+            return data
+        existing_index = pd.MultiIndex.from_frame(existing_keys)
+        data_index = pd.MultiIndex.from_frame(data[key_columns])
+        return data[~data_index.isin(existing_index)]
@@ -0,0 +1,490 @@
+"""Run bulk save requests as background jobs."""
+import os
+import uuid
+import shutil
+import socket
+import datetime
+import threading
+import orjson
+from typing import Any, Callable
+from concurrent.futures import ThreadPoolExecutor
+from loguru import logger
+from flask import g, current_app
+from sqlalchemy import (
+    MetaData, Table, Column, String, Text, DateTime, select, update,
+    delete)
+from pumpwood_communication import exceptions
+from pumpwood_communication.serializers import pumpJsonDump
+from pumpwood_flaskviews.config import (
+    BULK_SAVE_JOB_SPOOL_PATH, BULK_SAVE_JOB_MAX_WORKERS,
+    BULK_SAVE_JOB_STATUS_EXPIRE)
+from pumpwood_flaskviews.auth import AuthFactory
+from pumpwood_flaskviews.views.classes.aux import AuxPartitionSplit
+
+
+class BulkSaveJob:
+    """Spool bulk save bodies to disk and save them on a worker pool.
+
+    Jobs run on a thread pool of the process that received the request,
+    inside an application context of the app. The request is finished
+    when jobs run, so the state they need (`g` attributes and the
+    authorization header) is passed explicitly to the worker. Job status is
+    stored on `pumpwood_bulk_save_job` table of the primary database
+    using its own connection, so it can be queried from any host and is
+    kept if the cache is disabled. The table is not created by the
+    library, it must be registered on the service metadata with
+    `build_table` and created by the service migrations.
+
+    Bodies are spooled to a directory of the process. Jobs are lost if
+    the process stops, when the worker pool of a new process is created
+    spool directories of stopped processes of the host are removed and
+    their queued or running jobs are set as failed.
+    """
+
+    STATUS_QUEUED: str = 'queued'
+    """Job is waiting for a worker."""
+    STATUS_RUNNING: str = 'running'
+    """Job is saving data."""
+    STATUS_FINISHED: str = 'finished'
+    """All chunks were processed, failed chunks are on the report."""
+    STATUS_FAILED: str = 'failed'
+    """Job stopped with an error before processing all chunks."""
+
+    _executor: ThreadPoolExecutor = None
+    """Worker pool created on first job."""
+    _executor_lock: threading.Lock = threading.Lock()
+    """Lock to create worker pool once."""
+    TABLE_NAME: str = 'pumpwood_bulk_save_job'
+    """Name of the table storing job status."""
+
+    @classmethod
+    def build_table(cls, metadata: MetaData) -> Table:
+        """Register job status table on the service metadata.
+
+        It must be called where the service models are declared, so the
+        table is created by the service migrations (Alembic autogenerate
+        will include it) and is not dropped by them.
+
+        Args:
+            metadata (MetaData):
+                Metadata of the service models, usually `db.metadata`.
+
+        Returns:
+            Table:
+                Table storing the status of bulk save jobs as JSON text.
+        """
+        table = metadata.tables.get(cls.TABLE_NAME)
+        if table is not None:
+            return table
+        return Table(
+            cls.TABLE_NAME, metadata,
+            Column('job_id', String(32), primary_key=True),
+            Column('model_class', String(256), nullable=False),
+            Column('status', Text, nullable=False),
+            Column(
+                'updated_at', DateTime(timezone=True), nullable=False,
+                index=True))
+
+    @classmethod
+    def get_table(cls, metadata: MetaData) -> Table:
+        """Return job status table registered on the service metadata.
+
+        Args:
+            metadata (MetaData):
+                Metadata of the view model class.
+
+        Returns:
+            Table:
+                Job status table.
+
+        Raises:
+            PumpWoodNotImplementedError:
+                If table was not registered with `build_table`.
+        """
+        table = metadata.tables.get(cls.TABLE_NAME)
+        if table is None:
+            msg = (
+                "Asynchronous bulk save needs table [{table}] registered "
+                "on service metadata with BulkSaveJob.build_table")
+            raise exceptions.PumpWoodNotImplementedError(
+                message=msg, payload={"table": cls.TABLE_NAME})
+        return table
+
+    @staticmethod
+    def _now() -> datetime.datetime:
+        """Return current UTC time as an aware datetime."""
+        return datetime.datetime.now(datetime.timezone.utc)
+
+    @classmethod
+    def get_executor(cls, engine: Any, table: Table) -> ThreadPoolExecutor:
+        """Return the process worker pool.
+
+        Spool directories of stopped processes are cleaned when the pool
+        is created.
+
+        Args:
+            engine (Any):
+                SQLAlchemy engine of the primary database.
+            table (Table):
+                Job status table, see `get_table`.
+
+        Returns:
+            ThreadPoolExecutor:
+                Pool with `BULK_SAVE_JOB_MAX_WORKERS` threads.
+        """
+        if cls._executor is None:
+            with cls._executor_lock:
+                if cls._executor is None:
+                    cls.clean_spool(engine=engine, table=table)
+                    cls._executor = ThreadPoolExecutor(
+                        max_workers=BULK_SAVE_JOB_MAX_WORKERS,
+                        thread_name_prefix='pumpwood-bulk-save')
+        return cls._executor
+
+    @staticmethod
+    def _get_spool_prefix() -> str:
+        """Return prefix of the spool directories of the host."""
+        return '{}-'.format(socket.gethostname())
+
+    @classmethod
+    def get_spool_path(cls) -> str:
+        """Return spool directory of the process.
+
+        Returns:
+            str:
+                Directory named with host name and process id.
+        """
+        return os.path.join(
+            BULK_SAVE_JOB_SPOOL_PATH,
+            '{}{}'.format(cls._get_spool_prefix(), os.getpid()))
+
+    @staticmethod
+    def _is_process_alive(pid: int) -> bool:
+        """Check if a process of the host is running."""
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    @classmethod
+    def clean_spool(cls, engine: Any, table: Table) -> list[str]:
+        """Remove spool directories of stopped processes of the host.
+
+        Spool directory of the current process is also cleaned, since
+        it is called before the process submits any job. Queued or
+        running jobs with spooled bodies on removed directories are set
+        as failed.
+
+        Args:
+            engine (Any):
+                SQLAlchemy engine of the primary database.
+            table (Table):
+                Job status table, see `get_table`.
+
+        Returns:
+            list[str]:
+                Identifiers of the jobs set as failed.
+        """
+        if not os.path.isdir(BULK_SAVE_JOB_SPOOL_PATH):
+            return []
+
+        prefix = cls._get_spool_prefix()
+        lost_job_ids = []
+        for name in os.listdir(BULK_SAVE_JOB_SPOOL_PATH):
+            pid = name[len(prefix):]
+            if not name.startswith(prefix) or not pid.isdigit():
+                continue
+            if int(pid) != os.getpid() and cls._is_process_alive(int(pid)):
+                continue
+
+            path = os.path.join(BULK_SAVE_JOB_SPOOL_PATH, name)
+            lost_job_ids.extend(os.listdir(path))
+            shutil.rmtree(path, ignore_errors=True)
+
+        failed_job_ids = []
+        for job_id in lost_job_ids:
+            status = cls._read_status(
+                engine=engine, table=table, job_id=job_id)
+            if status is None or status['status'] not in [
+                    cls.STATUS_QUEUED, cls.STATUS_RUNNING]:
+                continue
+            logger.warning(
+                "Bulk save job [{}] was lost on process stop".format(job_id))
+            status.update({
+                'status': cls.STATUS_FAILED,
+                'finished_at': cls._now().isoformat(),
+                'error': {
+                    'type': 'PumpWoodException',
+                    'message': 'Job was lost when its process stopped'}})
+            cls.set_status(engine=engine, table=table, status=status)
+            failed_job_ids.append(job_id)
+        return failed_job_ids
+
+    @classmethod
+    def spool(cls, stream: Any, job_id: str) -> str:
+        """Copy request body to a file on local disk.
+
+        Partial files are removed if body can not be spooled.
+
+        Args:
+            stream (Any):
+                Binary file-like object, usually `request.stream`.
+            job_id (str):
+                Identifier of the job.
+
+        Returns:
+            str:
+                Path of the spooled body.
+        """
+        spool_path = cls.get_spool_path()
+        os.makedirs(spool_path, exist_ok=True)
+        path = os.path.join(spool_path, job_id)
+        try:
+            with open(path, 'wb') as file:
+                shutil.copyfileobj(stream, file, 1024 * 1024)
+        except Exception as e:
+            cls._remove_spool(path=path)
+            raise e
+        return path
+
+    @staticmethod
+    def _remove_spool(path: str) -> None:
+        """Remove spooled body if it exists."""
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    @classmethod
+    def set_status(cls, engine: Any, table: Table, status: dict) -> dict:
+        """Store job status on database.
+
+        Status is written on a connection of the engine, not on request
+        session, so it is committed independently of the data chunks.
+
+        Args:
+            engine (Any):
+                SQLAlchemy engine of the primary database.
+            table (Table):
+                Job status table, see `get_table`.
+            status (dict):
+                Job status with `job_id` and `model_class` keys.
+
+        Returns:
+            dict:
+                Stored status.
+        """
+        values = {
+            'model_class': status['model_class'],
+            'status': pumpJsonDump(status).decode(),
+            'updated_at': cls._now()}
+        with engine.begin() as connection:
+            result = connection.execute(
+                update(table)
+                .where(table.c.job_id == status['job_id'])
+                .values(**values))
+            if result.rowcount == 0:
+                connection.execute(
+                    table.insert().values(
+                        job_id=status['job_id'], **values))
+        return status
+
+    @classmethod
+    def _read_status(cls, engine: Any, table: Table,
+                     job_id: str) -> dict | None:
+        """Read job status if not expired.
+
+        Args:
+            engine (Any):
+                SQLAlchemy engine of the primary database.
+            table (Table):
+                Job status table, see `get_table`.
+            job_id (str):
+                Identifier of the job.
+
+        Returns:
+            dict | None:
+                Job status or None if not found or expired.
+        """
+        min_updated_at = cls._now() - \
+            datetime.timedelta(seconds=BULK_SAVE_JOB_STATUS_EXPIRE)
+        with engine.connect() as connection:
+            status = connection.execute(
+                select(table.c.status)
+                .where(
+                    table.c.job_id == job_id,
+                    table.c.updated_at >= min_updated_at)
+            ).scalar()
+        if status is None:
+            return None
+        return orjson.loads(status)
+
+    @classmethod
+    def delete_expired(cls, engine: Any, table: Table) -> int:
+        """Delete status of jobs not updated for the expire time.
+
+        Args:
+            engine (Any):
+                SQLAlchemy engine of the primary database.
+            table (Table):
+                Job status table, see `get_table`.
+
+        Returns:
+            int:
+                Number of deleted jobs.
+        """
+        min_updated_at = cls._now() - \
+            datetime.timedelta(seconds=BULK_SAVE_JOB_STATUS_EXPIRE)
+        with engine.begin() as connection:
+            return connection.execute(
+                delete(table).where(
+                    table.c.updated_at < min_updated_at)
+            ).rowcount
+
+    @classmethod
+    def get_status(cls, engine: Any, table: Table, job_id: str,
+                   model_class: str) -> dict:
+        """Return job status.
+
+        Args:
+            engine (Any):
+                SQLAlchemy engine of the primary database.
+            table (Table):
+                Job status table, see `get_table`.
+            job_id (str):
+                Identifier of the job.
+            model_class (str):
+                Model class of the view, jobs of other models are not
+                returned.
+
+        Returns:
+            dict:
+                Job status.
+
+        Raises:
+            PumpWoodObjectDoesNotExist:
+                If job is not found or has expired.
+        """
+        status = cls._read_status(engine=engine, table=table, job_id=job_id)
+        if status is None or status['model_class'] != model_class:
+            msg = "Bulk save job [{job_id}] not found for [{model_class}]"
+            raise exceptions.PumpWoodObjectDoesNotExist(
+                message=msg, payload={
+                    "job_id": job_id, "model_class": model_class})
+        return status
+
+    @classmethod
+    def update_progress(cls, engine: Any, table: Table, status: dict,
+                        report: dict, rows_processed: int) -> dict:
+        """Update status with chunk report and throughput.
+
+        Args:
+            engine (Any):
+                SQLAlchemy engine of the primary database.
+            table (Table):
+                Job status table, see `get_table`.
+            status (dict):
+                Job status.
+            report (dict):
+                Report returned by bulk save chunk loop.
+            rows_processed (int):
+                Number of rows processed, saved or failed.
+
+        Returns:
+            dict:
+                Stored status.
+        """
+        started_at = datetime.datetime.fromisoformat(status['started_at'])
+        elapsed = (cls._now() - started_at).total_seconds()
+        status.update({
+            'rows_processed': rows_processed,
+            'rows_per_second': (
+                rows_processed / elapsed if elapsed > 0 else None),
+            'saved': report['saved'], 'duplicates': report['duplicates'],
+            'n_chunks': report['n_chunks'],
+            'failed_chunks': report['failed_chunks'],
+            'not_processed': report['not_processed']})
+        return cls.set_status(engine=engine, table=table, status=status)
+
+    @classmethod
+    def submit(cls, engine: Any, table: Table, stream: Any, model_class: str,
+               format: str | None, function: Callable,
+               treat_error: Callable[[Exception], dict]) -> dict:
+        """Spool body and submit job to the worker pool.
+
+        Args:
+            engine (Any):
+                SQLAlchemy engine of the primary database, used to store
+                job status.
+            table (Table):
+                Job status table, see `get_table`.
+            stream (Any):
+                Binary file-like object, usually `request.stream`.
+            model_class (str):
+                Model class of the view.
+            format (str | None):
+                Streamed format of the body, None for a JSON array.
+            function (Callable):
+                Function called on worker with `status` and `path`
+                arguments, progress is set on status by the function.
+            treat_error (Callable[[Exception], dict]):
+                Function converting job errors to the dictionary reported
+                on status.
+
+        Returns:
+            dict:
+                Status of the queued job.
+        """
+        executor = cls.get_executor(engine=engine, table=table)
+        cls.delete_expired(engine=engine, table=table)
+        job_id = uuid.uuid4().hex
+        path = cls.spool(stream=stream, job_id=job_id)
+        try:
+            status = cls.set_status(engine=engine, table=table, status={
+                'job_id': job_id, 'model_class': model_class,
+                'status': cls.STATUS_QUEUED, 'format': format or 'json',
+                'created_at': cls._now().isoformat(),
+                'started_at': None, 'finished_at': None,
+                'rows_processed': 0, 'rows_per_second': None, 'saved': 0,
+                'duplicates': 0, 'n_chunks': 0, 'failed_chunks': [],
+                'not_processed': None, 'error': None})
+        except Exception as e:
+            cls._remove_spool(path=path)
+            raise e
+        app = current_app._get_current_object()
+        g_attributes = AuxPartitionSplit.get_g_attributes()
+        g_attributes[AuthFactory.AUTH_HEADER_G_ATTRIBUTE] = \
+            AuthFactory.get_auth_header()
+
+        def worker():
+            with app.app_context():
+                for key, value in g_attributes.items():
+                    setattr(g, key, value)
+                job_status = dict(status)
+                try:
+                    job_status.update({
+                        'status': cls.STATUS_RUNNING,
+                        'started_at': cls._now().isoformat()})
+                    cls.set_status(
+                        engine=engine, table=table, status=job_status)
+                    function(status=job_status, path=path)
+                    job_status['status'] = cls.STATUS_FINISHED
+                except Exception as e:
+                    logger.exception(
+                        "Bulk save job [{}] failed".format(job_id))
+                    job_status['status'] = cls.STATUS_FAILED
+                    job_status['error'] = treat_error(e)
+                finally:
+                    cls._remove_spool(path=path)
+                job_status['finished_at'] = cls._now().isoformat()
+                cls.set_status(engine=engine, table=table, status=job_status)
+
+        try:
+            executor.submit(worker)
+        except Exception as e:
+            cls._remove_spool(path=path)
+            raise e
+        return status
@@ -0,0 +1,261 @@
+"""Pivot long data on database using conditional aggregates."""
+import datetime
+import pandas as pd
+from typing import Any
+from sqlalchemy import and_, func, cast, Float, select
+from sqlalchemy.sql import Subquery
+from pumpwood_communication import exceptions
+
+
+class SqlPivotManager:
+    """Pivot data on database with `avg(value) FILTER (WHERE ...)` columns.
+
+    Distinct values of pivot columns are discovered first and each one is
+    transformed in a conditional aggregate, so only the wide rows are
+    returned from database. Results follow `pd.pivot_table` defaults used
+    by pivot end-point: cells are the mean of `value`, rows with null
+    index or pivot columns are dropped, columns and rows without any
+    non-null value are not returned and rows are ordered by index.
+    """
+
+    DIALECTS: list[str] = ['postgresql', 'sqlite']
+    """Dialects that implement aggregate `FILTER (WHERE ...)` clause."""
+
+    @classmethod
+    def is_available(cls, session) -> bool:
+        """Check if database dialect supports SQL pivot.
+
+        Args:
+            session:
+                SQLAlchemy session used on the request.
+
+        Returns:
+            bool:
+                True if pivot can be performed on database.
+        """
+        return session.get_bind().dialect.name in cls.DIALECTS
+
+    @classmethod
+    def _not_null_filter(cls, subquery: Subquery, index: list[str],
+                         columns: list[str]) -> list:
+        """Return filters removing rows pandas would drop on pivot.
+
+        Args:
+            subquery (Subquery):
+                Long data subquery.
+            index (list[str]):
+                Index columns of the pivot.
+            columns (list[str]):
+                Pivot columns.
+
+        Returns:
+            list:
+                Filter clauses.
+        """
+        return [
+            subquery.c[col].isnot(None)
+            for col in index + columns + ['value']]
+
+    @classmethod
+    def discover_columns(cls, session, subquery: Subquery, index: list[str],
+                         columns: list[str], max_columns: int
+                         ) -> list[tuple] | None:
+        """Query distinct values of the pivot columns.
+
+        Args:
+            session:
+                SQLAlchemy session used on the request.
+            subquery (Subquery):
+                Long data subquery.
+            index (list[str]):
+                Index columns of the pivot.
+            columns (list[str]):
+                Pivot columns.
+            max_columns (int):
+                Maximum number of pivoted columns.
+
+        Returns:
+            list[tuple] | None:
+                Ordered distinct values of pivot columns or None if there
+                are more than `max_columns` values.
+        """
+        pivot_columns = [subquery.c[col] for col in columns]
+        query = select(*pivot_columns)\
+            .where(*cls._not_null_filter(
+                subquery=subquery, index=index, columns=columns))\
+            .distinct().order_by(*pivot_columns).limit(max_columns + 1)
+        column_values = [tuple(row) for row in session.execute(query)]
+        if max_columns < len(column_values):
+            return None
+        return column_values
+
+    @classmethod
+    def page_keys(cls, session, subquery: Subquery, index: list[str],
+                  columns: list[str], page_size: int) -> list[tuple]:
+        """Query ordered index tuples of a keyset page.
+
+        Only index tuples that would be returned by pivot are considered,
+        one more tuple than `page_size` is returned to check if there are
+        other pages.
+
+        Args:
+            session:
+                SQLAlchemy session used on the request.
+            subquery (Subquery):
+                Long data subquery with seek predicate applied.
+            index (list[str]):
+                Index columns of the pivot.
+            columns (list[str]):
+                Pivot columns.
+            page_size (int):
+                Number of wide rows on the page.
+
+        Returns:
+            list[tuple]:
+                Ordered index tuples.
+        """
+        index_columns = [subquery.c[col] for col in index]
+        query = select(*index_columns)\
+            .where(*cls._not_null_filter(
+                subquery=subquery, index=index, columns=columns))\
+            .distinct().order_by(*index_columns).limit(page_size + 1)
+        return [tuple(row) for row in session.execute(query)]
+
+    @classmethod
+    def convert_cursor(cls, index_columns: list, cursor: list) -> list:
+        """Convert cursor values received as JSON to index column types.
+
+        Args:
+            index_columns (list):
+                Model columns of pivot index.
+            cursor (list):
+                Cursor values.
+
+        Returns:
+            list:
+                Cursor values with dates and datetimes parsed. Datetimes
+                of columns without timezone are returned naive, values
+                with offset are converted to UTC before.
+
+        Raises:
+            PumpWoodWrongParameters:
+                If cursor does not have one value for each index column.
+        """
+        if not isinstance(cursor, list) or len(cursor) != len(index_columns):
+            msg = (
+                "cursor must be a list with values of index columns "
+                "{index}, received [{cursor}]")
+            raise exceptions.PumpWoodWrongParameters(
+                message=msg, payload={
+                    "index": [col.key for col in index_columns],
+                    "cursor": cursor})
+
+        converted_cursor = []
+        for column, value in zip(index_columns, cursor):
+            try:
+                python_type = column.type.python_type
+            except NotImplementedError:
+                python_type = None
+            if isinstance(value, str) and python_type is datetime.datetime:
+                value = pd.Timestamp(value)
+                is_naive_column = not getattr(column.type, 'timezone', False)
+                if is_naive_column and value.tzinfo is not None:
+                    value = value.tz_convert('UTC').tz_localize(None)
+                value = value.to_pydatetime()
+            elif isinstance(value, str) and python_type is datetime.date:
+                value = pd.Timestamp(value).date()
+            converted_cursor.append(value)
+        return converted_cursor
+
+    @classmethod
+    def get_column_key(cls, column_value: tuple) -> Any:
+        """Return the name of pivoted column as returned by pandas.
+
+        Args:
+            column_value (tuple):
+                Values of the pivot columns.
+
+        Returns:
+            Any:
+                The value if only one column is pivoted, else the tuple.
+        """
+        if len(column_value) == 1:
+            return column_value[0]
+        return column_value
+
+    @classmethod
+    def build_query(cls, subquery: Subquery, index: list[str],
+                    columns: list[str], column_values: list[tuple]):
+        """Build pivot query with a conditional aggregate for each value.
+
+        Args:
+            subquery (Subquery):
+                Long data subquery.
+            index (list[str]):
+                Index columns of the pivot.
+            columns (list[str]):
+                Pivot columns.
+            column_values (list[tuple]):
+                Values returned by `discover_columns`.
+
+        Returns:
+            Select statement returning index columns followed by one
+            column for each value.
+        """
+        index_columns = [subquery.c[col] for col in index]
+        value_columns = []
+        for i, column_value in enumerate(column_values):
+            condition = and_(*[
+                subquery.c[col] == value
+                for col, value in zip(columns, column_value)])
+            value_columns.append(cast(
+                func.avg(subquery.c['value']).filter(condition),
+                Float).label('pivot_{}'.format(i)))
+        return select(*index_columns, *value_columns)\
+            .where(*cls._not_null_filter(
+                subquery=subquery, index=index, columns=columns))\
+            .group_by(*index_columns).order_by(*index_columns)
+
+    @classmethod
+    def run(cls, session, subquery: Subquery, index: list[str],
+            columns: list[str], max_columns: int
+            ) -> tuple[list, list] | None:
+        """Pivot the long data subquery on database.
+
+        Args:
+            session:
+                SQLAlchemy session used on the request.
+            subquery (Subquery):
+                Long data subquery, it must have `value` column.
+            index (list[str]):
+                Index columns of the pivot.
+            columns (list[str]):
+                Pivot columns.
+            max_columns (int):
+                Maximum number of pivoted columns.
+
+        Returns:
+            tuple[list, list] | None:
+                Result column names and rows, or None if there are more
+                than `max_columns` values to be pivoted.
+        """
+        column_values = cls.discover_columns(
+            session=session, subquery=subquery, index=index,
+            columns=columns, max_columns=max_columns)
+        if column_values is None:
+            return None
+        if len(column_values) == 0:
+            return [], []
+
+        query = cls.build_query(
+            subquery=subquery, index=index, columns=columns,
+            column_values=column_values)
+        # Pandas names index columns with tuples when pivoting more than
+        # one column, since result columns are a MultiIndex
+        index_labels = index
+        if 1 < len(columns):
+            padding = ('',) * (len(columns) - 1)
+            index_labels = [(col,) + padding for col in index]
+        result_columns = index_labels + [
+            cls.get_column_key(column_value=x) for x in column_values]
+        return result_columns, session.execute(query).all()
@@ -0,0 +1,544 @@
+"""Incremental rollup tables used to answer aggregate end-point."""
+import pandas as pd
+from typing import Any
+from dataclasses import dataclass
+from flask_sqlalchemy.query import Query
+from sqlalchemy import (
+    and_, or_, case, func, insert, delete, select, values, column)
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql.elements import Label
+from pumpwood_communication import exceptions
+from pumpwood_flaskviews.query import (
+    SqlalchemyQueryMisc, BaseQueryRowPermission, BaseQueryOwner)
+from pumpwood_flaskviews.inspection import model_has_column
+
+
+@dataclass
+class AggregateRollup:
+    """Definition of a rollup table maintained by data views.
+
+    Rollup model must have one column for each `group_by` label and one
+    for each `agg` key. Incremental upserts on Postgres require an unique
+    constraint over `group_by` columns (use `NULLS NOT DISTINCT` if they
+    are nullable). If source model uses `BaseQueryRowPermission` or
+    `BaseQueryOwner`, its row permission or owner column must be a
+    `group_by` field, so rollup rows do not mix rows of different access
+    scopes.
+
+    Example:
+        >>> AggregateRollup(
+        >>>     model_class=DailyDataValue,
+        >>>     group_by=[
+        >>>         'attribute_id', 'modeling_unit_id',
+        >>>         {'field': 'time', 'trunc': 'day'}],
+        >>>     agg={
+        >>>         'value_sum': {'field': 'value', 'function': 'sum'},
+        >>>         'value_count': {'field': 'value', 'function': 'count'}})
+    """
+
+    model_class: Any
+    """SQLAlchemy model of the rollup table."""
+    group_by: list[str | dict]
+    """Group by of the rollup, fields or dictionaries with `field` and
+       `trunc` keys as on aggregate end-point."""
+    agg: dict
+    """Aggregations stored on rollup, functions must be one of sum, count,
+       min and max."""
+
+
+class AggregateRollupManager:
+    """Maintain rollup tables and use them to answer aggregations."""
+
+    FUNCTIONS: dict[str, str] = {
+        'sum': 'sum', 'count': 'sum', 'min': 'min', 'max': 'max'}
+    """Functions that can be stored on rollups mapped to the function used
+       to re-aggregate rollup rows."""
+
+    TRUNC_UNITS: list[str] = [
+        'microseconds', 'milliseconds', 'second', 'minute', 'hour', 'day',
+        'week', 'month', 'quarter', 'year']
+    """`date_trunc` units that can be used on rollup group by."""
+
+    KEYS_CHUNK_SIZE: int = 500
+    """Number of groups refreshed on each statement."""
+
+    DELTA_CHUNK_SIZE: int = 1000
+    """Number of bulk save rows aggregated on each rollup statement."""
+
+    @classmethod
+    def get_group_labels(cls, rollup: AggregateRollup) -> list[str]:
+        """Return the rollup group by column names.
+
+        Args:
+            rollup (AggregateRollup):
+                Rollup definition.
+
+        Returns:
+            list[str]:
+                Label of each group by entry.
+        """
+        return [
+            g.get('label', g.get('field')) if isinstance(g, dict) else g
+            for g in rollup.group_by]
+
+    @classmethod
+    def get_scope_column(cls, base_query: Any) -> str | None:
+        """Return the column that restricts rows by user on base query.
+
+        Args:
+            base_query (Any):
+                Base query of a model.
+
+        Returns:
+            str | None:
+                Row permission or owner column, None if base query does
+                not filter rows by user.
+        """
+        if isinstance(base_query, BaseQueryRowPermission):
+            return base_query.row_permission_col
+        if isinstance(base_query, BaseQueryOwner):
+            return base_query.owner_col
+        return None
+
+    @classmethod
+    def is_scope_grouped(cls, rollup: AggregateRollup,
+                         source_model) -> bool:
+        """Check if rollup rows keep the access scope of source rows.
+
+        Rollup model base query must be the same type of source model base
+        query and use the same scope column, which must be a `group_by`
+        field. Otherwise rollup rows would aggregate rows of different
+        scopes, and a null scope column is accepted by
+        `BaseQueryRowPermission` for every user.
+
+        Args:
+            rollup (AggregateRollup):
+                Rollup definition.
+            source_model:
+                SQLAlchemy model that is aggregated on rollup.
+
+        Returns:
+            bool:
+                True if rollup can be filtered as the source model.
+        """
+        source_base_query = source_model.base_query
+        rollup_base_query = rollup.model_class.base_query
+        if type(rollup_base_query) is not type(source_base_query):
+            return False
+
+        scope_column = cls.get_scope_column(source_base_query)
+        if scope_column is None:
+            return True
+        return (
+            scope_column in rollup.group_by and
+            cls.get_scope_column(rollup_base_query) == scope_column)
+
+    @classmethod
+    def validate(cls, rollup: AggregateRollup, source_model) -> None:
+        """Validate rollup definition.
+
+        Args:
+            rollup (AggregateRollup):
+                Rollup definition.
+            source_model:
+                SQLAlchemy model that is aggregated on rollup.
+
+        Raises:
+            PumpWoodOtherException:
+                If rollup is not correctly configured.
+        """
+        msg = None
+        payload = {
+            'rollup': rollup.model_class.__name__,
+            'model_class': source_model.__name__}
+        for g in rollup.group_by:
+            if not isinstance(g, dict):
+                continue
+            is_valid_trunc = g.get('trunc') in cls.TRUNC_UNITS
+            if 'bucket' in g.keys() or not is_valid_trunc:
+                msg = (
+                    "Rollup [{rollup}] group by [{group_by}] is not valid, "
+                    "only fields and 'trunc' with units up to year are "
+                    "supported")
+                payload['group_by'] = g
+
+        for key, item in rollup.agg.items():
+            if item.get('function') not in cls.FUNCTIONS.keys():
+                msg = (
+                    "Rollup [{rollup}] agg [{key}] function must be one "
+                    "of {functions}")
+                payload['key'] = key
+                payload['functions'] = list(cls.FUNCTIONS.keys())
+
+        rollup_columns = [
+            col.key for col in rollup.model_class.__table__.c]
+        missing_columns = set(
+            cls.get_group_labels(rollup) + list(rollup.agg.keys())) - \
+            set(rollup_columns)
+        if len(missing_columns) != 0:
+            msg = (
+                "Rollup [{rollup}] model does not have columns "
+                "{missing_columns}")
+            payload['missing_columns'] = sorted(missing_columns)
+
+        if not cls.is_scope_grouped(rollup=rollup, source_model=source_model):
+            msg = (
+                "Rollup [{rollup}] model base query must be the same of "
+                "[{model_class}] base query and scope column "
+                "[{scope_column}] must be a group_by field")
+            payload['scope_column'] = cls.get_scope_column(
+                source_model.base_query)
+
+        if msg is not None:
+            raise exceptions.PumpWoodOtherException(
+                message=msg, payload=payload)
+
+    @classmethod
+    def _source_columns(cls, source_model) -> dict:
+        """Return source model columns indexed by key."""
+        return {col.key: col for col in source_model.__table__.c}
+
+    @classmethod
+    def _source_group_by(cls, rollup: AggregateRollup, source_model,
+                         source_columns: dict | None = None) -> list:
+        """Return labeled group by expressions over source model.
+
+        Columns of other selectables with source column keys, as bulk
+        save `VALUES`, may be passed on `source_columns`.
+        """
+        if source_columns is None:
+            source_columns = cls._source_columns(source_model)
+        group_by = []
+        for label, g in zip(cls.get_group_labels(rollup), rollup.group_by):
+            expression = SqlalchemyQueryMisc._aggregate_group_by(
+                subquery_columns=source_columns, g_col=g,
+                object_model=source_model)
+            if not isinstance(expression, Label):
+                expression = expression.label(label)
+            group_by.append(expression)
+        return group_by
+
+    @classmethod
+    def _source_filter(cls, source_model) -> list:
+        """Return filters applied to source rows, deleted are removed."""
+        if model_has_column(source_model, column='deleted'):
+            return [source_model.__table__.c.deleted.is_(False)]
+        return []
+
+    @staticmethod
+    def _match_key(columns: list, key: tuple):
+        """Build clause matching columns to a group key."""
+        return and_(*[
+            col.is_(None) if value is None else col == value
+            for col, value in zip(columns, key)])
+
+    @classmethod
+    def keys_from_query(cls, rollup: AggregateRollup, source_model,
+                        query: Query) -> list[tuple]:
+        """Return rollup groups of the source rows selected by query.
+
+        Args:
+            rollup (AggregateRollup):
+                Rollup definition.
+            source_model:
+                SQLAlchemy model that is aggregated on rollup.
+            query (Query):
+                Query selecting source rows.
+
+        Returns:
+            list[tuple]:
+                Group keys affected by the source rows.
+        """
+        group_by = cls._source_group_by(
+            rollup=rollup, source_model=source_model)
+        return [
+            tuple(row) for row in
+            query.with_entities(*group_by).distinct().all()]
+
+    @classmethod
+    def refresh_groups(cls, session, rollup: AggregateRollup,
+                       source_model, keys: list[tuple]) -> None:
+        """Recompute rollup rows of groups from source table.
+
+        Args:
+            session:
+                SQLAlchemy session, changes are not committed.
+            rollup (AggregateRollup):
+                Rollup definition.
+            source_model:
+                SQLAlchemy model that is aggregated on rollup.
+            keys (list[tuple]):
+                Group keys that will be recomputed.
+        """
+        labels = cls.get_group_labels(rollup)
+        rollup_table = rollup.model_class.__table__
+        rollup_columns = [rollup_table.c[label] for label in labels]
+        source_columns = cls._source_columns(source_model)
+        group_by = cls._source_group_by(
+            rollup=rollup, source_model=source_model)
+        agg = [
+            SqlalchemyQueryMisc._aggregate_function(
+                subquery_columns=source_columns, key=key, item=item,
+                object_model=source_model)
+            for key, item in rollup.agg.items()]
+
+        keys = list(dict.fromkeys(keys))
+        for i in range(0, len(keys), cls.KEYS_CHUNK_SIZE):
+            chunk_keys = keys[i:i + cls.KEYS_CHUNK_SIZE]
+            session.execute(
+                delete(rollup_table).where(or_(*[
+                    cls._match_key(columns=rollup_columns, key=key)
+                    for key in chunk_keys])))
+
+            group_expressions = [x.element for x in group_by]
+            select_statement = select(*group_by, *agg)\
+                .where(*cls._source_filter(source_model))\
+                .where(or_(*[
+                    cls._match_key(columns=group_expressions, key=key)
+                    for key in chunk_keys]))\
+                .group_by(*group_expressions)
+            session.execute(
+                insert(rollup_table).from_select(
+                    labels + list(rollup.agg.keys()), select_statement))
+
+    @classmethod
+    def _delta_values(cls, source_model, data: pd.DataFrame,
+                      fields: list[str]):
+        """Return bulk save data as a typed `VALUES` clause.
+
+        Args:
+            source_model:
+                SQLAlchemy model that is aggregated on rollup.
+            data (pd.DataFrame):
+                Chunk of the data inserted on source table.
+            fields (list[str]):
+                Rollup fields, columns of the `VALUES` clause.
+
+        Returns:
+            Values:
+                `VALUES` clause with source column types.
+        """
+        source_columns = cls._source_columns(source_model)
+        field_data = data[fields].astype(object)\
+            .where(data[fields].notna(), None)
+        return values(
+            *[column(field, source_columns[field].type)
+              for field in fields],
+            name='pumpwood_rollup_delta')\
+            .data(list(field_data.itertuples(index=False, name=None)))
+
+    @classmethod
+    def bulk_save_delta(cls, session, rollup: AggregateRollup,
+                        source_model, data: pd.DataFrame) -> None:
+        """Update rollup with rows inserted by bulk save.
+
+        Group keys are always computed by the database with the same
+        expressions of `refresh_groups`, so timestamps are truncated with
+        `date_trunc` on the session time zone on every path. On Postgres,
+        inserted rows are sent as a `VALUES` clause and their aggregation
+        is added to the rollup using `INSERT ... ON CONFLICT DO UPDATE`.
+        On other databases, affected groups are recomputed from source
+        table.
+
+        Args:
+            session:
+                SQLAlchemy session, changes are not committed.
+            rollup (AggregateRollup):
+                Rollup definition.
+            source_model:
+                SQLAlchemy model that is aggregated on rollup.
+            data (pd.DataFrame):
+                Data inserted on source table.
+
+        Raises:
+            PumpWoodOtherException:
+                If rollup fields are not present on bulk save data.
+        """
+        fields = [
+            g['field'] if isinstance(g, dict) else g
+            for g in rollup.group_by]
+        fields.extend([item['field'] for item in rollup.agg.values()])
+        fields = list(dict.fromkeys(fields))
+        missing_fields = set(fields) - set(data.columns)
+        if len(missing_fields) != 0:
+            msg = (
+                "Rollup [{rollup}] fields {missing_fields} are not present "
+                "on bulk save data, check expected_cols_bulk_save")
+            raise exceptions.PumpWoodOtherException(
+                message=msg, payload={
+                    'rollup': rollup.model_class.__name__,
+                    'missing_fields': sorted(missing_fields)})
+
+        # Deleted rows are not considered on rollups
+        if 'deleted' in data.columns:
+            data = data[~data['deleted'].fillna(False).astype(bool)]
+        if len(data) == 0:
+            return None
+
+        if session.get_bind().dialect.name != 'postgresql':
+            keys = cls._bulk_save_keys(
+                session=session, rollup=rollup, source_model=source_model,
+                data=data)
+            cls.refresh_groups(
+                session=session, rollup=rollup, source_model=source_model,
+                keys=keys)
+            return None
+
+        labels = cls.get_group_labels(rollup)
+        rollup_table = rollup.model_class.__table__
+        merge_functions = {
+            'sum': lambda c, e: case(
+                (and_(c.is_(None), e.is_(None)), None),
+                else_=func.coalesce(c, 0) + func.coalesce(e, 0)),
+            'count': lambda c, e: c + e,
+            'min': lambda c, e: func.least(c, e),
+            'max': lambda c, e: func.greatest(c, e)}
+        for i in range(0, len(data), cls.DELTA_CHUNK_SIZE):
+            delta = cls._delta_values(
+                source_model=source_model, fields=fields,
+                data=data.iloc[i:i + cls.DELTA_CHUNK_SIZE])
+            delta_columns = {field: delta.c[field] for field in fields}
+            group_by = cls._source_group_by(
+                rollup=rollup, source_model=source_model,
+                source_columns=delta_columns)
+            agg = [
+                SqlalchemyQueryMisc._aggregate_function(
+                    subquery_columns=delta_columns, key=key, item=item,
+                    object_model=source_model)
+                for key, item in rollup.agg.items()]
+            select_statement = select(*group_by, *agg)\
+                .group_by(*[x.element for x in group_by])
+            insert_statement = postgresql.insert(rollup_table)\
+                .from_select(
+                    labels + list(rollup.agg.keys()), select_statement)
+            session.execute(insert_statement.on_conflict_do_update(
+                index_elements=labels,
+                set_={
+                    key: merge_functions[item['function']](
+                        rollup_table.c[key],
+                        insert_statement.excluded[key])
+                    for key, item in rollup.agg.items()}))
+
+    @classmethod
+    def _bulk_save_keys(cls, session, rollup: AggregateRollup,
+                        source_model, data: pd.DataFrame) -> list[tuple]:
+        """Return rollup group keys of rows inserted by bulk save.
+
+        Inserted rows are matched on source table by their group by
+        fields, so keys are truncated by the same expressions used
+        on `refresh_groups`.
+
+        Args:
+            session:
+                SQLAlchemy session with the inserted rows.
+            rollup (AggregateRollup):
+                Rollup definition.
+            source_model:
+                SQLAlchemy model that is aggregated on rollup.
+            data (pd.DataFrame):
+                Data inserted on source table.
+
+        Returns:
+            list[tuple]:
+                Group keys affected by the inserted rows.
+        """
+        group_fields = list(dict.fromkeys([
+            g['field'] if isinstance(g, dict) else g
+            for g in rollup.group_by]))
+        source_columns = cls._source_columns(source_model)
+        field_columns = [source_columns[f] for f in group_fields]
+        group_by = cls._source_group_by(
+            rollup=rollup, source_model=source_model)
+
+        field_data = data[group_fields].drop_duplicates()
+        field_data = field_data.astype(object)\
+            .where(field_data.notna(), None)
+        field_keys = list(field_data.itertuples(index=False, name=None))
+        keys = []
+        for i in range(0, len(field_keys), cls.KEYS_CHUNK_SIZE):
+            chunk_keys = field_keys[i:i + cls.KEYS_CHUNK_SIZE]
+            select_statement = select(*group_by)\
+                .where(or_(*[
+                    cls._match_key(columns=field_columns, key=key)
+                    for key in chunk_keys]))\
+                .distinct()
+            keys.extend(
+                tuple(row) for row in session.execute(select_statement))
+        return keys
+
+    @classmethod
+    def match(cls, rollups: list[AggregateRollup], source_model,
+              group_by: list[str | dict], agg: dict, filter_dict: dict,
+              exclude_dict: dict, show_deleted: bool
+              ) -> tuple[AggregateRollup, list[str], dict] | None:
+        """Find a rollup that can answer the aggregation.
+
+        A rollup can be used if request group by entries are rollup group
+        by entries, filters use only rollup field group columns, all
+        aggregations are stored on rollup and rollup rows keep the access
+        scope of source rows (`is_scope_grouped`).
+
+        Args:
+            rollups (list[AggregateRollup]):
+                Rollups of the view.
+            source_model:
+                SQLAlchemy model of the view.
+            group_by (list[str | dict]):
+                Aggregate request group by.
+            agg (dict):
+                Aggregate request aggregations.
+            filter_dict (dict):
+                Aggregate request filters.
+            exclude_dict (dict):
+                Aggregate request excludes.
+            show_deleted (bool):
+                Aggregate request show_deleted.
+
+        Returns:
+            tuple[AggregateRollup, list[str], dict] | None:
+                Rollup, group by and aggregation to be used on rollup
+                model or None if no rollup matches the request.
+        """
+        has_deleted = model_has_column(source_model, column='deleted')
+        if has_deleted and show_deleted:
+            return None
+
+        for rollup in rollups:
+            is_scope_ok = cls.is_scope_grouped(
+                rollup=rollup, source_model=source_model)
+            if not is_scope_ok:
+                continue
+
+            labels = cls.get_group_labels(rollup)
+            is_group_by_ok = all(g in rollup.group_by for g in group_by)
+            if not is_group_by_ok:
+                continue
+
+            filter_fields = [
+                g for g in rollup.group_by if not isinstance(g, dict)]
+            query_keys = list(filter_dict.keys()) + \
+                list(exclude_dict.keys())
+            is_filter_ok = all(
+                key.split('__')[0] in filter_fields for key in query_keys)
+            if not is_filter_ok:
+                continue
+
+            rollup_agg = {}
+            for key, item in agg.items():
+                function = item.get('function')
+                for rollup_key, rollup_item in rollup.agg.items():
+                    is_same = (
+                        rollup_item['field'] == item.get('field') and
+                        rollup_item['function'] == function)
+                    if is_same:
+                        rollup_agg[key] = {
+                            'field': rollup_key,
+                            'function': cls.FUNCTIONS[function]}
+                        break
+            if len(rollup_agg) != len(agg):
+                continue
+
+            rollup_group_by = [
+                labels[rollup.group_by.index(g)] for g in group_by]
+            return rollup, rollup_group_by, rollup_agg
+        return None
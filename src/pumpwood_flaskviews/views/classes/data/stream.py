@@ -0,0 +1,217 @@
+"""Read bulk save data incrementally from the request body stream."""
+import json
+import codecs
+import shutil
+import tempfile
+import orjson
+import pandas as pd
+from typing import Any, Iterator
+from pumpwood_communication import exceptions
+
+
+try:
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pa_parquet
+except ImportError:
+    pa_ipc = None
+    pa_parquet = None
+
+
+class BulkSaveStream:
+    """Parse streamed request bodies in batches of rows.
+
+    JSON arrays, NDJSON, CSV and Arrow IPC streams are parsed as they are
+    read from the request body, so memory is bounded by the batch size and
+    not by the upload. Parquet metadata is at the end of the file, so the
+    body is spooled to a temporary file before row groups are read in
+    batches.
+    Parquet and Arrow formats require `pyarrow`.
+    """
+
+    MIMETYPES: dict[str, str] = {
+        'application/x-ndjson': 'ndjson',
+        'application/jsonl': 'ndjson',
+        'text/csv': 'csv',
+        'application/vnd.apache.parquet': 'parquet',
+        'application/x-parquet': 'parquet',
+        'application/vnd.apache.arrow.stream': 'arrow'}
+    """Request mimetypes associated with each streamed format."""
+
+    READ_SIZE: int = 1024 * 1024
+    """Number of bytes read from the stream on each JSON/NDJSON read and kept
+       in memory before Parquet spool is written to disk."""
+
+    @classmethod
+    def get_format(cls, mimetype: str) -> str | None:
+        """Return streamed format associated with request mimetype.
+
+        Args:
+            mimetype (str):
+                Request mimetype.
+
+        Returns:
+            str | None:
+                Format name or None if body is not a streamed format.
+        """
+        return cls.MIMETYPES.get(mimetype)
+
+    @classmethod
+    def _iter_ndjson(cls, stream: Any, batch_size: int
+                     ) -> Iterator[pd.DataFrame]:
+        """Parse NDJSON stream, one JSON object by line."""
+        remainder = b''
+        records = []
+        while True:
+            block = stream.read(cls.READ_SIZE)
+            if not block:
+                break
+            lines = (remainder + block).split(b'\n')
+            remainder = lines.pop()
+            for line in lines:
+                if line.strip():
+                    records.append(orjson.loads(line))
+                if len(records) == batch_size:
+                    yield pd.DataFrame(records)
+                    records = []
+        if remainder.strip():
+            records.append(orjson.loads(remainder))
+        if len(records) != 0:
+            yield pd.DataFrame(records)
+
+    @classmethod
+    def _iter_json(cls, stream: Any, batch_size: int
+                   ) -> Iterator[pd.DataFrame]:
+        """Parse JSON array stream, decoding one element at a time.
+
+        Elements are decoded when they are complete on the read buffer,
+        so the array is never loaded whole. Bodies that are not an array,
+        e.g. an object of columns, are loaded whole.
+        """
+        decoder = json.JSONDecoder()
+        text_decoder = codecs.getincrementaldecoder('utf-8')()
+        buffer = ''
+        position = 0
+        is_eof = False
+        is_array = None
+        records = []
+        while True:
+            if not is_eof:
+                block = stream.read(cls.READ_SIZE)
+                is_eof = not block
+                buffer = buffer[position:] + text_decoder.decode(
+                    block, final=is_eof)
+                position = 0
+
+            # Check if body is an array on first non whitespace char
+            if is_array is None:
+                stripped = buffer.lstrip()
+                if not stripped and not is_eof:
+                    continue
+                is_array = stripped.startswith('[')
+                if not is_array:
+                    body = buffer + text_decoder.decode(
+                        stream.read(), final=True)
+                    data = pd.DataFrame(orjson.loads(body))
+                    for start in range(0, len(data), batch_size):
+                        yield data.iloc[start:start + batch_size]
+                    return
+                position = len(buffer) - len(stripped) + 1
+
+            while True:
+                while position < len(buffer) and \
+                        buffer[position] in ' \t\r\n,':
+                    position += 1
+                if position == len(buffer):
+                    break
+                if buffer[position] == ']':
+                    if len(records) != 0:
+                        yield pd.DataFrame(records)
+                    return
+                try:
+                    record, end = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError as e:
+                    if is_eof:
+                        raise e
+                    break
+                # Element must be followed by other chars to be complete
+                if end == len(buffer) and not is_eof:
+                    break
+                records.append(record)
+                position = end
+                if len(records) == batch_size:
+                    yield pd.DataFrame(records)
+                    records = []
+
+            if is_eof:
+                msg = "Bulk save JSON array body is not closed"
+                raise exceptions.PumpWoodWrongParameters(message=msg)
+
+    @classmethod
+    def _iter_csv(cls, stream: Any, batch_size: int
+                  ) -> Iterator[pd.DataFrame]:
+        """Parse CSV stream with header using pandas chunked reader."""
+        with pd.read_csv(stream, chunksize=batch_size) as reader:
+            for batch in reader:
+                yield batch
+
+    @classmethod
+    def _iter_parquet(cls, stream: Any, batch_size: int
+                      ) -> Iterator[pd.DataFrame]:
+        """Spool Parquet stream to a temporary file and read in batches."""
+        with tempfile.SpooledTemporaryFile(max_size=cls.READ_SIZE) as file:
+            shutil.copyfileobj(stream, file, cls.READ_SIZE)
+            file.seek(0)
+            parquet_file = pa_parquet.ParquetFile(file)
+            for batch in parquet_file.iter_batches(batch_size=batch_size):
+                yield batch.to_pandas()
+
+    @classmethod
+    def _iter_arrow(cls, stream: Any, batch_size: int
+                    ) -> Iterator[pd.DataFrame]:
+        """Read Arrow IPC stream splitting large record batches."""
+        reader = pa_ipc.open_stream(stream)
+        for batch in reader:
+            for offset in range(0, batch.num_rows, batch_size):
+                yield batch.slice(offset, batch_size).to_pandas()
+
+    @classmethod
+    def iter_batches(cls, stream: Any, format: str, batch_size: int
+                     ) -> Iterator[pd.DataFrame]:
+        """Yield data frames with at most `batch_size` rows from stream.
+
+        Args:
+            stream (Any):
+                Binary file-like object, usually `request.stream`.
+            format (str):
+                Format returned by `get_format` or `json` for a JSON
+                array.
+            batch_size (int):
+                Maximum number of rows on each data frame.
+
+        Returns:
+            Iterator[pd.DataFrame]:
+                Batches of rows in the order they were sent.
+
+        Raises:
+            PumpWoodWrongParameters:
+                If format is not implemented.
+            PumpWoodNotImplementedError:
+                If `pyarrow` is not installed for Parquet and Arrow formats.
+        """
+        readers = {
+            'json': cls._iter_json,
+            'ndjson': cls._iter_ndjson,
+            'csv': cls._iter_csv,
+            'parquet': cls._iter_parquet,
+            'arrow': cls._iter_arrow}
+        if format not in readers.keys():
+            msg = "Bulk save stream format [{format}] not implemented"
+            raise exceptions.PumpWoodWrongParameters(
+                message=msg, payload={"format": format})
+        if format in ['parquet', 'arrow'] and pa_ipc is None:
+            msg = (
+                "pyarrow must be installed to bulk save [{format}] "
+                "streams")
+            raise exceptions.PumpWoodNotImplementedError(
+                message=msg, payload={"format": format})
+        return readers[format](stream=stream, batch_size=batch_size)
@@ -0,0 +1,229 @@
+"""Upsert bulk save data using `INSERT ... ON CONFLICT DO UPDATE`."""
+import pandas as pd
+from typing import Any, Iterator
+from sqlalchemy import inspect as alchemy_inspect, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.sql.schema import UniqueConstraint
+from flask_sqlalchemy.query import Query
+from pumpwood_communication import exceptions
+
+
+class BulkSaveUpsert:
+    """Build upsert statements for bulk save data.
+
+    Conflict target is the list of columns set on request, if not set the
+    primary key is used if all its columns are on data, else the first
+    `UniqueConstraint` of the table with all columns on data.
+    """
+
+    DIALECTS: dict[str, Any] = {
+        'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
+    """Insert constructs with `on_conflict_do_update` by dialect."""
+
+    KEYS_CHUNK_SIZE: int = 500
+    """Number of conflict keys used on each query of existing rows."""
+
+    @classmethod
+    def get_conflict_columns(cls, model_class: Any, data: pd.DataFrame,
+                             conflict_columns: list[str] | None
+                             ) -> list[str]:
+        """Return model attributes used as conflict target.
+
+        Args:
+            model_class (Any):
+                SQLAlchemy model of the view.
+            data (pd.DataFrame):
+                Validated bulk save data.
+            conflict_columns (list[str] | None):
+                Attributes set on request.
+
+        Returns:
+            list[str]:
+                Attribute keys of the conflict target.
+
+        Raises:
+            PumpWoodWrongParameters:
+                If conflict columns are not on data or if no primary key
+                or unique constraint can be used as conflict target.
+        """
+        mapper = alchemy_inspect(model_class)
+        column_keys = {
+            attribute.columns[0].name: attribute.key
+            for attribute in mapper.column_attrs}
+
+        if conflict_columns is not None:
+            missing_columns = []
+            if isinstance(conflict_columns, list):
+                missing_columns = set(conflict_columns) - set(data.columns)
+            if not isinstance(conflict_columns, list) or \
+                    len(conflict_columns) == 0 or len(missing_columns) != 0:
+                msg = (
+                    "conflict_columns must be a non empty list of columns "
+                    "present on data, missing {missing}")
+                raise exceptions.PumpWoodWrongParameters(
+                    message=msg, payload={
+                        "missing": sorted(missing_columns)})
+            return conflict_columns
+
+        candidates = [[column_keys[col.name] for col in mapper.primary_key]]
+        for constraint in model_class.__table__.constraints:
+            if isinstance(constraint, UniqueConstraint):
+                candidates.append([
+                    column_keys[col.name] for col in constraint.columns])
+        for candidate in candidates:
+            if set(candidate).issubset(set(data.columns)):
+                return candidate
+
+        msg = (
+            "It was not possible to set upsert conflict columns, data must "
+            "have primary key or unique constraint columns {candidates} "
+            "or conflict_columns must be set")
+        raise exceptions.PumpWoodWrongParameters(
+            message=msg, payload={"candidates": candidates})
+
+    @classmethod
+    def build_statement(cls, session, model_class: Any,
+                        data_columns: list[str],
+                        conflict_columns: list[str]):
+        """Build ORM insert with `ON CONFLICT DO UPDATE` clause.
+
+        Args:
+            session:
+                SQLAlchemy session used on the request.
+            model_class (Any):
+                SQLAlchemy model of the view.
+            data_columns (list[str]):
+                Attributes present on data, attributes that are not on
+                conflict target are updated.
+            conflict_columns (list[str]):
+                Attributes of the conflict target.
+
+        Returns:
+            Insert statement to be executed with data records.
+
+        Raises:
+            PumpWoodNotImplementedError:
+                If database dialect does not support upsert.
+        """
+        mapper = alchemy_inspect(model_class)
+        dialect_name = session.get_bind(mapper=mapper).dialect.name
+        insert = cls.DIALECTS.get(dialect_name)
+        if insert is None:
+            msg = "Bulk save upsert is not implemented for [{dialect}]"
+            raise exceptions.PumpWoodNotImplementedError(
+                message=msg, payload={"dialect": dialect_name})
+
+        statement = insert(model_class)
+        index_elements = [
+            mapper.column_attrs[key].columns[0] for key in conflict_columns]
+        update_columns = {
+            mapper.column_attrs[key].columns[0].name:
+                statement.excluded[mapper.column_attrs[key].columns[0].name]
+            for key in data_columns
+            if key in mapper.column_attrs and key not in conflict_columns}
+        if len(update_columns) == 0:
+            return statement.on_conflict_do_nothing(
+                index_elements=index_elements)
+        return statement.on_conflict_do_update(
+            index_elements=index_elements, set_=update_columns)
+
+    @classmethod
+    def _key_filters(cls, model_class: Any, data: pd.DataFrame,
+                     conflict_columns: list[str]) -> Iterator:
+        """Yield clauses matching chunks of conflict keys of data.
+
+        Args:
+            model_class (Any):
+                SQLAlchemy model of the view.
+            data (pd.DataFrame):
+                Validated bulk save data.
+            conflict_columns (list[str]):
+                Attributes of the conflict target.
+
+        Yields:
+            Clause matching a chunk of conflict keys.
+        """
+        columns = [getattr(model_class, key) for key in conflict_columns]
+        keys = list(data[conflict_columns].drop_duplicates()
+                    .itertuples(index=False, name=None))
+        for start in range(0, len(keys), cls.KEYS_CHUNK_SIZE):
+            yield tuple_(*columns).in_(
+                keys[start:start + cls.KEYS_CHUNK_SIZE])
+
+    @classmethod
+    def existing_rows_queries(cls, model_class: Any, data: pd.DataFrame,
+                              conflict_columns: list[str]) -> Iterator:
+        """Yield queries selecting table rows with conflict keys of data.
+
+        Args:
+            model_class (Any):
+                SQLAlchemy model of the view.
+            data (pd.DataFrame):
+                Validated bulk save data.
+            conflict_columns (list[str]):
+                Attributes of the conflict target.
+
+        Yields:
+            Query selecting rows of a chunk of conflict keys.
+        """
+        for key_filter in cls._key_filters(
+                model_class=model_class, data=data,
+                conflict_columns=conflict_columns):
+            yield model_class.query.filter(key_filter)
+
+    @classmethod
+    def check_permission(cls, model_class: Any, data: pd.DataFrame,
+                         conflict_columns: list[str],
+                         base_query: Query) -> None:
+        """Check that rows updated by upsert can be accessed by the user.
+
+        `ON CONFLICT DO UPDATE` does not apply the view default filters,
+        so existing rows with conflict keys of data are selected with and
+        without `base_query`. Rows missing on `base_query` would be
+        updated bypassing ownership or row permission.
+
+        Args:
+            model_class (Any):
+                SQLAlchemy model of the view.
+            data (pd.DataFrame):
+                Validated bulk save data.
+            conflict_columns (list[str]):
+                Attributes of the conflict target.
+            base_query (Query):
+                Query with the view default filters, returned by
+                `_add_default_filter`.
+
+        Raises:
+            PumpWoodForbidden:
+                If any existing row can not be accessed by the user.
+        """
+        if base_query.whereclause is None:
+            return None
+
+        columns = [getattr(model_class, key) for key in conflict_columns]
+        forbidden_keys = []
+        for key_filter in cls._key_filters(
+                model_class=model_class, data=data,
+                conflict_columns=conflict_columns):
+            existing_keys = [
+                tuple(row) for row in model_class.query
+                .filter(key_filter).with_entities(*columns)]
+            if len(existing_keys) == 0:
+                continue
+            permitted_keys = set(
+                tuple(row) for row in base_query
+                .filter(key_filter).with_entities(*columns))
+            forbidden_keys.extend([
+                key for key in existing_keys
+                if key not in permitted_keys])
+
+        if len(forbidden_keys) != 0:
+            msg = (
+                "Upsert would update {n_forbidden} existing rows that can "
+                "not be accessed by the user, conflict columns "
+                "{conflict_columns} ex.: {examples}")
+            raise exceptions.PumpWoodForbidden(
+                message=msg, payload={
+                    "n_forbidden": len(forbidden_keys),
+                    "conflict_columns": conflict_columns,
+                    "examples": [list(key) for key in forbidden_keys[:10]]})
@@ -2,13 +2,31 @@
 import pandas as pd
 import simplejson as json
 import numpy as np
-from typing import Union
-from flask import request, jsonify, Response
-from sqlalchemy import inspect as alchemy_inspect
+import psycopg2
+import sqlalchemy
+from typing import Union, List, Any, Iterator, Callable
+from loguru import logger
+from flask import (
+    request, jsonify, Response, stream_with_context, current_app)
+from flask_sqlalchemy.query import Query
+from sqlalchemy import inspect as alchemy_inspect, tuple_
 from pumpwood_communication import exceptions
+from pumpwood_communication.serializers import pumpJsonDump
+from pumpwood_database_error.psycopg2_error import TreatPsycopg2Error
+from pumpwood_database_error.sqlalchemy_error import TreatSQLAlchemyError
 from pumpwood_flaskviews.query import SqlalchemyQueryMisc
 from pumpwood_flaskviews.inspection import model_has_column
 from pumpwood_flaskviews.views.classes.data.aux import FillBulkSaveFields
+from pumpwood_flaskviews.views.classes.data.rollup import (
+    AggregateRollup, AggregateRollupManager)
+from pumpwood_flaskviews.views.classes.data.pivot import SqlPivotManager
+from pumpwood_flaskviews.views.classes.data.copy import BulkSaveCopy
+from pumpwood_flaskviews.views.classes.data.upsert import BulkSaveUpsert
+from pumpwood_flaskviews.views.classes.data.dedupe import BulkSaveDedupe
+from pumpwood_flaskviews.views.classes.data.stream import BulkSaveStream
+from pumpwood_flaskviews.views.classes.data.job import BulkSaveJob
+from pumpwood_flaskviews.views.classes.data.coerce import BulkSaveCoerce
+from pumpwood_flaskviews.views.classes.aux import AuxResultFormat
 from pumpwood_flaskviews.views.classes.simple import PumpWoodFlaskView
 from pumpwood_flaskviews.exceptions import PumpWoodFlaskViewEndPointFoundError
 
@@ -24,6 +42,43 @@ class PumpWoodDataFlaskView(PumpWoodFlaskView):
 
     model_variables = []
     expected_cols_bulk_save = []
+    aggregate_rollups: list[AggregateRollup] = []
+    """Rollup tables maintained incrementally on `bulk_save`, `save`,
+       `save_many`, `delete` and `delete_many`, on the same transaction
+       of the source rows. Aggregate requests that match a rollup
+       definition are answered using the rollup table."""
+    _pending_rollup_keys: list | None = None
+    """Rollup groups of source rows before a write, refreshed with the
+       groups of written objects by `_before_commit`."""
+    pivot_sql_max_columns: int = 100
+    """Maximum number of pivoted columns computed on database using
+       `FILTER (WHERE ...)` conditional aggregates. Each column evaluates
+       its filter on every grouped row, so database cost grows with the
+       number of columns. Requests with more distinct values, `series`
+       format or databases without support are pivoted using pandas, 0
+       disables database pivot."""
+    bulk_save_copy: bool = True
+    """Use `COPY ... FROM STDIN` to insert `bulk_save` data on Postgres
+       with psycopg. Other databases, columns with types that can not be
+       written as text or Python side defaults use `bulk_insert_mappings`
+       (see `BulkSaveCopy`)."""
+    bulk_save_coerce: bool = True
+    """Coerce `bulk_save` columns to model column types and validate
+       nulls and string lengths before sending data to database, invalid
+       values are reported by column (see `BulkSaveCoerce`)."""
+    bulk_save_chunk_size: int = None
+    """Default number of rows inserted and committed on each `bulk_save`
+       transaction. If None, all data is saved on one transaction."""
+    bulk_save_stream_chunk_size: int = 10000
+    """Default number of rows parsed, inserted and committed on each
+       batch of `bulk-save` requests with streamed bodies (NDJSON, CSV,
+       Parquet and Arrow)."""
+    pivot_stream_chunk_size: int = 100000
+    """Default number of long rows fetched on each chunk of
+       `pivot-streaming` end-point."""
+    pivot_stream_max_group_rows: int = 1000000
+    """Maximum number of long rows of one index group kept in memory by
+       `pivot-streaming`, larger groups stop the stream with an error."""
 
     def dispatch_request(self, end_point: str, first_arg: str = None,
                          second_arg: str = None) -> Response:
@@ -52,24 +107,365 @@ class PumpWoodDataFlaskView(PumpWoodFlaskView):
             return super().dispatch_request(end_point, first_arg, second_arg)
 
         except PumpWoodFlaskViewEndPointFoundError as e:
+            if end_point == 'bulk-save' and \
+                    request.method.lower() == 'post' and \
+                    self.is_stream_request(end_point=end_point):
+                bulk_save_args = self._get_bulk_save_args()
+                stream_format = BulkSaveStream.get_format(request.mimetype)
+                if json.loads(request.args.get('async', 'false')):
+                    return jsonify(self.bulk_save_async(
+                        stream=request.stream, format=stream_format,
+                        **bulk_save_args))
+                return jsonify(self.bulk_save_stream(
+                    stream=request.stream, format=stream_format,
+                    **bulk_save_args))
+
+            if end_point == 'bulk-save-status' and \
+                    request.method.lower() == 'get':
+                return jsonify(self.bulk_save_status(job_id=first_arg))
+
             # Treat request payload
             data = self._get_request_payload(request=request) or {}
 
             if end_point == 'pivot' and request.method.lower() == 'post':
-                return jsonify(self.pivot(**data))
+                return jsonify(self.cached_result(
+                    end_point=end_point, payload=data,
+                    function=self.pivot))
+
+            if end_point == 'pivot-streaming' and \
+                    request.method.lower() == 'post':
+                return Response(
+                    stream_with_context(self.pivot_streaming(**data)),
+                    mimetype='application/x-ndjson')
 
             if end_point == 'bulk-save' and request.method.lower() == 'post':
-                return jsonify(self.bulk_save(data_to_save=data))
+                return jsonify(self.bulk_save(
+                    data_to_save=data, **self._get_bulk_save_args()))
             raise e
 
+    def is_stream_request(self, end_point: str) -> bool:
+        """Check if request is a bulk save with a streamed body.
+
+        Args:
+            end_point (str):
+                The endpoint identifier.
+
+        Returns:
+            bool:
+                True if end-point is bulk-save and request mimetype is one
+                of `BulkSaveStream.MIMETYPES` or it is an async request,
+                whose body is spooled to disk.
+        """
+        if end_point != 'bulk-save':
+            return False
+        is_async = json.loads(request.args.get('async', 'false'))
+        return (
+            is_async is True or
+            BulkSaveStream.get_format(request.mimetype) is not None)
+
+    @staticmethod
+    def _get_bulk_save_args() -> dict:
+        """Parse bulk save query parameters.
+
+        Returns:
+            dict:
+                `chunk_size`, `continue_on_error`, `upsert`,
+                `conflict_columns`, `dedupe` and `dedupe_columns`
+                arguments.
+        """
+        return {
+            'chunk_size': json.loads(
+                request.args.get('chunk_size', 'null')),
+            'continue_on_error': json.loads(
+                request.args.get('continue_on_error', 'false')),
+            'upsert': json.loads(request.args.get('upsert', 'false')),
+            'conflict_columns': json.loads(
+                request.args.get('conflict_columns', 'null')),
+            'dedupe': json.loads(request.args.get('dedupe', 'false')),
+            'dedupe_columns': json.loads(
+                request.args.get('dedupe_columns', 'null'))}
+
+    def get_aggregate_rollups(self) -> list[AggregateRollup]:
+        """Return validated rollups of the view.
+
+        Returns:
+            list[AggregateRollup]:
+                Rollup definitions of the view.
+        """
+        for rollup in self.aggregate_rollups:
+            AggregateRollupManager.validate(
+                rollup=rollup, source_model=self.model_class)
+        return self.aggregate_rollups
+
+    def _get_rollup_keys(self, query: Query | None
+                         ) -> list[tuple[AggregateRollup, list[tuple]]]:
+        """Return rollup groups associated with source rows.
+
+        Args:
+            query (Query | None):
+                Query selecting source rows, if None no group is returned.
+
+        Returns:
+            list[tuple[AggregateRollup, list[tuple]]]:
+                Rollups and group keys affected by the source rows.
+        """
+        if query is None:
+            return []
+        return [
+            (rollup, AggregateRollupManager.keys_from_query(
+                rollup=rollup, source_model=self.model_class, query=query))
+            for rollup in self.get_aggregate_rollups()]
+
+    def _get_rollup_object_query(self, pk: Any) -> Query | None:
+        """Return a query selecting the object source row.
+
+        Args:
+            pk (Any):
+                Pumpwood primary key of the object.
+
+        Returns:
+            Query | None:
+                Query selecting the object or None if not found.
+        """
+        if pk is None or len(self.aggregate_rollups) == 0:
+            return None
+
+        model_object = self.model_class.query_get(
+            pk=pk, raise_error=False, use_cache=False)
+        if model_object is None:
+            return None
+        return self._get_rollup_objects_query(model_objects=[model_object])
+
+    def _get_rollup_objects_query(self, model_objects: list | None
+                                  ) -> Query | None:
+        """Return a query selecting the source rows of persisted objects.
+
+        Args:
+            model_objects (list | None):
+                Objects loaded or flushed on the session.
+
+        Returns:
+            Query | None:
+                Query selecting the objects or None if there are no
+                objects or rollups.
+        """
+        if not model_objects or len(self.aggregate_rollups) == 0:
+            return None
+
+        primary_keys = alchemy_inspect(self.model_class).primary_key
+        identities = [
+            alchemy_inspect(model_object).identity
+            for model_object in model_objects]
+        return self.model_class.query.filter(
+            tuple_(*primary_keys).in_(identities))
+
+    def _refresh_rollups(
+            self, session,
+            rollup_keys: list[tuple[AggregateRollup, list[tuple]]]
+            ) -> None:
+        """Recompute rollup groups from source table, without commit.
+
+        Args:
+            session:
+                SQLAlchemy session of the write transaction.
+            rollup_keys (list[tuple[AggregateRollup, list[tuple]]]):
+                Rollups and group keys that will be recomputed, a rollup
+                may be listed more than once.
+        """
+        merged_keys = {}
+        for rollup, keys in rollup_keys:
+            merged_keys.setdefault(id(rollup), (rollup, []))[1]\
+                .extend(keys)
+        for rollup, keys in merged_keys.values():
+            AggregateRollupManager.refresh_groups(
+                session=session, rollup=rollup,
+                source_model=self.model_class, keys=keys)
+
+    def _before_commit(self, session, model_objects: list | None = None
+                       ) -> None:
+        """Refresh rollup groups on the write transaction.
+
+        Groups of the source rows before the write, set on
+        `_pending_rollup_keys` by `save`, `save_many`, `delete` and
+        `delete_many`, and groups of the written objects are recomputed,
+        so source and rollup tables are committed together.
+
+        Args:
+            session:
+                SQLAlchemy session of the request.
+            model_objects (list | None):
+                Objects created or updated on the transaction.
+        """
+        rollup_keys = self._pending_rollup_keys or []
+        self._pending_rollup_keys = None
+        rollup_keys = rollup_keys + self._get_rollup_keys(
+            query=self._get_rollup_objects_query(
+                model_objects=model_objects))
+        self._refresh_rollups(session=session, rollup_keys=rollup_keys)
+
+    def save(self, data: dict, **kwargs) -> dict:
+        """Save object refreshing rollup groups before and after save.
+
+        Args:
+            data (dict):
+                The object data payload.
+            **kwargs:
+                Other arguments passed to `PumpWoodFlaskView.save`.
+
+        Returns:
+            dict:
+                The serialized representation of the saved object.
+        """
+        self._pending_rollup_keys = self._get_rollup_keys(
+            query=self._get_rollup_object_query(pk=data.get('pk')))
+        return super().save(data=data, **kwargs)
+
+    def save_many(self, data: List[dict], **kwargs) -> List[dict]:
+        """Save objects refreshing rollup groups before and after save.
+
+        Existing objects are retrieved with `default_query_get_many`, the
+        same batch query and request cache used by
+        `PumpWoodFlaskView.save_many`.
+
+        Args:
+            data (List[dict]):
+                List of object data payloads.
+            **kwargs:
+                Other arguments passed to `PumpWoodFlaskView.save_many`.
+
+        Returns:
+            List[dict]:
+                The serialized representation of the saved objects.
+        """
+        query = None
+        is_list_of_dict = isinstance(data, list) and all(
+            isinstance(x, dict) for x in data)
+        if len(self.aggregate_rollups) != 0 and is_list_of_dict:
+            pks = [x['pk'] for x in data if x.get('pk') is not None]
+            model_objects = self.model_class.default_query_get_many(pks=pks)
+            query = self._get_rollup_objects_query(model_objects=[
+                x for x in model_objects.values() if x is not None])
+        self._pending_rollup_keys = self._get_rollup_keys(query=query)
+        return super().save_many(data=data, **kwargs)
+
+    def delete(self, pk: Any, force_delete: bool = False) -> dict:
+        """Delete object refreshing its rollup groups.
+
+        Args:
+            pk (Any):
+                The primary key of the object to be deleted.
+            force_delete (bool):
+                If True, removes the record from the database.
+
+        Returns:
+            dict:
+                The serialized representation of the deleted object.
+        """
+        self._pending_rollup_keys = self._get_rollup_keys(
+            query=self._get_rollup_object_query(pk=pk))
+        return super().delete(pk=pk, force_delete=force_delete)
+
+    def delete_many(self, filter_dict: dict = None,
+                    exclude_dict: dict = None,
+                    force_delete: bool = False) -> int:
+        """Delete objects matching filters refreshing rollup groups.
+
+        Args:
+            filter_dict (dict):
+                Filters identifying objects to be deleted.
+            exclude_dict (dict):
+                Filters identifying objects to be spared.
+            force_delete (bool):
+                If True, removes the records from the database.
+
+        Returns:
+            int:
+                Result of `PumpWoodFlaskView.delete_many`.
+        """
+        query = None
+        if len(self.aggregate_rollups) != 0:
+            query = SqlalchemyQueryMisc.sqlalchemy_kward_query(
+                object_model=self.model_class,
+                base_query=self._add_default_filter(),
+                filter_dict=filter_dict, exclude_dict=exclude_dict)
+        self._pending_rollup_keys = self._get_rollup_keys(query=query)
+        return super().delete_many(
+            filter_dict=filter_dict, exclude_dict=exclude_dict,
+            force_delete=force_delete)
+
+    def _aggregate_rows(self, group_by: List[str], agg: dict,
+                        filter_dict: dict, exclude_dict: dict,
+                        order_by: List[str], limit: int | None,
+                        show_deleted: bool) -> tuple[List[str], List]:
+        """Query aggregated rows using rollup tables if request matches one.
+
+        If no rollup matches the request, `PumpWoodFlaskView._aggregate_rows`
+        is used to aggregate source table.
+
+        Args:
+            group_by (List[str]):
+                Columns used in the GROUP BY clause.
+            agg (dict):
+                Aggregation dictionary.
+            filter_dict (dict):
+                Filters to apply before aggregation.
+            exclude_dict (dict):
+                Exclusions to apply before aggregation.
+            order_by (List[str]):
+                Ordering for the aggregated results.
+            limit (int | None):
+                Maximum number of results to return.
+            show_deleted (bool):
+                If True, include deleted objects in the results.
+
+        Returns:
+            tuple[List[str], List]:
+                Name of the result columns and the query rows.
+        """
+        rollup_match = None
+        if len(self.aggregate_rollups) != 0:
+            rollup_match = AggregateRollupManager.match(
+                rollups=self.get_aggregate_rollups(),
+                source_model=self.model_class, group_by=group_by, agg=agg,
+                filter_dict=filter_dict, exclude_dict=exclude_dict,
+                show_deleted=show_deleted)
+        if rollup_match is None:
+            return super()._aggregate_rows(
+                group_by=group_by, agg=agg, filter_dict=filter_dict,
+                exclude_dict=exclude_dict, order_by=order_by, limit=limit,
+                show_deleted=show_deleted)
+
+        session = self.get_session()
+        rollup, rollup_group_by, rollup_agg = rollup_match
+        rollup_model = rollup.model_class
+        query = SqlalchemyQueryMisc.sqlalchemy_kward_query(
+            object_model=rollup_model,
+            base_query=rollup_model.default_filter_query(),
+            filter_dict=dict(filter_dict), exclude_dict=dict(exclude_dict))
+        aggregate_query = SqlalchemyQueryMisc.aggregate(
+            session=session, object_model=rollup_model, query=query,
+            group_by=rollup_group_by, agg=rollup_agg,
+            order_by=order_by).limit(limit)
+        query_result = session.execute(aggregate_query.statement)
+        return list(query_result.keys()), query_result.all()
+
     def pivot(self, filter_dict: dict = None,
               exclude_dict: dict = None, order_by: list = None,
               columns: list = None, format: str = 'list',
               variables: list = None, show_deleted: bool = False,
               add_pk_column: bool = False, limit: int = None,
-              **kwargs) -> Union[dict, list]:
+              parallel: int = None, page_size: int = None,
+              cursor: list = None, **kwargs) -> Union[dict, list]:
         """Query data in a long format and pivot it based on columns.
 
+        If `page_size` is set, complete wide rows are paginated using
+        keyset pagination over index columns and a dictionary with `data`
+        and `next_cursor` is returned.
+
+        If `parallel` is set, `limit` is not set and filter_dict can be
+        split along partition column (see `AuxPartitionSplit`), long data
+        is fetched using concurrent sub-queries and pivoted using pandas.
+
         Args:
             filter_dict (dict):
                 Filters to apply before pivoting.
@@ -89,6 +485,12 @@ class PumpWoodDataFlaskView(PumpWoodFlaskView):
                 If True, adds primary keys to ensure row uniqueness.
             limit (int):
                 Maximum number of source rows to process.
+            parallel (int):
+                Number of sub-queries executed concurrently.
+            page_size (int):
+                Number of wide rows returned using keyset pagination.
+            cursor (list):
+                `next_cursor` returned by the previous page.
             **kwargs:
                 For compatibility and extensibility.
 
@@ -96,6 +498,223 @@ class PumpWoodDataFlaskView(PumpWoodFlaskView):
             Union[dict, list]:
                 The pivoted data in the requested format.
         """
+        if format not in ['dict', 'list', 'series', 'split',
+                          'records', 'index']:
+            raise exceptions.PumpWoodException(
+                "Format must be in ['dict','list','series','split'," +
+                "'records','index']")
+
+        pivot_kwargs = {
+            'exclude_dict': exclude_dict, 'order_by': order_by,
+            'columns': columns, 'variables': variables,
+            'show_deleted': show_deleted, 'add_pk_column': add_pk_column}
+        split_filters = None
+        if limit is None and page_size is None:
+            split_filters = self.get_parallel_split(
+                filter_dict=filter_dict or {}, order_by=order_by or [],
+                parallel=parallel)
+        columns = [] if columns is None else columns
+
+        if split_filters is not None:
+            # Long data is fetched concurrently and pivoted using pandas
+            results = self.run_parallel(
+                function=self._pivot_long_rows, kwargs_list=[
+                    {'filter_dict': split_filter, **pivot_kwargs}
+                    for split_filter in split_filters])
+            melted_rows = [
+                row for result in results for row in result['rows']]
+            melted_data = pd.DataFrame(
+                melted_rows, columns=results[0]['columns']) \
+                if len(melted_rows) != 0 else pd.DataFrame([])
+            return self._pivot_melted(
+                melted_data=melted_data, index=results[0]['index'],
+                columns=columns, format=format)
+
+        query, index = self._pivot_query(
+            filter_dict=filter_dict, **pivot_kwargs)
+        if page_size is not None:
+            if limit is not None:
+                msg = "It is not possible to use limit and page_size together"
+                raise exceptions.PumpWoodWrongParameters(message=msg)
+            return self._pivot_page(
+                query=query, index=index, columns=columns, format=format,
+                page_size=page_size, cursor=cursor)
+
+        # Limit results to help on pagination
+        if limit is not None:
+            query = query.limit(limit)
+        return self._pivot_result(
+            query=query, index=index, columns=columns, format=format)
+
+    def _pivot_result(self, query: Query, index: List[str],
+                      columns: List[str], format: str) -> Union[dict, list]:
+        """Pivot long data query on database or using pandas.
+
+        Args:
+            query (Query):
+                Long data query.
+            index (List[str]):
+                Index columns of the pivot.
+            columns (List[str]):
+                Pivot columns.
+            format (str):
+                Pandas dictionary format for the output.
+
+        Returns:
+            Union[dict, list]:
+                The pivoted data in the requested format.
+        """
+        # Pivot on database returning only the wide rows when possible
+        if len(columns) != 0:
+            sql_pivot = self._sql_pivot(
+                query=query, index=index, columns=columns, format=format)
+            if sql_pivot is not None:
+                return sql_pivot
+        return self._pivot_melted(
+            melted_data=pd.DataFrame(query.all()), index=index,
+            columns=columns, format=format)
+
+    def _pivot_melted(self, melted_data: pd.DataFrame, index: List[str],
+                      columns: List[str], format: str) -> Union[dict, list]:
+        """Pivot long data using pandas.
+
+        Args:
+            melted_data (pd.DataFrame):
+                Long data.
+            index (List[str]):
+                Index columns of the pivot.
+            columns (List[str]):
+                Pivot columns, if empty long data is returned.
+            format (str):
+                Pandas dictionary format for the output.
+
+        Returns:
+            Union[dict, list]:
+                The pivoted data in the requested format.
+        """
+        if len(columns) == 0:
+            response = melted_data.to_dict(format)
+        elif melted_data.shape[0] == 0:
+            if format == 'records':
+                response = []
+            else:
+                response = {}
+        else:
+            if 'value' not in melted_data.columns:
+                raise exceptions.PumpWoodException(
+                    "'value' column not at melted data, it is not possible"
+                    " to pivot dataframe.")
+            pivoted_table = pd.pivot_table(
+                melted_data, values='value', index=index,
+                columns=columns)
+            pivoted_table = pivoted_table.where(
+                pd.notna(pivoted_table), None)
+            response = pivoted_table.reset_index().to_dict(format)
+
+        if type(response) is dict:
+            response = {str(k): v for k, v in response.items()}
+        return response
+
+    def _pivot_page(self, query: Query, index: List[str],
+                    columns: List[str], format: str, page_size: int,
+                    cursor: list | None) -> dict:
+        """Return a page of complete wide rows using keyset pagination.
+
+        Index tuples of the page are queried after the cursor using a
+        seek predicate and only long rows inside the page are pivoted.
+
+        Args:
+            query (Query):
+                Long data query.
+            index (List[str]):
+                Index columns of the pivot.
+            columns (List[str]):
+                Pivot columns.
+            format (str):
+                Pandas dictionary format for the output.
+            page_size (int):
+                Number of wide rows on the page.
+            cursor (list | None):
+                Index values of the last row of previous page, returned
+                as `next_cursor`. If None, the first page is returned.
+
+        Returns:
+            dict:
+                Dictionary with pivoted `data` and `next_cursor`, which is
+                None on the last page.
+
+        Raises:
+            PumpWoodWrongParameters:
+                If page_size is not a positive integer, pivot columns are
+                not set or cursor does not match index columns.
+        """
+        if type(page_size) is not int or page_size <= 0:
+            msg = "page_size must be a positive integer, received [{value}]"
+            raise exceptions.PumpWoodWrongParameters(
+                message=msg, payload={"value": page_size})
+        if len(columns) == 0 or len(index) == 0:
+            msg = (
+                "Keyset pagination requires pivot columns and at least one "
+                "index column")
+            raise exceptions.PumpWoodWrongParameters(message=msg)
+
+        index_columns = [getattr(self.model_class, col) for col in index]
+        query = query.order_by(None)
+        if cursor is not None:
+            cursor = SqlPivotManager.convert_cursor(
+                index_columns=index_columns, cursor=cursor)
+            query = query.filter(
+                tuple_(*index_columns) > tuple_(*cursor))
+
+        page_keys = SqlPivotManager.page_keys(
+            session=self.get_session(), subquery=query.subquery(),
+            index=index, columns=columns, page_size=page_size)
+        next_cursor = None
+        if page_size < len(page_keys):
+            last_key = page_keys[page_size - 1]
+            query = query.filter(
+                tuple_(*index_columns) <= tuple_(*last_key))
+            # Datetimes are boxed to be serialized as the index of data
+            next_cursor = list(AuxResultFormat.box_datetimes(
+                rows=[last_key])[0])
+
+        data = self._pivot_result(
+            query=query, index=index, columns=columns, format=format)
+        return {'data': data, 'next_cursor': next_cursor}
+
+    def _pivot_query(self, filter_dict: dict | None,
+                     exclude_dict: dict | None, order_by: list | None,
+                     columns: list | None, variables: list | None,
+                     show_deleted: bool, add_pk_column: bool
+                     ) -> tuple[Query, List[str]]:
+        """Build the long data query used on pivot end-points.
+
+        Args:
+            filter_dict (dict | None):
+                Filters to apply before pivoting.
+            exclude_dict (dict | None):
+                Exclusions to apply before pivoting.
+            order_by (list | None):
+                Ordering criteria for the source query.
+            columns (list | None):
+                Fields to be used as pivot columns.
+            variables (list | None):
+                Fields to include in the query (unpivoted).
+            show_deleted (bool):
+                If True, includes soft-deleted rows.
+            add_pk_column (bool):
+                If True, adds primary keys to ensure row uniqueness.
+
+        Returns:
+            tuple[Query, List[str]]:
+                Long data query returning the variables and the index
+                columns of the pivot.
+
+        Raises:
+            PumpWoodException:
+                If columns are not a list of model variables or if pk
+                columns are requested with pivot columns.
+        """
         # Set list and dicts in the fuction to no bug with pointers
         filter_dict = {} if filter_dict is None else filter_dict
         exclude_dict = {} if exclude_dict is None else exclude_dict
@@ -112,12 +731,6 @@ class PumpWoodDataFlaskView(PumpWoodFlaskView):
             raise exceptions.PumpWoodException(
                 'Column chosen as pivot is not at model variables')
 
-        if format not in ['dict', 'list', 'series', 'split',
-                          'records', 'index']:
-            raise exceptions.PumpWoodException(
-                "Format must be in ['dict','list','series','split'," +
-                "'records','index']")
-
         # Remove deleted entries from results
         if model_has_column(self.model_class, column='deleted'):
             if not show_deleted:
@@ -136,6 +749,10 @@ class PumpWoodDataFlaskView(PumpWoodFlaskView):
                 if (pk_col not in model_variables):
                     model_variables = [pk_col] + model_variables
 
+        # Check if partition column is used to help Postgres pruning
+        self.model_class.check_table_partition_filter(
+            filter_dict=filter_dict)
+
         # Use base query to limit user access
         base_query = self._add_default_filter()
         query = SqlalchemyQueryMisc\
@@ -146,51 +763,270 @@ class PumpWoodDataFlaskView(PumpWoodFlaskView):
                 exclude_dict=exclude_dict,
                 order_by=order_by)
 
-        # Limit results to help on pagination
-        if limit is not None:
-            query = query.limit(limit)
-
         # Set columns to be returned at query
         variables_to_return = [
             col for col in list(alchemy_inspect(self.model_class).c)
             if col.key in model_variables]
-        melted_data = pd.DataFrame(
-            query.with_entities(*variables_to_return).all())
+        query = query.with_entities(*variables_to_return)
+        index = [
+            col.key for col in variables_to_return
+            if col.key not in columns + ['value']]
+        return query, index
 
-        if len(columns) == 0:
-            response = melted_data.to_dict(format)
-        elif melted_data.shape[0] == 0:
-            if format == 'records':
-                response = []
-            else:
-                response = {}
-        else:
-            if 'value' not in melted_data.columns:
-                raise exceptions.PumpWoodException(
-                    "'value' column not at melted data, it is not possible"
-                    " to pivot dataframe.")
-            index = list(set(model_variables) - set(columns + ['value']))
+    def _pivot_long_rows(self, **kwargs) -> dict:
+        """Fetch long data rows of pivot, used on parallel sub-queries.
+
+        Args:
+            **kwargs:
+                Arguments passed to `_pivot_query`.
+
+        Returns:
+            dict:
+                Dictionary with result `columns`, pivot `index` and
+                `rows` as tuples.
+        """
+        query, index = self._pivot_query(**kwargs)
+        query_result = self.get_session().execute(query.statement)
+        return {
+            'columns': list(query_result.keys()), 'index': index,
+            'rows': [tuple(row) for row in query_result]}
+
+    def pivot_streaming(self, filter_dict: dict = None,
+                        exclude_dict: dict = None, columns: list = None,
+                        variables: list = None, show_deleted: bool = False,
+                        chunk_size: int = None,
+                        **kwargs) -> Iterator[bytes]:
+        """Pivot data in chunks streaming wide rows as NDJSON.
+
+        Long data is read ordered by index columns using a server side
+        cursor, each chunk of complete index groups is pivoted using
+        pandas and written as one JSON object per wide row. Memory is
+        proportional to `chunk_size` and to the largest index group, that
+        is limited by `pivot_stream_max_group_rows`. Pivot cells without
+        value are omitted from the rows, since chunks may not have the
+        same pivoted columns. When more than one column is pivoted, keys
+        of wide rows are the values of the columns joined by "__".
+
+        Response status is sent before rows are read, so errors raised
+        while streaming are written as a last line with an `__error__`
+        key holding error `type`, `message` and `payload`.
+
+        Args:
+            filter_dict (dict):
+                Filters to apply before pivoting.
+            exclude_dict (dict):
+                Exclusions to apply before pivoting.
+            columns (list):
+                Fields to be used as pivot columns.
+            variables (list):
+                Fields to include in the query (unpivoted).
+            show_deleted (bool):
+                If True, includes soft-deleted rows.
+            chunk_size (int):
+                Number of long rows fetched on each chunk, if not set
+                `pivot_stream_chunk_size` is used.
+            **kwargs:
+                For compatibility and extensibility.
+
+        Returns:
+            Iterator[bytes]:
+                NDJSON lines with wide rows ordered by index columns.
+
+        Raises:
+            PumpWoodException:
+                If columns are not set or if 'value' is not a variable.
+            PumpWoodWrongParameters:
+                If chunk_size is not a positive integer.
+        """
+        chunk_size = chunk_size or self.pivot_stream_chunk_size
+        if type(chunk_size) is not int or chunk_size <= 0:
+            msg = "chunk_size must be a positive integer, received [{value}]"
+            raise exceptions.PumpWoodWrongParameters(
+                message=msg, payload={"value": chunk_size})
+        if not columns:
+            raise exceptions.PumpWoodException(
+                "Pivot streaming must have at least one pivot column.")
+
+        query, index = self._pivot_query(
+            filter_dict=filter_dict, exclude_dict=exclude_dict,
+            order_by=None, columns=columns, variables=variables,
+            show_deleted=show_deleted, add_pk_column=False)
+        if 'value' not in [x['name'] for x in query.column_descriptions]:
+            raise exceptions.PumpWoodException(
+                "'value' column not at melted data, it is not possible"
+                " to pivot dataframe.")
+
+        # Complete index groups are only guaranteed if rows are ordered
+        # by index columns
+        query = query.order_by(None).order_by(*[
+            getattr(self.model_class, col) for col in index])
+        statement = query.statement.execution_options(yield_per=chunk_size)
+        session = self.get_session()
+        max_group_rows = self.pivot_stream_max_group_rows
+
+        def pivot_chunk(rows: list, result_columns: list) -> Iterator[bytes]:
+            if len(rows) == 0:
+                return
             pivoted_table = pd.pivot_table(
-                melted_data, values='value', index=index,
-                columns=columns)
-            pivoted_table = pivoted_table.where(
-                pd.notna(pivoted_table), None)
-            response = pivoted_table.reset_index().to_dict(format)
+                pd.DataFrame(rows, columns=result_columns), values='value',
+                index=index, columns=columns)
+            for index_values, row in pivoted_table.iterrows():
+                if len(index) == 1:
+                    index_values = (index_values, )
+                wide_row = dict(zip(index, index_values))
+                for key, value in row.items():
+                    if pd.notna(value):
+                        if isinstance(key, tuple):
+                            key = '__'.join(str(x) for x in key)
+                        wide_row[str(key)] = value
+                yield pumpJsonDump(wide_row) + b'\n'
+
+        def pivot_rows() -> Iterator[bytes]:
+            query_result = session.execute(statement)
+            result_columns = list(query_result.keys())
+            index_positions = [result_columns.index(col) for col in index]
+
+            def get_key(row) -> tuple:
+                return tuple(row[i] for i in index_positions)
+
+            # Rows of the last index group read, it may continue on the
+            # next partition. Only the end of each partition is scanned
+            group_key = None
+            group_rows = []
+            for partition in query_result.partitions():
+                last_key = get_key(partition[-1])
+                split_at = len(partition)
+                while 0 < split_at and \
+                        get_key(partition[split_at - 1]) == last_key:
+                    split_at = split_at - 1
+
+                if split_at == 0 and last_key == group_key:
+                    group_rows.extend(partition)
+                else:
+                    yield from pivot_chunk(
+                        rows=group_rows + list(partition[:split_at]),
+                        result_columns=result_columns)
+                    group_key = last_key
+                    group_rows = list(partition[split_at:])
+
+                if max_group_rows < len(group_rows):
+                    msg = (
+                        "Pivot streaming index group [{index_values}] has "
+                        "more than [{max_group_rows}] rows, use filters or "
+                        "more index variables")
+                    index_values = AuxResultFormat.box_datetimes(
+                        rows=[group_key])[0]
+                    raise exceptions.PumpWoodException(
+                        message=msg, payload={
+                            "index_values": list(index_values),
+                            "max_group_rows": max_group_rows})
+            yield from pivot_chunk(
+                rows=group_rows, result_columns=result_columns)
+
+        def stream() -> Iterator[bytes]:
+            try:
+                yield from pivot_rows()
+            except Exception as e:
+                logger.exception("Pivot streaming failed")
+                yield pumpJsonDump({
+                    '__error__': self._treat_bulk_save_error(e)}) + b'\n'
+        return stream()
+
+    def _sql_pivot(self, query: Query, index: List[str],
+                   columns: List[str], format: str
+                   ) -> Union[dict, list, None]:
+        """Pivot long data query on database using `SqlPivotManager`.
+
+        Args:
+            query (Query):
+                Long data query with filters, order and limit applied.
+            index (List[str]):
+                Index columns of the pivot.
+            columns (List[str]):
+                Pivot columns.
+            format (str):
+                Pandas dictionary format for the output.
+
+        Returns:
+            Union[dict, list]:
+                The pivoted data in the requested format or None if pivot
+                must be performed using pandas.
+        """
+        if not self.pivot_sql_max_columns or len(index) == 0:
+            return None
+        if format not in AuxResultFormat.FORMATS:
+            return None
+
+        session = self.get_session()
+        if not SqlPivotManager.is_available(session=session):
+            return None
+
+        subquery = query.subquery()
+        if 'value' not in subquery.c:
+            raise exceptions.PumpWoodException(
+                "'value' column not at melted data, it is not possible"
+                " to pivot dataframe.")
 
+        pivot_result = SqlPivotManager.run(
+            session=session, subquery=subquery, index=index,
+            columns=columns, max_columns=self.pivot_sql_max_columns)
+        if pivot_result is None:
+            return None
+
+        result_columns, rows = pivot_result
+        if len(rows) == 0:
+            return [] if format == 'records' else {}
+        response = AuxResultFormat.to_dict(
+            columns=result_columns, rows=rows, format=format)
         if type(response) is dict:
             response = {str(k): v for k, v in response.items()}
         return response
 
-    def bulk_save(self, data_to_save: list) -> int:
+    def bulk_save(self, data_to_save: list, chunk_size: int = None,
+                  continue_on_error: bool = False, upsert: bool = False,
+                  conflict_columns: List[str] = None, dedupe: bool = False,
+                  dedupe_columns: List[str] = None) -> int | dict:
         """Perform a high-performance bulk insertion of records.
 
+        If `chunk_size` is set (or `bulk_save_chunk_size` on view), data is
+        inserted and committed in chunks. Failed chunks are rolled back
+        and reported with the error treated as on API error handlers, so
+        clients can retry only the failed slices.
+
+        If `upsert` is True, data is inserted using
+        `INSERT ... ON CONFLICT (...) DO UPDATE`, rows that conflict with
+        existing rows update the columns present on data. Data must not
+        have repeated conflict keys on the same chunk.
+
+        If `dedupe` is True, rows with repeated keys on each chunk are
+        dropped and rows whose keys already exist on the table are not
+        inserted, see `_dedupe_bulk_save_data`.
+
         Args:
             data_to_save (list):
                 A list of dictionaries containing the object data.
+            chunk_size (int):
+                Number of rows inserted and committed on each transaction.
+            continue_on_error (bool):
+                If True, chunks after a failed chunk are still inserted.
+            upsert (bool):
+                If True, rows conflicting with existing rows are updated.
+            conflict_columns (List[str]):
+                Conflict target of upsert, if None primary key columns or
+                columns of a `UniqueConstraint` present on data are used.
+            dedupe (bool):
+                If True, duplicated rows are not inserted.
+            dedupe_columns (List[str]):
+                Columns identifying duplicated rows, if None primary key
+                columns, columns of a `UniqueConstraint` present on data or
+                all data columns are used. Ignored on upsert, where the
+                conflict target is used.
 
         Returns:
-            int:
-                The total number of records successfully saved.
+            int | dict:
+                The total number of records successfully saved if data is
+                not chunked, else a report with `saved`, `duplicates`,
+                `n_chunks`, `failed_chunks` and `not_processed` rows.
 
         Raises:
             PumpWoodException:
@@ -199,27 +1035,595 @@ class PumpWoodDataFlaskView(PumpWoodFlaskView):
                 If autofill configuration or payload columns are invalid.
             PumpWoodOtherException:
                 If `expected_cols_bulk_save` contains duplicate columns.
+            PumpWoodWrongParameters:
+                If chunk_size is not a positive integer, if upsert
+                conflict target can not be set or if dedupe columns are
+                not on data.
+            PumpWoodNotImplementedError:
+                If upsert is not implemented for the database dialect.
         """
         session = self.get_session()
 
         if len(self.expected_cols_bulk_save) == 0:
             raise exceptions.PumpWoodException('Bulk save not avaiable.')
 
-        session = self.db.session
-        pd_data_to_save = pd.DataFrame(data_to_save)
+        chunk_size = chunk_size or self.bulk_save_chunk_size
+        if chunk_size is not None and (
+                type(chunk_size) is not int or chunk_size <= 0):
+            msg = "chunk_size must be a positive integer, received [{value}]"
+            raise exceptions.PumpWoodWrongParameters(
+                message=msg, payload={"value": chunk_size})
+
+        pd_data_to_save = self._prepare_bulk_save_data(
+            data=pd.DataFrame(data_to_save))
+        if upsert:
+            conflict_columns = BulkSaveUpsert.get_conflict_columns(
+                model_class=self.model_class, data=pd_data_to_save,
+                conflict_columns=conflict_columns)
+        else:
+            conflict_columns = None
+
+        if chunk_size is None:
+            try:
+                if dedupe:
+                    pd_data_to_save = self._dedupe_bulk_save_data(
+                        session=session, data=pd_data_to_save,
+                        conflict_columns=conflict_columns,
+                        dedupe_columns=dedupe_columns)
+                self._bulk_insert(
+                    session=session, data=pd_data_to_save,
+                    conflict_columns=conflict_columns)
+                session.commit()
+                self._on_model_write()
+                return len(pd_data_to_save)
+            except Exception as e:
+                session.rollback()
+                raise e
+
+        n_rows = len(pd_data_to_save)
+        chunks = (
+            pd_data_to_save.iloc[start:start + chunk_size]
+            for start in range(0, n_rows, chunk_size))
+        return self._bulk_save_chunks(
+            chunks=chunks, n_rows=n_rows, prepare=False,
+            continue_on_error=continue_on_error,
+            conflict_columns=conflict_columns, dedupe=dedupe,
+            dedupe_columns=dedupe_columns)
+
+    def bulk_save_stream(self, stream: Any, format: str,
+                         chunk_size: int = None,
+                         continue_on_error: bool = False,
+                         upsert: bool = False,
+                         conflict_columns: List[str] = None,
+                         dedupe: bool = False,
+                         dedupe_columns: List[str] = None) -> dict:
+        """Bulk save data read incrementally from a streamed body.
+
+        Batches of `chunk_size` rows (default `bulk_save_stream_chunk_size`)
+        are parsed from the stream, filled by `FillBulkSaveFields`,
+        inserted and committed as they arrive, so the whole upload is never
+        held in memory.
+
+        Args:
+            stream (Any):
+                Binary file-like object, usually `request.stream`.
+            format (str):
+                Streamed format, see `BulkSaveStream.MIMETYPES`.
+            chunk_size (int):
+                Number of rows inserted and committed on each transaction.
+            continue_on_error (bool):
+                If True, batches after a failed batch are still inserted.
+            upsert (bool):
+                If True, rows conflicting with existing rows are updated.
+            conflict_columns (List[str]):
+                Conflict target of upsert, see `bulk_save`.
+            dedupe (bool):
+                If True, duplicated rows are not inserted.
+            dedupe_columns (List[str]):
+                Columns identifying duplicated rows, see `bulk_save`.
+
+        Returns:
+            dict:
+                Report with `saved`, `duplicates`, `n_chunks`,
+                `failed_chunks` and `not_processed` rows, the end of rows
+                not processed is None since the stream is not read after
+                a failure.
+
+        Raises:
+            PumpWoodException:
+                If bulk saving is not enabled for the view.
+            PumpWoodWrongParameters:
+                If chunk_size is not a positive integer or format is not
+                implemented.
+            PumpWoodNotImplementedError:
+                If `pyarrow` is not installed for Parquet and Arrow.
+        """
+        if len(self.expected_cols_bulk_save) == 0:
+            raise exceptions.PumpWoodException('Bulk save not avaiable.')
+
+        chunk_size = chunk_size or self.bulk_save_stream_chunk_size
+        if type(chunk_size) is not int or chunk_size <= 0:
+            msg = "chunk_size must be a positive integer, received [{value}]"
+            raise exceptions.PumpWoodWrongParameters(
+                message=msg, payload={"value": chunk_size})
+
+        chunks = BulkSaveStream.iter_batches(
+            stream=stream, format=format, batch_size=chunk_size)
+        return self._bulk_save_chunks(
+            chunks=chunks, n_rows=None, prepare=True,
+            continue_on_error=continue_on_error, upsert=upsert,
+            conflict_columns=conflict_columns, dedupe=dedupe,
+            dedupe_columns=dedupe_columns)
+
+    def bulk_save_async(self, stream: Any, format: str | None,
+                        chunk_size: int = None,
+                        continue_on_error: bool = False,
+                        upsert: bool = False,
+                        conflict_columns: List[str] = None,
+                        dedupe: bool = False,
+                        dedupe_columns: List[str] = None) -> dict:
+        """Spool body to disk and bulk save it on a background worker.
+
+        The request returns as soon as the body is spooled, progress is
+        queried on `bulk-save-status/<job_id>` end-point. Data is saved
+        in chunks as `bulk_save_stream`.
+
+        Args:
+            stream (Any):
+                Binary file-like object, usually `request.stream`.
+            format (str | None):
+                Streamed format, None if body is a JSON array.
+            chunk_size (int):
+                Number of rows inserted and committed on each transaction,
+                default `bulk_save_chunk_size` or
+                `bulk_save_stream_chunk_size`.
+            continue_on_error (bool):
+                If True, chunks after a failed chunk are still inserted.
+            upsert (bool):
+                If True, rows conflicting with existing rows are updated.
+            conflict_columns (List[str]):
+                Conflict target of upsert, see `bulk_save`.
+            dedupe (bool):
+                If True, duplicated rows are not inserted.
+            dedupe_columns (List[str]):
+                Columns identifying duplicated rows, see `bulk_save`.
+
+        Returns:
+            dict:
+                Status of the queued job with its `job_id`.
+
+        Raises:
+            PumpWoodException:
+                If bulk saving is not enabled for the view.
+            PumpWoodWrongParameters:
+                If chunk_size is not a positive integer.
+            PumpWoodNotImplementedError:
+                If job status table was not registered on service
+                metadata with `BulkSaveJob.build_table`.
+        """
+        if len(self.expected_cols_bulk_save) == 0:
+            raise exceptions.PumpWoodException('Bulk save not avaiable.')
+        table = BulkSaveJob.get_table(metadata=self.model_class.metadata)
+
+        chunk_size = (
+            chunk_size or self.bulk_save_chunk_size or
+            self.bulk_save_stream_chunk_size)
+        if type(chunk_size) is not int or chunk_size <= 0:
+            msg = "chunk_size must be a positive integer, received [{value}]"
+            raise exceptions.PumpWoodWrongParameters(
+                message=msg, payload={"value": chunk_size})
+
+        def run_job(status: dict, path: str):
+            self._run_bulk_save_job(
+                status=status, path=path, format=format,
+                chunk_size=chunk_size, continue_on_error=continue_on_error,
+                upsert=upsert, conflict_columns=conflict_columns,
+                dedupe=dedupe, dedupe_columns=dedupe_columns)
+
+        return BulkSaveJob.submit(
+            engine=self.db.engine, table=table, stream=stream,
+            model_class=self.model_class.__name__,
+            format=format, function=run_job,
+            treat_error=self._treat_bulk_save_error)
+
+    def _run_bulk_save_job(self, status: dict, path: str,
+                           format: str | None, chunk_size: int,
+                           continue_on_error: bool, upsert: bool,
+                           conflict_columns: List[str] | None,
+                           dedupe: bool,
+                           dedupe_columns: List[str] | None) -> dict:
+        """Bulk save spooled body updating job progress on each chunk.
+
+        Args:
+            status (dict):
+                Job status, updated on database after each chunk.
+            path (str):
+                Path of the spooled body.
+            format (str | None):
+                Streamed format, None if body is a JSON array.
+            chunk_size (int):
+                Number of rows inserted and committed on each transaction.
+            continue_on_error (bool):
+                If True, chunks after a failed chunk are still inserted.
+            upsert (bool):
+                If True, rows conflicting with existing rows are updated.
+            conflict_columns (List[str] | None):
+                Conflict target of upsert.
+            dedupe (bool):
+                If True, duplicated rows are not inserted.
+            dedupe_columns (List[str] | None):
+                Columns identifying duplicated rows.
+
+        Returns:
+            dict:
+                Final chunk report.
+        """
+        table = BulkSaveJob.get_table(metadata=self.model_class.metadata)
+
+        def on_chunk(report: dict, rows_processed: int):
+            BulkSaveJob.update_progress(
+                engine=self.db.engine, table=table, status=status,
+                report=report, rows_processed=rows_processed)
+
+        with open(path, 'rb') as file:
+            chunks = BulkSaveStream.iter_batches(
+                stream=file, format=format or 'json',
+                batch_size=chunk_size)
+            return self._bulk_save_chunks(
+                chunks=chunks, n_rows=None, prepare=True,
+                continue_on_error=continue_on_error, upsert=upsert,
+                conflict_columns=conflict_columns, dedupe=dedupe,
+                dedupe_columns=dedupe_columns, on_chunk=on_chunk)
+
+    def bulk_save_status(self, job_id: str) -> dict:
+        """Return status of an asynchronous bulk save job.
+
+        Args:
+            job_id (str):
+                Identifier returned by `bulk-save?async=true`.
+
+        Returns:
+            dict:
+                Job `status`, `rows_processed`, `rows_per_second`, `saved`
+                and `duplicates` rows, `failed_chunks`, `not_processed`
+                rows and `error`.
+
+        Raises:
+            PumpWoodObjectDoesNotExist:
+                If job is not found for the model class or has expired.
+            PumpWoodNotImplementedError:
+                If job status table was not registered on service
+                metadata with `BulkSaveJob.build_table`.
+        """
+        return BulkSaveJob.get_status(
+            engine=self.db.engine,
+            table=BulkSaveJob.get_table(metadata=self.model_class.metadata),
+            job_id=job_id,
+            model_class=self.model_class.__name__)
+
+    def _prepare_bulk_save_data(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Fill bulk save fields, coerce types and replace NaN for None.
+
+        Args:
+            data (pd.DataFrame):
+                Data received on request.
+
+        Returns:
+            pd.DataFrame:
+                Data ready to be inserted on database.
+
+        Raises:
+            PumpWoodDataLoadingException:
+                If autofill fails or values are not valid for the model
+                column types.
+        """
+        data = FillBulkSaveFields.run(
+            data=data, fields=self.expected_cols_bulk_save,
+            microservice=self.microservice)
+        if self.bulk_save_coerce:
+            data = BulkSaveCoerce.coerce(
+                model_class=self.model_class, data=data)
 
         # Replace NaN for None to insert on the database
-        pd_data_to_save = FillBulkSaveFields.run(
-            data=pd_data_to_save,
-            fields=self.expected_cols_bulk_save,
-            microservice=self.microservice)\
-            .replace({np.nan: None})
+        return data.replace({np.nan: None})
+
+    def _bulk_save_chunks(self, chunks: Iterator[pd.DataFrame],
+                          n_rows: int | None, prepare: bool,
+                          continue_on_error: bool,
+                          conflict_columns: List[str] = None,
+                          upsert: bool = False, dedupe: bool = False,
+                          dedupe_columns: List[str] = None,
+                          on_chunk: Callable[[dict, int], None] = None
+                          ) -> dict:
+        """Insert and commit each chunk, reporting failed chunks.
+
+        Failed chunks are rolled back and reported with the error treated
+        as on API error handlers, so clients can retry only the failed
+        slices. Errors raised when reading the next chunk end the loop.
+        If the loop stops on a failed chunk, `not_processed` is set only
+        when data follows it.
+
+        Args:
+            chunks (Iterator[pd.DataFrame]):
+                Chunks of data in order.
+            n_rows (int | None):
+                Total number of rows, None if it is unknown before reading
+                all chunks.
+            prepare (bool):
+                If True, `_prepare_bulk_save_data` is applied to each
+                chunk and the upsert conflict target is set for it.
+            continue_on_error (bool):
+                If True, chunks after a failed chunk are still inserted.
+            conflict_columns (List[str]):
+                Conflict target of upsert.
+            upsert (bool):
+                If True and `prepare`, data is upserted using conflict
+                target returned by `BulkSaveUpsert.get_conflict_columns`.
+            dedupe (bool):
+                If True, duplicated rows of each chunk are dropped and
+                counted on `duplicates`.
+            dedupe_columns (List[str]):
+                Columns identifying duplicated rows.
+            on_chunk (Callable[[dict, int], None]):
+                Called after each chunk with the report and the number of
+                rows processed.
+
+        Returns:
+            dict:
+                Report with `saved`, `duplicates`, `n_chunks`,
+                `failed_chunks` and `not_processed` rows.
+        """
+        session = self.db.session
+        report = {
+            'saved': 0, 'duplicates': 0, 'n_chunks': 0,
+            'failed_chunks': [], 'not_processed': None}
+        start = 0
+        is_stopped = False
+        chunks = iter(chunks)
+        while True:
+            try:
+                chunk = next(chunks)
+            except StopIteration:
+                break
+            except Exception as e:
+                report['failed_chunks'].append({
+                    'chunk': report['n_chunks'], 'start': start,
+                    'end': None, 'error': self._treat_bulk_save_error(e)})
+                break
+
+            end = start + len(chunk)
+            report['n_chunks'] += 1
+            try:
+                chunk_conflict_columns = conflict_columns
+                if prepare:
+                    chunk = self._prepare_bulk_save_data(data=chunk)
+                    if upsert:
+                        chunk_conflict_columns = \
+                            BulkSaveUpsert.get_conflict_columns(
+                                model_class=self.model_class, data=chunk,
+                                conflict_columns=conflict_columns)
+                n_duplicates = 0
+                if dedupe:
+                    n_chunk_rows = len(chunk)
+                    chunk = self._dedupe_bulk_save_data(
+                        session=session, data=chunk,
+                        conflict_columns=chunk_conflict_columns,
+                        dedupe_columns=dedupe_columns)
+                    n_duplicates = n_chunk_rows - len(chunk)
+                self._bulk_insert(
+                    session=session, data=chunk,
+                    conflict_columns=chunk_conflict_columns)
+                session.commit()
+                report['saved'] += len(chunk)
+                report['duplicates'] += n_duplicates
+            except Exception as e:
+                session.rollback()
+                report['failed_chunks'].append({
+                    'chunk': report['n_chunks'] - 1, 'start': start,
+                    'end': end, 'error': self._treat_bulk_save_error(e)})
+                if not continue_on_error:
+                    is_stopped = True
+                    has_next_chunk = end < n_rows if n_rows is not None \
+                        else self._has_next_chunk(chunks=chunks)
+                    if has_next_chunk:
+                        report['not_processed'] = {
+                            'start': end, 'end': n_rows}
+
+            if on_chunk is not None:
+                on_chunk(report, end)
+            if is_stopped:
+                break
+            start = end
+
+        if report['saved'] != 0:
+            self._on_model_write()
+        return report
+
+    @staticmethod
+    def _has_next_chunk(chunks: Iterator[pd.DataFrame]) -> bool:
+        """Check if there is data after the current chunk.
+
+        The next chunk is consumed, it must be used only when the loop
+        is stopped.
+
+        Args:
+            chunks (Iterator[pd.DataFrame]):
+                Iterator of chunks.
 
+        Returns:
+            bool:
+                False if chunks are exhausted, True if there is another
+                chunk or if reading it fails.
+        """
         try:
+            next(chunks)
+        except StopIteration:
+            return False
+        except Exception:
+            return True
+        return True
+
+    def _dedupe_bulk_save_data(self, session, data: pd.DataFrame,
+                               conflict_columns: List[str] | None,
+                               dedupe_columns: List[str] | None
+                               ) -> pd.DataFrame:
+        """Drop duplicated rows before insertion.
+
+        On insert, the first row of each repeated key is kept and rows
+        whose keys already exist on the table are dropped with an
+        anti-join against a temporary table of the keys, so rows of later
+        chunks repeating keys of saved chunks are also dropped. On upsert,
+        the last row of each conflict key is kept and existing rows are
+        updated as usual.
+
+        Args:
+            session:
+                SQLAlchemy session used on the request.
+            data (pd.DataFrame):
+                Data returned by `_prepare_bulk_save_data`.
+            conflict_columns (List[str] | None):
+                Conflict target, if set data is upserted.
+            dedupe_columns (List[str] | None):
+                Columns identifying duplicated rows on insert.
+
+        Returns:
+            pd.DataFrame:
+                Data without duplicated rows.
+        """
+        if conflict_columns is not None:
+            return BulkSaveDedupe.drop_payload_duplicates(
+                data=data, key_columns=conflict_columns, keep='last')
+
+        key_columns = BulkSaveDedupe.get_key_columns(
+            model_class=self.model_class, data=data,
+            dedupe_columns=dedupe_columns)
+        data = BulkSaveDedupe.drop_payload_duplicates(
+            data=data, key_columns=key_columns, keep='first')
+        return BulkSaveDedupe.drop_existing(
+            session=session, model_class=self.model_class, data=data,
+            key_columns=key_columns)
+
+    def _bulk_insert(self, session, data: pd.DataFrame,
+                     conflict_columns: List[str] = None) -> None:
+        """Insert validated data and rollup deltas without commit.
+
+        Args:
+            session:
+                SQLAlchemy session used on the request.
+            data (pd.DataFrame):
+                Data returned by `FillBulkSaveFields.run`.
+            conflict_columns (List[str]):
+                Conflict target, if set data is upserted.
+        """
+        if conflict_columns is not None:
+            return self._bulk_upsert(
+                session=session, data=data,
+                conflict_columns=conflict_columns)
+
+        # Use COPY on Postgres, fallback to insert mappings
+        is_copied = False
+        if self.bulk_save_copy:
+            is_copied = BulkSaveCopy.copy(
+                session=session, model_class=self.model_class, data=data)
+        if not is_copied:
             session.bulk_insert_mappings(
-                self.model_class, pd_data_to_save.to_dict("records"))
-            session.commit()
-            return len(pd_data_to_save)
-        except Exception as e:
-            session.rollback()
-            raise e
+                self.model_class, data.to_dict("records"))
+
+        # Update rollups on the same transaction of the data
+        for rollup in self.get_aggregate_rollups():
+            AggregateRollupManager.bulk_save_delta(
+                session=session, rollup=rollup,
+                source_model=self.model_class, data=data)
+
+    def _bulk_upsert(self, session, data: pd.DataFrame,
+                     conflict_columns: List[str]) -> None:
+        """Upsert validated data and refresh rollup groups without commit.
+
+        Existing rows with conflict keys of data must be accessible by
+        the user, `ON CONFLICT DO UPDATE` does not apply default filters.
+        Updated rows may move between rollup groups, so groups of the
+        existing rows and of the upserted rows are recomputed instead of
+        applying the inserted deltas.
+
+        Args:
+            session:
+                SQLAlchemy session used on the request.
+            data (pd.DataFrame):
+                Data returned by `FillBulkSaveFields.run`.
+            conflict_columns (List[str]):
+                Conflict target of the upsert.
+
+        Raises:
+            PumpWoodForbidden:
+                If existing rows can not be accessed by the user.
+        """
+        BulkSaveUpsert.check_permission(
+            model_class=self.model_class, data=data,
+            conflict_columns=conflict_columns,
+            base_query=self._add_default_filter())
+        rollups = self.get_aggregate_rollups()
+        rollup_keys = {i: [] for i in range(len(rollups))}
+
+        def collect_rollup_keys():
+            if len(rollups) == 0:
+                return None
+            for query in BulkSaveUpsert.existing_rows_queries(
+                    model_class=self.model_class, data=data,
+                    conflict_columns=conflict_columns):
+                for i, rollup in enumerate(rollups):
+                    rollup_keys[i].extend(
+                        AggregateRollupManager.keys_from_query(
+                            rollup=rollup, source_model=self.model_class,
+                            query=query))
+
+        collect_rollup_keys()
+        # Use COPY to a staging table on Postgres, fallback to executemany
+        is_copied = False
+        if self.bulk_save_copy:
+            is_copied = BulkSaveCopy.upsert(
+                session=session, model_class=self.model_class, data=data,
+                conflict_columns=conflict_columns)
+        if not is_copied and len(data) != 0:
+            statement = BulkSaveUpsert.build_statement(
+                session=session, model_class=self.model_class,
+                data_columns=list(data.columns),
+                conflict_columns=conflict_columns)
+            session.execute(statement, data.to_dict("records"))
+
+        collect_rollup_keys()
+        for i, rollup in enumerate(rollups):
+            AggregateRollupManager.refresh_groups(
+                session=session, rollup=rollup,
+                source_model=self.model_class, keys=rollup_keys[i])
+
+    @staticmethod
+    def _treat_bulk_save_error(error: Exception) -> dict:
+        """Convert a chunk or stream error to the dictionary returned.
+
+        Database errors are treated with `TreatSQLAlchemyError` and
+        `TreatPsycopg2Error` as on registered error handlers.
+
+        Args:
+            error (Exception):
+                Error raised when inserting the chunk.
+
+        Returns:
+            dict:
+                Dictionary with error `type`, `message` and `payload`.
+        """
+        connection_url = current_app.config['SQLALCHEMY_DATABASE_URI']
+        if isinstance(error, exceptions.PumpWoodException):
+            error_dict = error.to_dict()
+        elif isinstance(error, sqlalchemy.exc.SQLAlchemyError):
+            error_dict = TreatSQLAlchemyError.treat(
+                error=error, connection_url=connection_url)
+        elif isinstance(error, psycopg2.Error):
+            error_dict = TreatPsycopg2Error.treat(
+                error=error, connection_url=connection_url)
+        else:
+            error_dict = {
+                'type': type(error).__name__, 'message': str(error),
+                'payload': {}}
+        return {
+            'type': error_dict['type'], 'message': error_dict['message'],
+            'payload': error_dict.get('payload', {})}
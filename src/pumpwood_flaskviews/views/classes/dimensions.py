@@ -104,8 +104,10 @@ class PumpWoodDimensionsFlaskView(PumpWoodFlaskView):
             ) sub
             ORDER BY keys
         """.format(query_string=query_string) # NOQA Controlled Input
+        # Use session connection to run the query inside request
+        # transaction, respecting the statement timeout of the end-point
         distinct_keys = pd.read_sql(
-            text(sql_statement), con=self.db.engine)\
+            text(sql_statement), con=self.db.session.connection())\
             .loc[:, "keys"]
         return distinct_keys
 
@@ -147,6 +149,7 @@ class PumpWoodDimensionsFlaskView(PumpWoodFlaskView):
             WHERE dimensions -> '{key}' IS NOT NULL
             ORDER BY value
         """.format(query_string=query_string, key=key) # NOQA Controlled Input
-        distinct_values = pd.read_sql(text(sql_statement), con=self.db.engine)\
+        distinct_values = pd.read_sql(
+            text(sql_statement), con=self.db.session.connection())\
             .loc[:, "value"]
         return distinct_values
@@ -1,32 +1,36 @@
 """Simple pumpwood view."""
 import os
 import io
-import pandas as pd
 import textwrap
 import inspect
 import datetime
 import simplejson as json
-from typing import Any, Union, List, Literal
+from typing import Any, Union, List, Literal, Callable
 from loguru import logger
 from flask.views import View
 from flask import request, Response
 from flask import jsonify, send_file
 from werkzeug.utils import secure_filename
 from flask_sqlalchemy.query import Query
+from marshmallow import ValidationError
 from sqlalchemy.sql.schema import UniqueConstraint
 from pumpwood_communication import exceptions
 from pumpwood_communication.microservices import PumpWoodMicroService
 from pumpwood_communication.cache import default_cache
-from pumpwood_flaskviews.sqlalchemy import get_session
+from pumpwood_communication.serializers import CompositePkBase64Converter
+from pumpwood_flaskviews.sqlalchemy import (
+    get_session, StatementTimeout, PumpwoodRoutingSession, ReadReplicaRouter)
 from pumpwood_flaskviews.exceptions import PumpWoodFlaskViewEndPointFoundError
+from pumpwood_flaskviews.cache import PumpwoodResultCache
 
 # Flask view
-from pumpwood_flaskviews.views.classes.aux import AuxFillOptions
+from pumpwood_flaskviews.views.classes.aux import (
+    AuxFillOptions, AuxResultFormat, AuxPartitionSplit)
 from pumpwood_flaskviews.inspection import model_has_column
 from pumpwood_flaskviews.query import SqlalchemyQueryMisc
 from pumpwood_flaskviews.auth import AuthFactory
 from pumpwood_flaskviews.action import LoadActionParameters
-from pumpwood_flaskviews.config import INFO_CACHE_EXPIRE
+from pumpwood_flaskviews.config import INFO_CACHE_EXPIRE, STATEMENT_TIMEOUT
 from pumpwood_i8n.singletons import pumpwood_i8n as _
 
 
@@ -94,6 +98,40 @@ class PumpWoodFlaskView(View):
     list_paginate_limit: int = 50
     """Front-end uses 50 as limit to check if all data have been fetched,
        if change this parameter, be sure to update front-end list component."""
+    statement_timeout: dict[str, int] = {}
+    """Statement timeout in milliseconds by end-point, ex.:
+       `{'aggregate': 30000, 'list-without-pag': 60000}`. End-points not
+       set will use `PUMPWOOD_FLASKVIEWS__STATEMENT_TIMEOUT`, clients may
+       lower the timeout using `X-PUMPWOOD-Statement-Timeout` header."""
+    read_replica_bind: str = None
+    """Bind key at `SQLALCHEMY_BINDS` of a read replica database. If set,
+       `read_only_end_points` will be routed to replica, database session
+       must be created with `PumpwoodRoutingSession` class. Read-your-writes
+       across hosts needs the client to send back the sticky window
+       returned on `X-PUMPWOOD-Read-Primary-Until` header or cookie, else
+       only the host-local cache marker of the token is used, which does
+       not apply on other hosts or if pumpwood cache is disabled."""
+    read_only_end_points: list[str] = [
+        'list', 'list-without-pag', 'retrieve', 'aggregate', 'pivot',
+        'pivot-streaming', 'list-dimensions', 'list-dimension-values']
+    """End-points that can be routed to the read replica. Requests of a
+       token that has written recently will use the primary database."""
+    result_cache_expire: dict[str, int] = {}
+    """Cache expire in seconds of end-point results shared across requests,
+       ex.: `{'list': 60, 'aggregate': 300}`. Results are keyed by payload
+       and user access scope and evicted when model data is changed by
+       the view. End-points not set are not cached. Cache is host-local,
+       eviction only reaches the host that handled the write, so results
+       on other hosts or of data changed outside the view may be stale up
+       to the TTL. Aggregate rows are cached independent of the output
+       format."""
+    parallel_max_workers: int = 4
+    """Maximum number of concurrent sub-queries used by `list-without-pag`
+       and `pivot` when `parallel` is requested, each sub-query uses one
+       connection from the pool. 0 disables parallel execution."""
+    parallel_split_column: str = None
+    """Column used to split parallel requests, if not set the first
+       `table_partition` column of the model is used."""
 
     # GUI attributes
     gui_retrieve_fieldset: dict = None
@@ -210,6 +248,221 @@ class PumpWoodFlaskView(View):
         """
         return get_session(db=self.db)
 
+    def get_statement_timeout(self, end_point: str) -> int | None:
+        """Return the statement timeout to be applied on the end-point.
+
+        Args:
+            end_point (str):
+                The endpoint identifier (e.g., 'aggregate', 'pivot').
+
+        Returns:
+            int | None:
+                Timeout in milliseconds or None if no timeout is set.
+        """
+        view_timeout = self.statement_timeout.get(
+            end_point, STATEMENT_TIMEOUT)
+        return StatementTimeout.resolve(view_timeout=view_timeout)
+
+    def is_stream_request(self, end_point: str) -> bool:
+        """Check if request body is read as a stream by the end-point.
+
+        Streamed bodies are not buffered to log the payload on
+        authorization or parsed as JSON/form payload before dispatch.
+
+        Args:
+            end_point (str):
+                The endpoint identifier.
+
+        Returns:
+            bool:
+                False, views with streamed end-points override it.
+        """
+        return False
+
+    def set_statement_timeout(self, end_point: str) -> None:
+        """Set statement timeout on the request transactions.
+
+        Timeout is set with `SET LOCAL` semantics on the current transaction
+        and again on each transaction begun later on the request.
+
+        Args:
+            end_point (str):
+                The endpoint identifier (e.g., 'aggregate', 'pivot').
+        """
+        timeout = self.get_statement_timeout(end_point=end_point)
+        StatementTimeout.apply(session=self.db.session, timeout=timeout)
+
+    def set_read_replica(self, end_point: str) -> None:
+        """Route read-only end-points to read replica database.
+
+        Requests of clients that have written in the last
+        `PUMPWOOD_FLASKVIEWS__READ_REPLICA_STICKY_EXPIRE` seconds are kept
+        on primary database so they can read their own writes, see
+        `ReadReplicaRouter` for how the window is carried.
+
+        Args:
+            end_point (str):
+                The endpoint identifier (e.g., 'aggregate', 'pivot').
+
+        Raises:
+            PumpWoodOtherException:
+                If `read_replica_bind` is not set on database binds or
+                session is not a `PumpwoodRoutingSession`.
+        """
+        bind_key = None
+        if self.read_replica_bind is not None and \
+                end_point in self.read_only_end_points:
+            if self.read_replica_bind not in self.db.engines.keys():
+                msg = (
+                    "Read replica bind [{bind}] is not set at "
+                    "SQLALCHEMY_BINDS")
+                raise exceptions.PumpWoodOtherException(
+                    message=msg, payload={"bind": self.read_replica_bind})
+            if not isinstance(self.db.session(), PumpwoodRoutingSession):
+                msg = (
+                    "Database session must be created with "
+                    "PumpwoodRoutingSession class to use read replica")
+                raise exceptions.PumpWoodOtherException(message=msg)
+
+            auth_header = AuthFactory.get_auth_header()
+            is_sticky = ReadReplicaRouter.is_sticky(
+                authorization_token=auth_header.get('Authorization'))
+            if not is_sticky:
+                bind_key = self.read_replica_bind
+        ReadReplicaRouter.set_request_bind(bind_key=bind_key)
+
+    def get_result_cache_scope(self) -> dict:
+        """Return the user access scope used on result cache keys.
+
+        Returns:
+            dict:
+                User superuser flag and row permission ids, and the scope
+                of the model base query.
+        """
+        return {
+            'user': AuthFactory.get_access_scope(),
+            'base_query': self.model_class.base_query.get_access_scope()}
+
+    def cached_result(self, end_point: str, payload: dict,
+                      function: Callable) -> Any:
+        """Return end-point result using cross-request result cache.
+
+        If end-point is not set on `result_cache_expire`, the function is
+        called without cache.
+
+        Args:
+            end_point (str):
+                The endpoint identifier (e.g., 'list', 'aggregate').
+            payload (dict):
+                Payload passed as keyword arguments to function.
+            function (Callable):
+                Function that will return the end-point result.
+
+        Returns:
+            Any:
+                End-point result.
+        """
+        expire = self.result_cache_expire.get(end_point)
+        if expire is None or expire <= 0:
+            return function(**payload)
+
+        hash_dict = PumpwoodResultCache.build_hash_dict(
+            model_class=self.model_class.__name__, end_point=end_point,
+            payload=payload, access_scope=self.get_result_cache_scope())
+        return PumpwoodResultCache.get_or_compute(
+            hash_dict=hash_dict, function=lambda: function(**payload),
+            expire=expire)
+
+    def get_parallel_split(self, filter_dict: dict, order_by: list,
+                           parallel: int | None) -> list[dict] | None:
+        """Split request filter to run sub-queries in parallel.
+
+        Args:
+            filter_dict (dict):
+                Request filter dictionary.
+            order_by (list):
+                Request order by.
+            parallel (int | None):
+                Number of sub-queries requested, limited by
+                `parallel_max_workers`.
+
+        Returns:
+            list[dict] | None:
+                Filter of each sub-query or None if request must run
+                serially.
+        """
+        if not parallel or not self.parallel_max_workers:
+            return None
+        column = AuxPartitionSplit.get_split_column(
+            model_class=self.model_class,
+            split_column=self.parallel_split_column)
+        return AuxPartitionSplit.split_filter_dict(
+            filter_dict=filter_dict, order_by=order_by, column=column,
+            n_splits=min(int(parallel), self.parallel_max_workers))
+
+    def run_parallel(self, function: Callable,
+                     kwargs_list: list[dict]) -> list:
+        """Run function in parallel threads using different connections.
+
+        Statement timeout applied on the request is set on transactions of
+        each thread by `StatementTimeout.after_begin` and the request bind
+        is kept, so replica routing is also used on sub-queries. Threads
+        are limited to the connections of the engine pool.
+
+        Args:
+            function (Callable):
+                Function to be called with each kwargs.
+            kwargs_list (list[dict]):
+                Keyword arguments of each call.
+
+        Returns:
+            list:
+                Results of each call in the same order of `kwargs_list`.
+        """
+        max_workers = AuxPartitionSplit.get_pool_max_workers(
+            engine=self.db.session.get_bind(),
+            max_workers=self.parallel_max_workers)
+        return AuxPartitionSplit.run(
+            function=function, kwargs_list=kwargs_list,
+            max_workers=max_workers)
+
+    def _before_commit(self, session, model_objects: list | None = None
+                       ) -> None:
+        """Run on the write transaction right before it is committed.
+
+        Subclasses may write data derived from the model changes, it is
+        committed or rolled back with them.
+
+        Args:
+            session:
+                SQLAlchemy session of the request.
+            model_objects (list | None):
+                Objects created or updated on the transaction, they are
+                already flushed to database. None if objects were deleted.
+        """
+        return None
+
+    def _on_model_write(self) -> None:
+        """Run after data is committed to model table.
+
+        Evict model cached results and start the sticky primary window for
+        the request token if view uses a read replica.
+        """
+        if len(self.result_cache_expire) != 0:
+            is_evicted = PumpwoodResultCache.evict(
+                model_class=self.model_class.__name__)
+            if not is_evicted:
+                msg = (
+                    "Result cache eviction of model [{model_class}] "
+                    "failed, cached results may be stale until they "
+                    "expire").format(model_class=self.model_class.__name__)
+                logger.error(msg)
+
+        if self.read_replica_bind is not None:
+            auth_header = AuthFactory.get_auth_header()
+            ReadReplicaRouter.mark_write(
+                authorization_token=auth_header.get('Authorization'))
+
     @classmethod
     def pumpwood_pk_get(cls, pk: Union[str, int]) -> object:
         """Get model_class object using pumpwood pk.
@@ -400,25 +653,44 @@ class PumpWoodFlaskView(View):
         # Ping the database and rollback session if necessary
         self.get_session()
 
+        # Do not buffer streamed bodies, they are read by the end-point
+        is_stream_request = self.is_stream_request(end_point=end_point)
+        payload_text = None
+        if not is_stream_request:
+            payload_text = request.get_data()[:300]
+
         # Force model to be init and avoid 'DeclarativeAttributeIntercept'
         AuthFactory.check_authorization(
             request_method=request.method.lower(),
             path=request.path, end_point=end_point,
             first_arg=first_arg, second_arg=second_arg,
-            payload_text=request.get_data()[:300])
+            payload_text=payload_text)
+
+        # Route read-only end-points to read replica if set, it must be
+        # set before timeout so it is applied on the correct connection
+        self.set_read_replica(end_point=end_point)
+
+        # Limit the time that queries can run on database for end-point
+        self.set_statement_timeout(end_point=end_point)
 
         # Extract data for post requests
-        data = self._get_request_payload(request=request)
+        data = None
+        if not is_stream_request:
+            data = self._get_request_payload(request=request)
 
         # List end-points
         if end_point == 'list' and request.method.lower() == 'post':
             endpoint_dict = data or {}
-            return jsonify(self.list(**endpoint_dict))
+            return jsonify(self.cached_result(
+                end_point=end_point, payload=endpoint_dict,
+                function=self.list))
 
         if end_point == 'list-without-pag' and \
            request.method.lower() == 'post':
             endpoint_dict = data or {}
-            return jsonify(self.list_without_pag(**endpoint_dict))
+            return jsonify(self.cached_result(
+                end_point=end_point, payload=endpoint_dict,
+                function=self.list_without_pag))
 
         # Retrieve with list serializer
         if end_point == 'list-one':
@@ -513,6 +785,26 @@ class PumpWoodFlaskView(View):
                 upsert=upsert)
             return jsonify(save_data)
 
+        if end_point == 'save-many' and \
+                request.method.lower() in ('post', 'put'):
+            fields = json.loads(
+                request.args.get('fields', 'null'))
+            foreign_key_fields = json.loads(
+                request.args.get('foreign_key_fields', 'false'))
+            related_fields = json.loads(
+                request.args.get('related_fields', 'false'))
+            default_fields = json.loads(
+                request.args.get('default_fields', 'false'))
+            upsert = json.loads(
+                request.args.get('upsert', 'false'))
+            save_data = self.save_many(
+                data=data, fields=fields,
+                foreign_key_fields=foreign_key_fields,
+                related_fields=related_fields,
+                default_fields=default_fields,
+                upsert=upsert)
+            return jsonify(save_data)
+
         if end_point == "save-file-streaming" and \
                 request.method.lower() in ('post', 'put'):
             if first_arg is None:
@@ -561,6 +853,8 @@ class PumpWoodFlaskView(View):
 
             if request.method.lower() == 'post':
                 endpoint_dict = data or {}
+                endpoint_dict.setdefault('force_delete', json.loads(
+                    request.args.get('force_delete', 'false')))
                 return jsonify(self.delete_many(**endpoint_dict))
 
         # Actions end-points
@@ -682,9 +976,14 @@ class PumpWoodFlaskView(View):
     def list_without_pag(self, filter_dict: None | dict = None,
                          exclude_dict: dict = None, order_by: list = None,
                          fields: list = None, default_fields: bool = False,
-                         foreign_key_fields: bool = False, **kwargs) -> list:
+                         foreign_key_fields: bool = False,
+                         parallel: int = None, **kwargs) -> list:
         """Return all matching objects without pagination.
 
+        If `parallel` is set and filter_dict can be split along partition
+        column (see `AuxPartitionSplit`), sub-queries are executed
+        concurrently and results are concatenated in order.
+
         Args:
             filter_dict (dict):
                 Dictionary for filtering operations.
@@ -698,6 +997,8 @@ class PumpWoodFlaskView(View):
                 If True, returns the default fields for the list view.
             foreign_key_fields (bool):
                 If True, expands foreign keys.
+            parallel (int):
+                Number of sub-queries executed concurrently.
             **kwargs:
                 For compatibility and extensibility.
 
@@ -710,6 +1011,18 @@ class PumpWoodFlaskView(View):
         exclude_dict = {} if exclude_dict is None else exclude_dict
         order_by = [] if order_by is None else order_by
 
+        split_filters = self.get_parallel_split(
+            filter_dict=filter_dict, order_by=order_by, parallel=parallel)
+        if split_filters is not None:
+            results = self.run_parallel(
+                function=self.list_without_pag, kwargs_list=[{
+                    'filter_dict': split_filter,
+                    'exclude_dict': exclude_dict, 'order_by': order_by,
+                    'fields': fields, 'default_fields': default_fields,
+                    'foreign_key_fields': foreign_key_fields}
+                    for split_filter in split_filters])
+            return [obj for result in results for obj in result]
+
         query_result = self.model_class.default_query_list(
             filter_dict=filter_dict, exclude_dict=exclude_dict,
             order_by=order_by)
@@ -907,6 +1220,7 @@ class PumpWoodFlaskView(View):
         setattr(obj, file_field, None)
         session.add(obj)
         session.commit()
+        self._on_model_write()
 
         try:
             self.storage_object.delete_file(file_path)
@@ -953,17 +1267,19 @@ class PumpWoodFlaskView(View):
 
         # Remove deleted entries from results
         has_deleted = model_has_column(self.model_class, column='deleted')
-        if has_deleted and not force_delete:
-            model_object.deleted = True
-            session.add(model_object)
-            session.commit()
-        else:
-            try:
+        try:
+            if has_deleted and not force_delete:
+                model_object.deleted = True
+                session.add(model_object)
+            else:
                 session.delete(model_object)
-                session.commit()
-            except Exception as e:
-                session.rollback()
-                raise e
+            session.flush()
+            self._before_commit(session=session)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            raise e
+        self._on_model_write()
 
         available_microservices = self.get_available_microservices()
         pumpwood_etl_ok = 'pumpwood-etl-app' in available_microservices
@@ -980,21 +1296,30 @@ class PumpWoodFlaskView(View):
         return object_dump
 
     def delete_many(self, filter_dict: dict = None,
-                    exclude_dict: dict = None) -> bool:
+                    exclude_dict: dict = None,
+                    force_delete: bool = False) -> int:
         """Delete multiple objects matching the filter criteria.
 
+        Supports soft-deletion if the model has a 'deleted' column, objects
+        are marked as deleted with one `UPDATE` statement. Objects already
+        deleted are not updated and not counted.
+
         Args:
             filter_dict (dict):
                 Filters identifying objects to be deleted.
             exclude_dict (dict):
                 Filters identifying objects to be spared.
+            force_delete (bool):
+                If True, bypasses soft-delete logic and removes the
+                records from the database.
 
         Returns:
-            bool:
-                Always returns True if the operation succeeds.
+            int:
+                Number of objects deleted.
         """
-        # TODO: Implement soft delete logic for delete many end-point
         session = self.get_session()
+        has_deleted = model_has_column(self.model_class, column='deleted')
+        is_soft_delete = has_deleted and not force_delete
         try:
             # User will only be abble to delete objects associated with his
             # row permission
@@ -1005,13 +1330,39 @@ class PumpWoodFlaskView(View):
                     base_query=base_query,
                     filter_dict=filter_dict,
                     exclude_dict=exclude_dict)
-            query_result.delete(synchronize_session=False)
+            if is_soft_delete:
+                n_deleted = query_result\
+                    .filter(self.model_class.deleted.isnot(True))\
+                    .update({'deleted': True}, synchronize_session=False)
+            else:
+                n_deleted = query_result.delete(synchronize_session=False)
+            self._before_commit(session=session)
             session.commit()
 
         except Exception as e:
             session.rollback()
             raise e
-        return True
+        self._on_model_write()
+
+        available_microservices = self.get_available_microservices()
+        pumpwood_etl_ok = 'pumpwood-etl-app' in available_microservices
+        is_to_broadcast = self.broadcast and pumpwood_etl_ok
+        if self.microservice is not None and is_to_broadcast and \
+                n_deleted != 0:
+            # Process one ETLTrigger for all deleted objects
+            self.microservice.login()
+            self.microservice.execute_action(
+                "ETLTrigger", action="process_triggers", parameters={
+                    "model_class": self.model_class.__name__.lower(),
+                    "type": "delete_many",
+                    "pk": None,
+                    "action_name": None,
+                    "extra_info": {
+                        "filter_dict": filter_dict,
+                        "exclude_dict": exclude_dict,
+                        "force_delete": not is_soft_delete,
+                        "n_deleted": n_deleted}})
+        return n_deleted
 
     def save(self, data: dict, file_paths: dict = None,
              foreign_key_fields: bool = False, related_fields: bool = False,
@@ -1200,10 +1551,14 @@ class PumpWoodFlaskView(View):
         # Commit file changes to database and persist object with file
         # information if present.
         try:
+            session.flush()
+            self._before_commit(
+                session=session, model_objects=[to_save_obj])
             session.commit()
         except Exception as e:
             session.rollback()
             raise e
+        self._on_model_write()
 
         # Serialize object to return
         result = retrieve_serializer.dump(to_save_obj)
@@ -1237,6 +1592,197 @@ class PumpWoodFlaskView(View):
         result['__is_new_object__'] = is_new_object
         return result
 
+    def save_many(self, data: List[dict], foreign_key_fields: bool = False,
+                  related_fields: bool = False, default_fields: bool = False,
+                  fields: list = None, upsert: bool = False) -> List[dict]:
+        """Update or create many objects on a single transaction.
+
+        Objects are loaded with the same serializer. Instances of the
+        payload pks are retrieved with one query and foreign keys of
+        `ValidateForeignKeyField*` fields are validated in batch before
+        loading. Objects are committed once and a single ETL trigger is
+        broadcasted for the batch. Files are not uploaded on this
+        end-point, use `save` for objects with files.
+
+        Objects are loaded one by one with the retrieved instances and not
+        with `load(many=True)`: marshmallow-sqlalchemy would look up each
+        instance by the primary key fields of the payload, that are
+        `dump_only` on Pumpwood serializers, and without the view base
+        query that restricts the objects the user may update. Validation
+        errors are also kept by payload position.
+
+        Args:
+            data (List[dict]):
+                List of object data payloads.
+            foreign_key_fields (bool):
+                If True, includes expanded FKs in the response.
+            related_fields (bool):
+                If True, includes expanded related fields.
+            default_fields (bool):
+                If True, uses default list fields for serialization.
+            fields (list):
+                Limits the returned objects to specific fields.
+            upsert (bool):
+                If True, creates new records if the PKs are not found.
+
+        Returns:
+            List[dict]:
+                The serialized representation of the saved objects, in
+                the order of the payload.
+
+        Raises:
+            PumpWoodWrongParameters:
+                If data is not a list of objects.
+            PumpWoodObjectDoesNotExist:
+                If a pk is not found and upsert is False.
+            PumpWoodObjectSavingException:
+                If validation fails, with the errors indexed by the
+                position of the object on the payload.
+        """
+        is_list_of_dict = isinstance(data, list) and all(
+            isinstance(x, dict) for x in data)
+        if not is_list_of_dict:
+            msg = "save-many payload must be a list of objects"
+            raise exceptions.PumpWoodWrongParameters(message=msg)
+
+        retrieve_serializer = self.serializer(
+            many=False, fields=fields, default_fields=default_fields,
+            foreign_key_fields=foreign_key_fields,
+            related_fields=related_fields)
+        retrieve_serializer.context['authorization_token'] = \
+            request.headers.get('Authorization', None)
+
+        session = self.get_session()
+
+        # Remove file fields, files are not uploaded on save-many
+        file_fields_not_path = [
+            key for key, item in self.file_fields.items()
+            if item != ["!path!"]]
+        data = [
+            {key: item for key, item in x.items()
+             if key not in file_fields_not_path}
+            for x in data]
+        pks = [x.pop('pk', None) for x in data]
+
+        # Retrieve objects and related objects of foreign keys with
+        # batch queries, related objects are set on request cache and
+        # used when loading each object
+        model_objects = self.model_class.default_query_get_many(
+            pks=[pk for pk in pks if pk is not None])
+        missing_pks = [
+            pk for pk in pks
+            if pk is not None and model_objects[pk] is None]
+        if not upsert and len(missing_pks) != 0:
+            message = "Requested objects {model_class}{pks} not found."
+            raise exceptions.PumpWoodObjectDoesNotExist(
+                message=message, payload={
+                    "model_class": self.model_class.__name__,
+                    "pks": missing_pks})
+        self._prefetch_foreign_keys(serializer=retrieve_serializer, data=data)
+
+        to_save_objs = []
+        is_new_objects = []
+        validation_errors = {}
+        try:
+            for i, (object_data, pk) in enumerate(zip(data, pks)):
+                model_object = None
+                if pk is not None:
+                    model_object = model_objects[pk]
+                try:
+                    to_save_obj = retrieve_serializer.load(
+                        object_data, instance=model_object, session=session)
+                except ValidationError as e:
+                    validation_errors[i] = e.messages
+                    continue
+                to_save_objs.append(to_save_obj)
+                is_new_objects.append(model_object is None)
+
+            if len(validation_errors) != 0:
+                message = (
+                    "Error when saving objects, check errors by payload "
+                    "position")
+                raise exceptions.PumpWoodObjectSavingException(
+                    message=message, payload=validation_errors)
+
+            # Serialize objects before commit, so expired objects are not
+            # refreshed one by one after it
+            session.add_all(to_save_objs)
+            session.flush()
+            results = retrieve_serializer.dump(to_save_objs, many=True)
+
+            # Pks are taken from objects, results may not have the pk
+            # field if `fields` is limited
+            primary_keys = self.get_primary_keys()
+            saved_pks = [
+                CompositePkBase64Converter.dump(
+                    obj=x, primary_keys=primary_keys)
+                for x in to_save_objs]
+            self._before_commit(session=session, model_objects=to_save_objs)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            raise e
+        self._on_model_write()
+
+        for result, is_new_object in zip(results, is_new_objects):
+            result['__is_new_object__'] = is_new_object
+
+        ###################################
+        # Pumpwood ETLTrigger integration #
+        available_microservices = self.get_available_microservices()
+        pumpwood_etl_ok = 'pumpwood-etl-app' in available_microservices
+        is_to_broadcast = self.broadcast and pumpwood_etl_ok
+        if self.microservice is not None and is_to_broadcast:
+            # Process one ETL Trigger for all saved objects
+            self.microservice.login()
+            self.microservice.execute_action(
+                "ETLTrigger", action="process_triggers", parameters={
+                    "model_class": self.model_class.__name__.lower(),
+                    "type": "save_many",
+                    "pk": None,
+                    "action_name": None,
+                    "extra_info": {
+                        "created": [
+                            pk for pk, is_new_object in zip(
+                                saved_pks, is_new_objects)
+                            if is_new_object],
+                        "updated": [
+                            pk for pk, is_new_object in zip(
+                                saved_pks, is_new_objects)
+                            if not is_new_object]}})
+        return results
+
+    def _prefetch_foreign_keys(self, serializer: object,
+                               data: List[dict]) -> None:
+        """Validate foreign keys of many objects in batch.
+
+        Serializer fields with `prefetch_obj_access` method, such as
+        `ValidateForeignKeyFieldLocal` and
+        `ValidateForeignKeyFieldMicroservice`, receive all pks of the
+        payload and set the related objects on request cache.
+
+        Args:
+            serializer (object):
+                Serializer used to load the objects.
+            data (List[dict]):
+                List of object data payloads.
+        """
+        for field_name, field in serializer.load_fields.items():
+            prefetch_obj_access = getattr(field, 'prefetch_obj_access', None)
+            if prefetch_obj_access is None:
+                continue
+
+            data_key = field.data_key or field_name
+            object_pks = set()
+            for object_data in data:
+                # Invalid values are reported on deserialization
+                try:
+                    object_pks.add(int(object_data[data_key]))
+                except (KeyError, TypeError, ValueError):
+                    continue
+            if len(object_pks) != 0:
+                prefetch_obj_access(object_pks=sorted(object_pks))
+
     def save_file_streaming(self, pk: int | str, file_field: str,
                             file_name: str = None, **kwargs) -> dict:
         """Save a file to an object using streamed data.
@@ -1418,6 +1964,7 @@ class PumpWoodFlaskView(View):
         loaded_parameters = LoadActionParameters.load(
             func=action_fun, parameters=parameters)
         result = action_fun(**loaded_parameters)
+        self._on_model_write()
 
         available_microservices = self.get_available_microservices()
         pumpwood_etl_ok = 'pumpwood-etl-app' in available_microservices
@@ -1440,6 +1987,10 @@ class PumpWoodFlaskView(View):
                   **kwargs) -> Union[dict, list]:
         """Aggregate database information using group_by and functions.
 
+        If `aggregate` is set on `result_cache_expire`, query rows are
+        cached on the host and shared between requests with different
+        output formats.
+
         Args:
             group_by (List[str]):
                 Columns used in the GROUP BY clause.
@@ -1458,7 +2009,8 @@ class PumpWoodFlaskView(View):
             show_deleted (bool):
                 If True, include deleted objects in the results.
             format (str):
-                Pandas dictionary format (e.g., 'list', 'records').
+                Pandas dictionary format (e.g., 'list', 'records'), output
+                is built directly from query rows.
             **kwargs:
                 Extra arguments.
 
@@ -1466,6 +2018,67 @@ class PumpWoodFlaskView(View):
             Union[dict, list]:
                 The aggregated data in the requested format.
         """
+        # Set list and dicts in the fuction to no bug with pointers
+        group_by = [] if group_by is None else group_by
+        filter_dict = {} if filter_dict is None else filter_dict
+        exclude_dict = {} if exclude_dict is None else exclude_dict
+        order_by = [] if order_by is None else order_by
+        AuxResultFormat.validate_format(format=format)
+
+        payload = {
+            'group_by': group_by, 'agg': agg, 'filter_dict': filter_dict,
+            'exclude_dict': exclude_dict, 'order_by': order_by,
+            'limit': limit, 'show_deleted': show_deleted}
+        # Rows are cached, so output formats share the same cache entry
+        cached_rows = self.cached_result(
+            end_point='aggregate', payload=payload,
+            function=self._aggregate_cache_rows)
+        columns, rows = cached_rows['columns'], cached_rows['rows']
+        return AuxResultFormat.to_dict(
+            columns=columns, rows=rows, format=format)
+
+    def _aggregate_cache_rows(self, **kwargs) -> dict:
+        """Return aggregate rows as plain Python objects to be cached.
+
+        Args:
+            **kwargs:
+                Arguments passed to `_aggregate_rows`.
+
+        Returns:
+            dict:
+                Dictionary with `columns` and `rows` keys.
+        """
+        columns, rows = self._aggregate_rows(**kwargs)
+        return {'columns': columns, 'rows': [tuple(row) for row in rows]}
+
+    def _aggregate_rows(self, group_by: List[str], agg: dict,
+                        filter_dict: dict, exclude_dict: dict,
+                        order_by: List[str], limit: int | None,
+                        show_deleted: bool) -> tuple[List[str], List]:
+        """Query aggregated rows on database.
+
+        Args:
+            group_by (List[str]):
+                Columns used in the GROUP BY clause.
+            agg (dict):
+                Aggregation dictionary.
+            filter_dict (dict):
+                Filters to apply before aggregation.
+            exclude_dict (dict):
+                Exclusions to apply before aggregation.
+            order_by (List[str]):
+                Ordering for the aggregated results.
+            limit (int | None):
+                Maximum number of results to return.
+            show_deleted (bool):
+                If True, include deleted objects in the results.
+
+        Returns:
+            tuple[List[str], List]:
+                Name of the result columns and the query rows.
+        """
+        filter_dict = dict(filter_dict)
+        exclude_dict = dict(exclude_dict)
         session = self.get_session()
 
         # Do not display deleted objects
@@ -1480,6 +2093,10 @@ class PumpWoodFlaskView(View):
             if not any_delete and not show_deleted:
                 exclude_dict["deleted"] = True
 
+        # Check if partition column is used to help Postgres pruning
+        self.model_class.check_table_partition_filter(
+            filter_dict=filter_dict)
+
         base_query = self._add_default_filter()
         subquery_result = SqlalchemyQueryMisc\
             .sqlalchemy_kward_query(
@@ -1488,12 +2105,12 @@ class PumpWoodFlaskView(View):
                 filter_dict=filter_dict,
                 exclude_dict=exclude_dict)
 
-        pd_results = pd.DataFrame(
-            SqlalchemyQueryMisc.aggregate(
-                session=session, object_model=self.model_class,
-                query=subquery_result, group_by=group_by,
-                agg=agg, order_by=order_by).limit(limit).all())
-        return pd_results.to_dict(format)
+        aggregate_query = SqlalchemyQueryMisc.aggregate(
+            session=session, object_model=self.model_class,
+            query=subquery_result, group_by=group_by,
+            agg=agg, order_by=order_by).limit(limit)
+        query_result = session.execute(aggregate_query.statement)
+        return list(query_result.keys()), query_result.all()
 
     @classmethod
     def cls_fields_options(cls,
@@ -10,7 +10,32 @@ from pumpwood_database_error.psycopg2_error import TreatPsycopg2Error
 from pumpwood_database_error.sqlalchemy_error import TreatSQLAlchemyError
 
 # Local imports
-from pumpwood_flaskviews.exceptions import PumpWoodFlaskViewEndPointFoundError
+from pumpwood_flaskviews.sqlalchemy import StatementTimeout
+from pumpwood_flaskviews.exceptions import (
+    PumpWoodFlaskViewEndPointFoundError,
+    PumpWoodFlaskViewStatementTimeoutError)
+
+
+def _statement_timeout_exception(error: Exception
+                                 ) -> PumpWoodFlaskViewStatementTimeoutError:
+    """Build the exception returned when a statement timeout is reached.
+
+    Args:
+        error (Exception):
+            SQLAlchemy or psycopg2 error raised by the canceled statement.
+
+    Returns:
+        PumpWoodFlaskViewStatementTimeoutError:
+            Pumpwood exception with the timeout applied on the request.
+    """
+    msg = (
+        "Query was canceled because it exceeded the statement timeout of "
+        "[{statement_timeout}] ms for this end-point, use filters to "
+        "reduce the amount of data or contact the service administrator.")
+    return PumpWoodFlaskViewStatementTimeoutError(
+        message=msg, payload={
+            "statement_timeout": StatementTimeout.get_applied_timeout(),
+            "error": str(getattr(error, 'orig', None) or error)})
 
 
 def register_pumpwood_view(app: object, view: object,
@@ -70,6 +95,13 @@ def register_pumpwood_view(app: object, view: object,
     # SQLAlchemy errors
     @app.errorhandler(sqlalchemy.exc.SQLAlchemyError)
     def handle_sqlalchemy_programmingerror_errors(error):
+        if StatementTimeout.is_timeout_error(error):
+            pump_exc = _statement_timeout_exception(error=error)
+            log_error(pump_exc)
+            response = jsonify(pump_exc.to_dict())
+            response.status_code = pump_exc.status_code
+            return response
+
         error_dict = TreatSQLAlchemyError.treat(
             error=error, connection_url=app.config['SQLALCHEMY_DATABASE_URI'])
         ErrorClass = exceptions.exceptions_dict.get(error_dict['type']) # NOQA
@@ -91,6 +123,13 @@ def register_pumpwood_view(app: object, view: object,
     # psycopg2 error handlers
     @app.errorhandler(psycopg2.Error)
     def handle_psycopg2_error(error):
+        if StatementTimeout.is_timeout_error(error):
+            pump_exc = _statement_timeout_exception(error=error)
+            log_error(pump_exc)
+            response = jsonify(pump_exc.to_dict())
+            response.status_code = pump_exc.status_code
+            return response
+
         error_dict = TreatPsycopg2Error.treat(
             error=error, connection_url=app.config['SQLALCHEMY_DATABASE_URI'])
         ErrorClass = exceptions.exceptions_dict.get(error_dict['type']) # NOQA
@@ -0,0 +1,145 @@
+"""Shared fixtures of pumpwood_flaskviews tests.
+
+Views and the helpers under `pumpwood_flaskviews.views` import
+`pumpwood_database_error`, test modules using them are skipped if it is
+not installed.
+"""
+import os
+os.environ.setdefault("MICROSERVICE_URL", "http://localhost/")
+os.environ.setdefault(
+    "PUMPWOOD_COMMUNICATION__CACHE_BASE_PATH",
+    "pumpwood-flaskviews-tests-{}".format(os.getpid()))
+
+import datetime
+import pytest
+from flask import Flask, g
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import (
+    Column, Integer, Float, String, DateTime, Boolean, ForeignKey)
+from sqlalchemy.orm import relationship
+from pumpwood_flaskviews.model import FlaskPumpWoodBaseModel
+
+
+AUTH_HEADER = {'Authorization': 'Token test'}
+"""Authorization header used on test requests."""
+TEST_USER = {
+    'pk': 1, 'is_superuser': False, 'all_row_permisson_set': []}
+"""User set on `g` for test requests."""
+
+db = SQLAlchemy(model_class=FlaskPumpWoodBaseModel)
+
+
+class Attribute(db.Model):
+    """Attribute referenced by data values."""
+
+    __tablename__ = 'attribute'
+    description = Column(String)
+
+
+class DataValue(db.Model):
+    """Time series values of an attribute and modeling unit."""
+
+    __tablename__ = 'data_value'
+    id = Column(Integer, primary_key=True)
+    time = Column(DateTime)
+    attribute_id = Column(Integer, ForeignKey('attribute.id'))
+    modeling_unit_id = Column(Integer)
+    value = Column(Float)
+    deleted = Column(Boolean, default=False)
+    attribute = relationship(Attribute, backref='data_values')
+
+
+def create_app(*views) -> Flask:
+    """Create a Flask app with the views using an in-memory database.
+
+    Args:
+        *views:
+            View classes to be registered.
+
+    Returns:
+        Flask:
+            App with tables created and `TEST_USER` set on requests.
+    """
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    if len(views) != 0:
+        from pumpwood_flaskviews.auth import AuthFactory
+        from pumpwood_flaskviews.json import PumpWoodFlaskJSONProvider
+        from pumpwood_flaskviews.views import register_pumpwood_view
+        AuthFactory.set_as_dummy()
+        app.json = PumpWoodFlaskJSONProvider(app)
+        for view in views:
+            register_pumpwood_view(app, view)
+
+    @app.before_request
+    def set_test_user():
+        g.user = dict(TEST_USER)
+
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def add_data_values(app: Flask) -> None:
+    """Add 2 attributes and 40 values alternating between them.
+
+    Args:
+        app (Flask):
+            App returned by `create_app`.
+    """
+    with app.app_context():
+        db.session.add_all([
+            Attribute(id=1, description='a'),
+            Attribute(id=2, description='b')])
+        start_time = datetime.datetime(2024, 1, 1)
+        db.session.add_all([
+            DataValue(
+                id=i + 1, attribute_id=1 + i % 2, modeling_unit_id=i % 3,
+                time=start_time + datetime.timedelta(minutes=30 * i),
+                value=float(i), deleted=False)
+            for i in range(40)])
+        db.session.commit()
+
+
+@pytest.fixture
+def db_app() -> Flask:
+    """App without views and with `add_data_values` data."""
+    app = create_app()
+    add_data_values(app)
+    return app
+
+
+@pytest.fixture
+def data_value_view():
+    """`DataValue` data view class, attributes may be changed by tests."""
+    pytest.importorskip("pumpwood_database_error")
+    from pumpwood_flaskviews.serializers import PumpWoodSerializer
+    from pumpwood_flaskviews.views import PumpWoodDataFlaskView
+
+    class DataValueSerializer(PumpWoodSerializer):
+        class Meta:
+            model = DataValue
+            list_fields = ['pk', 'time', 'attribute_id', 'value']
+
+    class DataValueView(PumpWoodDataFlaskView):
+        db = db
+        model_class = DataValue
+        serializer = DataValueSerializer
+        model_variables = [
+            'time', 'attribute_id', 'modeling_unit_id', 'value']
+        expected_cols_bulk_save = [
+            'time', 'attribute_id', 'modeling_unit_id', 'value']
+
+        def get_available_microservices(self):
+            return []
+
+    return DataValueView
+
+
+@pytest.fixture
+def data_value_app(data_value_view) -> Flask:
+    """App with a `DataValue` data view and `add_data_values` data."""
+    app = create_app(data_value_view)
+    add_data_values(app)
+    return app
@@ -0,0 +1,40 @@
+"""Test AuthFactory access scope used on cache keys."""
+from flask import g
+from pumpwood_flaskviews.auth import AuthFactory
+from conftest import AUTH_HEADER
+
+
+USER = {
+    'pk': 7, 'is_superuser': False,
+    'all_row_permisson_set': [{'pk': 3}, {'pk': 1}]}
+
+
+def test_access_scope(db_app):
+    """User pk is added to the scope only if `user_scoped`."""
+    with db_app.test_request_context(headers=AUTH_HEADER):
+        g.user = USER
+        assert AuthFactory.get_access_scope() == {
+            'is_superuser': False, 'row_permission_set': [1, 3]}
+        assert AuthFactory.get_access_scope(user_scoped=True) == {
+            'is_superuser': False, 'row_permission_set': [1, 3],
+            'user_pk': 7}
+
+
+def test_access_scope_cached_on_g(db_app, monkeypatch):
+    """Authenticated user is retrieved once per request."""
+    calls = []
+
+    def retrieve_authenticated_user():
+        calls.append(1)
+        return USER
+
+    monkeypatch.setattr(
+        AuthFactory, 'retrieve_authenticated_user',
+        retrieve_authenticated_user)
+    with db_app.test_request_context(headers=AUTH_HEADER):
+        scope = AuthFactory.get_access_scope()
+        scope['base_filter_skip'] = ['owner']
+        AuthFactory.get_access_scope(user_scoped=True)
+        assert AuthFactory.get_access_scope() == {
+            'is_superuser': False, 'row_permission_set': [1, 3]}
+    assert len(calls) == 1
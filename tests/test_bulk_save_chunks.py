@@ -0,0 +1,52 @@
+"""Test chunked bulk save reports of data views."""
+import pytest
+import pandas as pd
+
+pytest.importorskip("pumpwood_database_error")
+from conftest import AUTH_HEADER
+
+
+CHUNKS = [
+    pd.DataFrame({
+        'attribute_id': [1, 2], 'modeling_unit_id': [0, 0],
+        'value': [float(i), float(i)]})
+    for i in range(3)]
+
+
+def _run_chunks(app, view_class, failed_chunk: int, n_rows: int | None):
+    """Save `CHUNKS` failing the chunk at `failed_chunk` position."""
+    view = view_class()
+    insert = view._bulk_insert
+    calls = []
+
+    def bulk_insert(session, data, conflict_columns=None):
+        calls.append(len(data))
+        if len(calls) - 1 == failed_chunk:
+            raise ValueError("chunk failed")
+        return insert(
+            session=session, data=data, conflict_columns=conflict_columns)
+
+    view._bulk_insert = bulk_insert
+    with app.test_request_context(headers=AUTH_HEADER):
+        return view._bulk_save_chunks(
+            chunks=iter(CHUNKS), n_rows=n_rows, prepare=False,
+            continue_on_error=False)
+
+
+@pytest.mark.parametrize('n_rows', [6, None])
+def test_failed_last_chunk(data_value_app, data_value_view, n_rows):
+    """Failed last chunk does not report rows not processed."""
+    report = _run_chunks(
+        data_value_app, data_value_view, failed_chunk=2, n_rows=n_rows)
+    assert report['saved'] == 4
+    assert [x['chunk'] for x in report['failed_chunks']] == [2]
+    assert report['not_processed'] is None
+
+
+@pytest.mark.parametrize('n_rows', [6, None])
+def test_failed_middle_chunk(data_value_app, data_value_view, n_rows):
+    """Rows after a failed chunk are reported as not processed."""
+    report = _run_chunks(
+        data_value_app, data_value_view, failed_chunk=1, n_rows=n_rows)
+    assert report['saved'] == 2
+    assert report['not_processed'] == {'start': 4, 'end': n_rows}
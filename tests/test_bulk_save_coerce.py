@@ -0,0 +1,172 @@
+"""Test BulkSaveCoerce conversion and error report."""
+import decimal
+import datetime
+import pytest
+import pandas as pd
+from sqlalchemy import (
+    Column, BigInteger, Integer, Float, Numeric, Boolean, String,
+    DateTime, Date, JSON)
+from sqlalchemy.orm import DeclarativeBase
+
+pytest.importorskip("pumpwood_database_error")
+from pumpwood_communication.exceptions import PumpWoodDataLoadingException
+from pumpwood_flaskviews.views.classes.data.coerce import BulkSaveCoerce
+
+
+class Base(DeclarativeBase):
+    """Declarative base of coerce test models."""
+
+
+class CoerceModel(Base):
+    """Model with a column of each coerced type."""
+
+    __tablename__ = 'coerce_model'
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    n = Column(Integer, nullable=False)
+    x = Column(Float)
+    amount = Column(Numeric(30, 10))
+    flag = Column(Boolean)
+    time = Column(DateTime)
+    time_tz = Column(DateTime(timezone=True))
+    day = Column(Date)
+    extra_info = Column(JSON)
+    code = Column(String(3))
+
+
+def test_get_column_kind():
+    """Columns are mapped to the coercion of their type."""
+    table = CoerceModel.__table__
+    kinds = {
+        column.name: BulkSaveCoerce.get_column_kind(column=column)
+        for column in table.columns}
+    assert kinds == {
+        'id': 'integer', 'n': 'integer', 'x': 'float',
+        'amount': 'decimal', 'flag': 'boolean',
+        'time': 'datetime', 'time_tz': 'datetime', 'day': 'date',
+        'extra_info': 'json', 'code': 'string'}
+
+
+def test_coerce_values():
+    """Text values are converted to the column types."""
+    data = pd.DataFrame({
+        'id': [None, None], 'n': ['1', 2.0], 'x': ['1.5', None],
+        'flag': ['yes', 'F'], 'time': ['2024-01-01T10:00:00', None],
+        'day': ['2024-01-02', '2024-01-03T00:00:00'],
+        'extra_info': [{'a': 1}, None], 'code': ['abc', 'de']})
+    coerced = BulkSaveCoerce.coerce(model_class=CoerceModel, data=data)
+    assert coerced['n'].tolist() == [1, 2]
+    assert coerced['x'].iloc[0] == 1.5
+    assert pd.isna(coerced['x'].iloc[1])
+    assert coerced['flag'].tolist() == [True, False]
+    assert coerced['time'].tolist() == [
+        pd.Timestamp(2024, 1, 1, 10), None]
+    assert coerced['day'].tolist() == [
+        datetime.date(2024, 1, 2), datetime.date(2024, 1, 3)]
+    assert coerced['extra_info'].tolist() == [{'a': 1}, None]
+
+
+def test_coerce_exact_numbers():
+    """Big integers and decimals are not rounded through float."""
+    data = pd.DataFrame({
+        'id': ['9007199254740993', 9007199254740993, '1e3', None],
+        'n': [1, 2, 3, 4],
+        'amount': [
+            '12345678901234567.0123456789',
+            decimal.Decimal('12345678901234567.0123456789'), 1.1, None]})
+    coerced = BulkSaveCoerce.coerce(model_class=CoerceModel, data=data)
+    assert coerced['id'].tolist() == [
+        9007199254740993, 9007199254740993, 1000, None]
+    assert coerced['amount'].tolist() == [
+        decimal.Decimal('12345678901234567.0123456789'),
+        decimal.Decimal('12345678901234567.0123456789'),
+        decimal.Decimal('1.1'), None]
+
+
+def test_coerce_exact_numbers_error():
+    """Values that can not be represented exactly are reported."""
+    data = pd.DataFrame({
+        'id': ['9223372036854775808', '1.5', '10'],
+        'n': [1, 2, 3],
+        'amount': ['123456789012345678901', 'a', '1.5']})
+    with pytest.raises(PumpWoodDataLoadingException) as error:
+        BulkSaveCoerce.coerce(model_class=CoerceModel, data=data)
+
+    errors = {
+        x['column']: x['rows'] for x in error.value.payload['errors']}
+    assert errors == {'id': [0, 1], 'amount': [0, 1]}
+
+
+def test_coerce_error_report():
+    """Invalid, null and too long values are reported by column."""
+    data = pd.DataFrame({
+        'n': ['1', 'a', None, '1.5'], 'flag': ['t', 'maybe', None, 'f'],
+        'code': ['abc', 'abcd', None, 'ab']})
+    with pytest.raises(PumpWoodDataLoadingException) as error:
+        BulkSaveCoerce.coerce(model_class=CoerceModel, data=data)
+
+    errors = {
+        (x['column'], x['error']): x
+        for x in error.value.payload['errors']}
+    assert set(errors.keys()) == {
+        ('n', 'invalid'), ('n', 'null'), ('flag', 'invalid'),
+        ('code', 'length')}
+    assert errors[('n', 'invalid')]['rows'] == [1, 3]
+    assert errors[('n', 'null')]['rows'] == [2]
+    assert errors[('flag', 'invalid')]['values'] == ['maybe']
+    assert errors[('code', 'length')]['n_rows'] == 1
+
+
+def test_coerce_datetime_offsets():
+    """Datetimes are coerced as Postgres casts the received text."""
+    data = pd.DataFrame({
+        'n': [1, 2, 3],
+        'time': [
+            '2024-01-01T22:00:00-03:00', '2024-01-01 10:00:00Z',
+            '2024-01-02'],
+        'time_tz': [
+            '2024-01-01T22:00:00', '2024-01-01T22:00:00-03:00',
+            pd.Timestamp('2024-01-01T22:00:00', tz='America/Sao_Paulo')],
+        'day': [
+            '2024-01-01T22:00:00-03:00', '2024-01-02T01:00:00+03:00',
+            '2024-01-03']})
+    coerced = BulkSaveCoerce.coerce(model_class=CoerceModel, data=data)
+
+    # Offsets are ignored on naive columns keeping wall time and date
+    assert coerced['time'].tolist() == [
+        pd.Timestamp(2024, 1, 1, 22), pd.Timestamp(2024, 1, 1, 10),
+        pd.Timestamp(2024, 1, 2)]
+    assert coerced['day'].tolist() == [
+        datetime.date(2024, 1, 1), datetime.date(2024, 1, 2),
+        datetime.date(2024, 1, 3)]
+
+    # Naive values are kept naive for the database session time zone
+    time_tz = coerced['time_tz'].tolist()
+    assert time_tz[0] == pd.Timestamp(2024, 1, 1, 22)
+    assert time_tz[0].tzinfo is None
+    assert time_tz[1] == pd.Timestamp('2024-01-02T01:00:00', tz='UTC')
+    assert time_tz[2] == pd.Timestamp('2024-01-02T01:00:00', tz='UTC')
+
+
+def test_coerce_numbers_vectorized(monkeypatch):
+    """Only values longer than float precision are parsed one by one."""
+    parsed = []
+    parse_integer = BulkSaveCoerce._parse_integer
+
+    def counted_parse_integer(value):
+        parsed.append(value)
+        return parse_integer(value=value)
+
+    monkeypatch.setattr(
+        BulkSaveCoerce, '_parse_integer', counted_parse_integer)
+    data = pd.DataFrame({
+        'id': ['1', 2.0, ' 3 ', '9223372036854775807', 1e19],
+        'n': [1.0, 2.0, None, 4.5, 1e19]})
+    coerced, errors = BulkSaveCoerce.run(model_class=CoerceModel, data=data)
+    assert parsed == ['9223372036854775807']
+    assert coerced['id'].tolist() == [1, 2, 3, 2 ** 63 - 1, None]
+    assert type(coerced['id'].iloc[0]) is int
+
+    errors = {(x['column'], x['error']): x['rows'] for x in errors}
+    assert errors == {
+        ('id', 'invalid'): [4], ('n', 'invalid'): [3, 4],
+        ('n', 'null'): [2]}
@@ -0,0 +1,62 @@
+"""Test BulkSaveCopy statements compiled for Postgres."""
+import pytest
+import pandas as pd
+from sqlalchemy.dialects import postgresql
+
+pytest.importorskip("pumpwood_database_error")
+from pumpwood_flaskviews.views.classes.data.copy import BulkSaveCopy
+from conftest import DataValue
+
+
+class PostgresConnection:
+    """Connection collecting statements compiled for Postgres."""
+
+    dialect = postgresql.dialect()
+
+    def __init__(self):
+        """Start without statements."""
+        self.statements = []
+
+    def exec_driver_sql(self, statement):
+        """Collect raw statement instead of executing it."""
+        self.statements.append(statement)
+
+    def execute(self, statement):
+        """Compile statement for Postgres instead of executing it."""
+        self.statements.append(
+            str(statement.compile(dialect=self.dialect)))
+
+
+class PostgresSession:
+    """Session returning a `PostgresConnection`."""
+
+    def __init__(self):
+        """Create the connection."""
+        self.postgres_connection = PostgresConnection()
+
+    def connection(self, **kwargs):
+        """Return the collecting connection."""
+        return self.postgres_connection
+
+
+@pytest.mark.parametrize('data, on_conflict', [
+    (pd.DataFrame({'id': [1], 'value': [1.0]}),
+     "ON CONFLICT (id) DO UPDATE SET value = excluded.value"),
+    (pd.DataFrame({'id': [1]}), "ON CONFLICT (id) DO NOTHING")])
+def test_upsert_statement(monkeypatch, data, on_conflict):
+    """Staging rows are moved with `INSERT ... SELECT ... ON CONFLICT`."""
+    monkeypatch.setattr(
+        BulkSaveCopy, 'is_available', classmethod(lambda cls, **kw: True))
+    monkeypatch.setattr(
+        BulkSaveCopy, '_copy_buffer', classmethod(lambda cls, **kw: None))
+    session = PostgresSession()
+    assert BulkSaveCopy.upsert(
+        session=session, model_class=DataValue, data=data,
+        conflict_columns=['id'])
+
+    create, insert, drop = session.postgres_connection.statements
+    assert create.startswith(
+        "CREATE TEMP TABLE pumpwood_upsert_data_value (LIKE data_value")
+    assert insert.startswith("INSERT INTO data_value (id, ")
+    assert "FROM pumpwood_upsert_data_value " + on_conflict in insert
+    assert drop == "DROP TABLE pumpwood_upsert_data_value"
@@ -0,0 +1,68 @@
+"""Test BulkSaveDedupe removal of repeated payload keys."""
+import pytest
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+
+pytest.importorskip("pumpwood_database_error")
+from pumpwood_flaskviews.views.classes.data.dedupe import BulkSaveDedupe
+from conftest import db, DataValue
+
+
+DATA = pd.DataFrame({
+    'attribute_id': [1, 1, 2, 1, None, None],
+    'time': ['t0', 't0', 't0', 't1', 't0', 't0'],
+    'value': [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]})
+
+
+@pytest.mark.parametrize('keep, values', [
+    ('first', [1.0, 3.0, 4.0, 5.0]), ('last', [2.0, 3.0, 4.0, 6.0])])
+def test_drop_payload_duplicates(keep, values):
+    """Rows with repeated keys, including null keys, are dropped."""
+    results = BulkSaveDedupe.drop_payload_duplicates(
+        data=DATA, key_columns=['attribute_id', 'time'], keep=keep)
+    assert sorted(results['value'].tolist()) == values
+
+
+def test_drop_payload_duplicates_all_columns():
+    """Rows are kept if any key column differs."""
+    results = BulkSaveDedupe.drop_payload_duplicates(
+        data=DATA, key_columns=list(DATA.columns), keep='first')
+    assert len(results) == len(DATA)
+
+
+def test_drop_existing(db_app):
+    """Existing keys are dropped, matching null keys on nullable columns."""
+    with db_app.app_context():
+        db.session.add(DataValue(id=100, modeling_unit_id=None, value=1.0))
+        db.session.flush()
+        data = pd.DataFrame({
+            'id': [1, 100, 101, 2],
+            'modeling_unit_id': [0, None, None, 0],
+            'value': [1.0, 2.0, 3.0, 4.0]})
+        results = BulkSaveDedupe.drop_existing(
+            session=db.session, model_class=DataValue, data=data,
+            key_columns=['id', 'modeling_unit_id'])
+    assert results['id'].tolist() == [101, 2]
+
+
+def test_existing_keys_query_operators(db_app):
+    """Not nullable keys use `=` and are searched on the index."""
+    table = DataValue.__table__
+    model_columns = [table.c.id, table.c.modeling_unit_id]
+    query = BulkSaveDedupe.existing_keys_query(
+        model_columns=model_columns, temp_columns=model_columns)
+    sql = str(query.compile(dialect=postgresql.dialect()))
+    assert "data_value.id = data_value.id" in sql
+    assert ("data_value.modeling_unit_id IS NOT DISTINCT FROM "
+            "data_value.modeling_unit_id") in sql
+
+    with db_app.app_context():
+        key_query = BulkSaveDedupe.existing_keys_query(
+            model_columns=[table.c.id],
+            temp_columns=[DataValue.__table__.alias('temp').c.id])
+        plan = db.session.execute(text('EXPLAIN QUERY PLAN ' + str(
+            key_query.compile(
+                db.engine, compile_kwargs={'literal_binds': True}))))
+        plan = [x[-1] for x in plan]
+    assert any('USING INTEGER PRIMARY KEY' in x for x in plan)
@@ -0,0 +1,173 @@
+"""Test BulkSaveJob status and spool handling."""
+import io
+import os
+import time
+import pytest
+from flask import has_app_context, has_request_context
+from sqlalchemy import MetaData
+
+pytest.importorskip("pumpwood_database_error")
+from pumpwood_communication.cache import default_cache
+from pumpwood_communication.exceptions import (
+    PumpWoodObjectDoesNotExist, PumpWoodNotImplementedError)
+from pumpwood_flaskviews.views.classes.data import job
+from pumpwood_flaskviews.views.classes.data.job import BulkSaveJob
+from pumpwood_flaskviews.auth import AuthFactory
+from conftest import db, AUTH_HEADER
+
+
+job_table = BulkSaveJob.build_table(db.metadata)
+"""Job status table created with the test models."""
+
+
+@pytest.fixture
+def spool_path(tmp_path, monkeypatch):
+    """Spool bodies on a temporary directory."""
+    monkeypatch.setattr(job, 'BULK_SAVE_JOB_SPOOL_PATH', str(tmp_path))
+    return tmp_path
+
+
+def _status(job_id: str, status: str) -> dict:
+    """Return a minimal job status."""
+    return {'job_id': job_id, 'model_class': 'DataValue', 'status': status}
+
+
+def test_status_without_cache(data_value_app, spool_path, monkeypatch):
+    """Job status is stored on database, not on host cache."""
+    monkeypatch.setattr(default_cache, '_enable', False)
+    client = data_value_app.test_client()
+    response = client.post(
+        '/rest/datavalue/bulk-save/?async=true', headers=AUTH_HEADER,
+        json=[
+            {'time': '2024-02-01T00:00:00', 'attribute_id': 1,
+             'modeling_unit_id': 0, 'value': float(i)}
+            for i in range(5)])
+    assert response.status_code == 200
+    job_id = response.json['job_id']
+
+    for _ in range(50):
+        status = client.get(
+            '/rest/datavalue/bulk-save-status/{}/'.format(job_id),
+            headers=AUTH_HEADER).json
+        if status['status'] in ['finished', 'failed']:
+            break
+        time.sleep(0.05)
+    assert status['status'] == 'finished'
+    assert status['saved'] == 5
+    assert os.listdir(BulkSaveJob.get_spool_path()) == []
+
+
+def test_worker_app_context(db_app, spool_path):
+    """Jobs run on an app context with the authorization header."""
+    calls = []
+
+    def function(status: dict, path: str):
+        calls.append({
+            'app_context': has_app_context(),
+            'request_context': has_request_context(),
+            'auth_header': AuthFactory.get_auth_header(),
+            'body': open(path, 'rb').read()})
+
+    with db_app.test_request_context(headers=AUTH_HEADER):
+        status = BulkSaveJob.submit(
+            engine=db.engine, table=job_table, stream=io.BytesIO(b'[]'),
+            model_class='DataValue', format=None, function=function,
+            treat_error=lambda e: {'message': str(e)})
+
+    with db_app.app_context():
+        for _ in range(50):
+            status = BulkSaveJob.get_status(
+                engine=db.engine, table=job_table,
+                job_id=status['job_id'], model_class='DataValue')
+            if status['status'] in ['finished', 'failed']:
+                break
+            time.sleep(0.05)
+    assert status['status'] == 'finished'
+    assert status['finished_at'].endswith('+00:00')
+    assert calls == [{
+        'app_context': True, 'request_context': False,
+        'auth_header': AUTH_HEADER, 'body': b'[]'}]
+
+
+def test_table_not_registered():
+    """Jobs need the status table registered on service metadata."""
+    metadata = MetaData()
+    with pytest.raises(PumpWoodNotImplementedError):
+        BulkSaveJob.get_table(metadata=metadata)
+    table = BulkSaveJob.build_table(metadata)
+    assert BulkSaveJob.get_table(metadata=metadata) is table
+    assert BulkSaveJob.build_table(metadata) is table
+
+
+def test_status_expire(db_app, monkeypatch):
+    """Expired status is not returned and is deleted."""
+    with db_app.app_context():
+        BulkSaveJob.set_status(
+            engine=db.engine, table=job_table,
+            status=_status('expired', 'finished'))
+        assert BulkSaveJob.get_status(
+            engine=db.engine, table=job_table, job_id='expired',
+            model_class='DataValue')['status'] == 'finished'
+
+        monkeypatch.setattr(job, 'BULK_SAVE_JOB_STATUS_EXPIRE', -1)
+        with pytest.raises(PumpWoodObjectDoesNotExist):
+            BulkSaveJob.get_status(
+                engine=db.engine, table=job_table, job_id='expired',
+                model_class='DataValue')
+        assert BulkSaveJob.delete_expired(
+            engine=db.engine, table=job_table) == 1
+
+
+def test_clean_spool(db_app, spool_path, monkeypatch):
+    """Spool of stopped processes is removed and its jobs set failed."""
+    monkeypatch.setattr(
+        BulkSaveJob, '_is_process_alive', staticmethod(lambda pid: False))
+    stopped_path = spool_path / '{}1'.format(
+        BulkSaveJob._get_spool_prefix())
+    stopped_path.mkdir()
+    (stopped_path / 'running').write_bytes(b'[]')
+    (stopped_path / 'finished').write_bytes(b'[]')
+    other_host_path = spool_path / 'other-host-1'
+    other_host_path.mkdir()
+
+    with db_app.app_context():
+        BulkSaveJob.set_status(
+            engine=db.engine, table=job_table,
+            status=_status('running', 'running'))
+        BulkSaveJob.set_status(
+            engine=db.engine, table=job_table,
+            status=_status('finished', 'finished'))
+        assert BulkSaveJob.clean_spool(
+            engine=db.engine, table=job_table) == ['running']
+        status = BulkSaveJob.get_status(
+            engine=db.engine, table=job_table, job_id='running',
+            model_class='DataValue')
+    assert status['status'] == 'failed'
+    assert not stopped_path.exists()
+    assert other_host_path.exists()
+
+
+class BrokenStream(io.RawIOBase):
+    """Stream that fails after the first read."""
+
+    def __init__(self):
+        """Start without reads."""
+        self.n_reads = 0
+
+    def readable(self):
+        """Return True, stream is readable."""
+        return True
+
+    def read(self, size=-1):
+        """Return part of a body, then fail."""
+        self.n_reads += 1
+        if self.n_reads == 1:
+            return b'[{"value": 1}'
+        raise OSError("connection reset")
+
+
+def test_spool_error(spool_path):
+    """Partial files are removed if body can not be spooled."""
+    with pytest.raises(OSError):
+        BulkSaveJob.spool(stream=BrokenStream(), job_id='broken')
+    assert os.listdir(BulkSaveJob.get_spool_path()) == []
@@ -0,0 +1,103 @@
+"""Test BulkSaveStream parsing of streamed bulk save bodies."""
+import io
+import orjson
+import pytest
+import pandas as pd
+
+pytest.importorskip("pumpwood_database_error")
+from pumpwood_communication.exceptions import PumpWoodWrongParameters
+from pumpwood_flaskviews.views.classes.data.stream import BulkSaveStream
+
+
+DATA = pd.DataFrame({
+    'attribute_id': [i % 3 for i in range(10)],
+    'value': [float(i) for i in range(10)]})
+
+
+def _concat(batches) -> tuple[list[int], pd.DataFrame]:
+    """Return the size of each batch and the concatenated data."""
+    batches = list(batches)
+    return [len(x) for x in batches], \
+        pd.concat(batches, ignore_index=True)
+
+
+def test_get_format():
+    """Mimetypes are mapped to streamed formats."""
+    assert BulkSaveStream.get_format('application/x-ndjson') == 'ndjson'
+    assert BulkSaveStream.get_format('text/csv') == 'csv'
+    assert BulkSaveStream.get_format('application/json') is None
+
+
+def test_iter_ndjson(monkeypatch):
+    """NDJSON lines split across reads are parsed in batches."""
+    monkeypatch.setattr(BulkSaveStream, 'READ_SIZE', 7)
+    body = DATA.to_json(orient='records', lines=True).encode()
+    sizes, results = _concat(BulkSaveStream.iter_batches(
+        stream=io.BytesIO(body), format='ndjson', batch_size=4))
+    assert sizes == [4, 4, 2]
+    pd.testing.assert_frame_equal(results, DATA)
+
+
+def test_iter_csv():
+    """CSV with header is parsed in batches."""
+    body = DATA.to_csv(index=False).encode()
+    sizes, results = _concat(BulkSaveStream.iter_batches(
+        stream=io.BytesIO(body), format='csv', batch_size=3))
+    assert sizes == [3, 3, 3, 1]
+    pd.testing.assert_frame_equal(results, DATA)
+
+
+@pytest.mark.parametrize('format', ['parquet', 'arrow'])
+def test_iter_pyarrow(format):
+    """Parquet and Arrow IPC streams are read in batches."""
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pa_parquet
+
+    table = pa.Table.from_pandas(DATA, preserve_index=False)
+    body = io.BytesIO()
+    if format == 'parquet':
+        pa_parquet.write_table(table, body)
+    else:
+        with pa_ipc.new_stream(body, table.schema) as writer:
+            writer.write_table(table)
+    body.seek(0)
+    sizes, results = _concat(BulkSaveStream.iter_batches(
+        stream=body, format=format, batch_size=4))
+    assert sizes == [4, 4, 2]
+    pd.testing.assert_frame_equal(results, DATA)
+
+
+def test_iter_batches_wrong_format():
+    """Formats not implemented raise PumpWoodWrongParameters."""
+    with pytest.raises(PumpWoodWrongParameters):
+        BulkSaveStream.iter_batches(
+            stream=io.BytesIO(b''), format='xml', batch_size=10)
+
+
+def test_iter_json(monkeypatch):
+    """JSON array elements split across reads are parsed in batches."""
+    monkeypatch.setattr(BulkSaveStream, 'READ_SIZE', 7)
+    data = DATA.assign(name=['ação {}'.format(i) for i in range(10)])
+    body = ' \n' + data.to_json(orient='records', force_ascii=False)
+    sizes, results = _concat(BulkSaveStream.iter_batches(
+        stream=io.BytesIO(body.encode()), format='json', batch_size=4))
+    assert sizes == [4, 4, 2]
+    pd.testing.assert_frame_equal(results, data)
+
+
+def test_iter_json_object():
+    """JSON object of columns is loaded whole and split in batches."""
+    body = orjson.dumps(DATA.to_dict(orient='list'))
+    sizes, results = _concat(BulkSaveStream.iter_batches(
+        stream=io.BytesIO(body), format='json', batch_size=4))
+    assert sizes == [4, 4, 2]
+    pd.testing.assert_frame_equal(results, DATA)
+
+
+def test_iter_json_not_closed():
+    """JSON array not closed raises PumpWoodWrongParameters."""
+    with pytest.raises(PumpWoodWrongParameters):
+        list(BulkSaveStream.iter_batches(
+            stream=io.BytesIO(b'[{"value": 1}, '), format='json',
+            batch_size=10))
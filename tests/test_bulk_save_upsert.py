@@ -0,0 +1,78 @@
+"""Test bulk save upsert of data views."""
+import pytest
+from sqlalchemy import Column, Integer, Float
+
+pytest.importorskip("pumpwood_database_error")
+from pumpwood_flaskviews.query import BaseQueryOwner
+from conftest import db, create_app, AUTH_HEADER, TEST_USER
+
+
+class OwnedValue(db.Model):
+    """Values that can only be accessed by their owner."""
+
+    __tablename__ = 'owned_value'
+    id = Column(Integer, primary_key=True)
+    owner_id = Column(Integer)
+    value = Column(Float)
+    base_query = BaseQueryOwner(owner_col='owner_id')
+
+
+@pytest.fixture
+def owned_value_app():
+    """App with an `OwnedValue` view, one row of the user and one not."""
+    from pumpwood_flaskviews.serializers import PumpWoodSerializer
+    from pumpwood_flaskviews.views import PumpWoodDataFlaskView
+
+    class OwnedValueSerializer(PumpWoodSerializer):
+        class Meta:
+            model = OwnedValue
+
+    class OwnedValueView(PumpWoodDataFlaskView):
+        db = db
+        model_class = OwnedValue
+        serializer = OwnedValueSerializer
+        model_variables = ['owner_id', 'value']
+        expected_cols_bulk_save = ['id', 'owner_id', 'value']
+
+        def get_available_microservices(self):
+            return []
+
+    app = create_app(OwnedValueView)
+    with app.app_context():
+        db.session.add_all([
+            OwnedValue(id=1, owner_id=TEST_USER['pk'], value=1.0),
+            OwnedValue(id=2, owner_id=TEST_USER['pk'] + 1, value=2.0)])
+        db.session.commit()
+    return app
+
+
+def _values(app) -> dict:
+    """Return values of `OwnedValue` rows by id."""
+    with app.app_context():
+        return {x.id: x.value for x in OwnedValue.query}
+
+
+def test_upsert_own_rows(owned_value_app):
+    """Rows of the user are updated and new rows are inserted."""
+    client = owned_value_app.test_client()
+    response = client.post(
+        '/rest/ownedvalue/bulk-save/?upsert=true', headers=AUTH_HEADER,
+        json=[
+            {'id': 1, 'owner_id': TEST_USER['pk'], 'value': 10.0},
+            {'id': 3, 'owner_id': TEST_USER['pk'], 'value': 30.0}])
+    assert response.status_code == 200
+    assert _values(owned_value_app) == {1: 10.0, 2: 2.0, 3: 30.0}
+
+
+def test_upsert_other_user_row(owned_value_app):
+    """Rows of other users are not updated and request is rejected."""
+    client = owned_value_app.test_client()
+    response = client.post(
+        '/rest/ownedvalue/bulk-save/?upsert=true', headers=AUTH_HEADER,
+        json=[
+            {'id': 1, 'owner_id': TEST_USER['pk'], 'value': 10.0},
+            {'id': 2, 'owner_id': TEST_USER['pk'], 'value': 20.0}])
+    assert response.status_code == 403
+    assert response.json['payload']['n_forbidden'] == 1
+    assert response.json['payload']['examples'] == [[2]]
+    assert _values(owned_value_app) == {1: 1.0, 2: 2.0}
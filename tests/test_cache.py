@@ -0,0 +1,141 @@
+"""Test PumpwoodFlaskGDiskCache and PumpwoodResultCache."""
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pumpwood_communication.cache import default_cache
+from pumpwood_flaskviews.cache import (
+    PumpwoodFlaskGDiskCache, PumpwoodResultCache)
+from conftest import AUTH_HEADER
+
+
+def _hash_dicts(n: int) -> list[dict]:
+    """Return unique hash dicts for the test."""
+    test_id = uuid.uuid4().hex
+    return [{'test': test_id, 'i': i} for i in range(n)]
+
+
+def test_set_many_disk(db_app):
+    """Values are stored on DiskCache and evicted by tag."""
+    hash_dicts = _hash_dicts(5)
+    tag_dict = {'test': hash_dicts[0]['test']}
+    with db_app.test_request_context():
+        assert PumpwoodFlaskGDiskCache.set_many(
+            hash_dicts=hash_dicts, values=list(range(5)), expire=60,
+            tag_dict=tag_dict)
+    assert [
+        default_cache.get(hash_dict=hash_dict)
+        for hash_dict in hash_dicts] == list(range(5))
+
+    default_cache.evict(tag_dict=tag_dict)
+    assert [
+        default_cache.get(hash_dict=hash_dict)
+        for hash_dict in hash_dicts] == [None] * 5
+
+
+def test_set_many_g_only(db_app):
+    """Values are not stored on DiskCache if `set_g_only`."""
+    hash_dicts = _hash_dicts(2)
+    with db_app.test_request_context():
+        PumpwoodFlaskGDiskCache.set_many(
+            hash_dicts=hash_dicts, values=[1, 2], set_g_only=True)
+        assert PumpwoodFlaskGDiskCache.get_many(
+            hash_dicts=hash_dicts) == [1, 2]
+    assert default_cache.get(hash_dict=hash_dicts[0]) is None
+
+
+def test_set_many_public_set(db_app, monkeypatch):
+    """Values are set on DiskCache using the public `default_cache.set`."""
+    calls = []
+
+    def cache_set(hash_dict, value, expire=None, tag_dict=None):
+        calls.append((hash_dict, value, expire, tag_dict))
+        return True
+
+    monkeypatch.setattr(default_cache, 'set', cache_set)
+    hash_dicts = _hash_dicts(2)
+    with db_app.test_request_context():
+        assert PumpwoodFlaskGDiskCache.set_many(
+            hash_dicts=hash_dicts, values=[1, 2], expire=60)
+    assert calls == [
+        (hash_dicts[0], 1, 60, None), (hash_dicts[1], 2, 60, None)]
+
+
+def test_result_not_stored_after_eviction():
+    """Results computed while model is evicted are not stored."""
+    hash_dict = PumpwoodResultCache.build_hash_dict(
+        model_class='TestModel{}'.format(uuid.uuid4().hex),
+        end_point='list', payload={}, access_scope={})
+
+    def write_while_computing():
+        PumpwoodResultCache.evict(model_class=hash_dict.model_class)
+        return 'stale'
+
+    assert PumpwoodResultCache.get_or_compute(
+        hash_dict=hash_dict, function=write_while_computing,
+        expire=60) == 'stale'
+    assert PumpwoodResultCache.get(hash_dict=hash_dict) is None
+
+    assert PumpwoodResultCache.get_or_compute(
+        hash_dict=hash_dict, function=lambda: 'fresh', expire=60) == 'fresh'
+    assert PumpwoodResultCache.get(hash_dict=hash_dict) == 'fresh'
+
+
+def test_concurrent_misses_coalesce():
+    """Concurrent misses of the same result are computed once."""
+    hash_dict = PumpwoodResultCache.build_hash_dict(
+        model_class='TestModel{}'.format(uuid.uuid4().hex),
+        end_point='aggregate', payload={}, access_scope={})
+    calls = []
+    barrier = threading.Barrier(8)
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return {'columns': ['n'], 'rows': [(len(calls), )]}
+
+    def request():
+        barrier.wait()
+        return PumpwoodResultCache.get_or_compute(
+            hash_dict=hash_dict, function=compute, expire=60)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: request(), range(8)))
+    assert len(calls) == 1
+    assert results == [{'columns': ['n'], 'rows': [(1, )]}] * 8
+
+
+def test_aggregate_rows_shared_by_formats(data_value_view, monkeypatch):
+    """Aggregate rows are cached once for all output formats."""
+    from conftest import create_app, add_data_values
+    monkeypatch.setattr(
+        data_value_view, 'result_cache_expire', {'aggregate': 60})
+    calls = []
+    aggregate_rows = data_value_view._aggregate_rows
+
+    def counted_aggregate_rows(self, **kwargs):
+        calls.append(1)
+        return aggregate_rows(self, **kwargs)
+
+    monkeypatch.setattr(
+        data_value_view, '_aggregate_rows', counted_aggregate_rows)
+    app = create_app(data_value_view)
+    add_data_values(app)
+    PumpwoodResultCache.evict(model_class='DataValue')
+
+    client = app.test_client()
+    payload = {
+        'group_by': ['attribute_id'],
+        'agg': {'n': {'field': 'id', 'function': 'count'}}}
+    results = {}
+    for format in ['list', 'records', 'dict']:
+        response = client.post(
+            '/rest/datavalue/aggregate/', headers=AUTH_HEADER,
+            json=dict(payload, format=format))
+        assert response.status_code == 200
+        results[format] = response.json
+    assert len(calls) == 1
+    assert results['records'] == [
+        {'attribute_id': attribute_id, 'n': n}
+        for attribute_id, n in zip(
+            results['list']['attribute_id'], results['list']['n'])]
@@ -0,0 +1,62 @@
+"""Test delete-many (POST delete) end-point of PumpWoodFlaskView."""
+from conftest import DataValue, AUTH_HEADER
+
+
+def _delete_many(app, query_string: str = '', **payload) -> int:
+    """Post delete many request and return the number of deleted rows."""
+    client = app.test_client()
+    response = client.post(
+        '/rest/datavalue/delete/' + query_string, headers=AUTH_HEADER,
+        json=payload)
+    assert response.status_code == 200
+    return response.json
+
+
+def _count(app, **filters) -> int:
+    """Count rows of data value table, including soft deleted rows."""
+    with app.app_context():
+        return DataValue.query.filter_by(**filters).count()
+
+
+def test_delete_many_soft_delete(data_value_app):
+    """Matching rows are marked as deleted and counted."""
+    assert _delete_many(
+        data_value_app, filter_dict={'attribute_id': 1}) == 20
+    assert _count(data_value_app, deleted=True, attribute_id=1) == 20
+    assert _count(data_value_app, deleted=False) == 20
+
+
+def test_delete_many_idempotent(data_value_app):
+    """Rows already deleted are not updated or counted again."""
+    filter_dict = {'modeling_unit_id': 0}
+    assert _delete_many(data_value_app, filter_dict=filter_dict) == 14
+    assert _delete_many(data_value_app, filter_dict=filter_dict) == 0
+
+    # Only rows not deleted are counted on overlapping filters
+    assert _delete_many(
+        data_value_app, filter_dict={'attribute_id': 1}) == 13
+    assert _count(data_value_app, deleted=True) == 27
+
+
+def test_delete_many_exclude(data_value_app):
+    """Rows matching exclude dict are not deleted."""
+    assert _delete_many(
+        data_value_app, filter_dict={'attribute_id': 1},
+        exclude_dict={'modeling_unit_id': 0}) == 13
+
+
+def test_delete_many_force_delete(data_value_app):
+    """`force_delete` removes rows, including soft deleted ones."""
+    assert _delete_many(
+        data_value_app, filter_dict={'modeling_unit_id': 0}) == 14
+    assert _delete_many(
+        data_value_app, query_string='?force_delete=true',
+        filter_dict={'attribute_id': 1}) == 20
+    assert _count(data_value_app) == 20
+    assert _count(data_value_app, attribute_id=1) == 0
+
+    # Force delete on payload
+    assert _delete_many(
+        data_value_app, filter_dict={'modeling_unit_id': 0},
+        force_delete=True) == 7
+    assert _count(data_value_app) == 13
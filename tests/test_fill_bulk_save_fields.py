@@ -0,0 +1,123 @@
+"""Test FillBulkSaveFields grouping and fetch of fields filled together."""
+import uuid
+from types import SimpleNamespace
+import pytest
+import pandas as pd
+from pumpwood_communication.type import (
+    BulkSaveLocalAutoFillField, BulkSaveMicroserviceAutoFillField,
+    BulkSaveDefaultField)
+
+pytest.importorskip("pumpwood_database_error")
+from pumpwood_flaskviews.views.classes.data.aux import FillBulkSaveFields
+
+
+def _group_fields(groups) -> list[list[str]]:
+    """Return the field names of each group."""
+    return [[field.field for field in group] for group in groups]
+
+
+def test_get_fill_groups_independent():
+    """Independent fields are filled on the same group."""
+    fields = [
+        'time', 'value',
+        BulkSaveLocalAutoFillField(
+            field='unit_id', fill_model_class='Attribute',
+            fill_col='unit_id', object_fk_column='attribute_id'),
+        BulkSaveMicroserviceAutoFillField(
+            field='geo_area_id', fill_model_class='ModelingUnit',
+            fill_col='geo_area_id', object_fk_column='modeling_unit_id'),
+        BulkSaveDefaultField(field='deleted', default=False)]
+    groups = FillBulkSaveFields.get_fill_groups(fields=fields)
+    assert _group_fields(groups) == [['unit_id', 'geo_area_id', 'deleted']]
+
+
+def test_get_fill_groups_dependent():
+    """Fields reading columns written by the group start a new one."""
+    fields = [
+        BulkSaveLocalAutoFillField(
+            field='attribute_id', fill_model_class='Series',
+            fill_col='attribute_id', object_fk_column='series_id'),
+        BulkSaveDefaultField(field='modeling_unit_id', default=1),
+        BulkSaveLocalAutoFillField(
+            field='unit_id', fill_model_class='Attribute',
+            fill_col='unit_id', object_fk_column='attribute_id'),
+        BulkSaveDefaultField(field='unit_id', default=2)]
+    groups = FillBulkSaveFields.get_fill_groups(fields=fields)
+    assert _group_fields(groups) == [
+        ['attribute_id', 'modeling_unit_id'], ['unit_id'], ['unit_id']]
+
+
+def test_get_fill_groups_empty():
+    """Column names only do not create groups."""
+    assert FillBulkSaveFields.get_fill_groups(fields=['time']) == []
+
+
+class FakeMicroservice:
+    """Microservice returning the requested ids with a `name` field."""
+
+    def __init__(self):
+        """Start without calls."""
+        self.calls = []
+
+    def get_n_parallel(self, n_parallel):
+        """Return default number of threads if not set."""
+        return n_parallel or 4
+
+    def list_without_pag(self, model_class, filter_dict, fields):
+        """Return one object for each id of the filter."""
+        self.calls.append(filter_dict['id__in'])
+        return [
+            {'id': pk, 'name': '{}-{}'.format(model_class, pk)}
+            for pk in filter_dict['id__in']]
+
+
+def test_fetch_microservice_chunks(capsys):
+    """Chunks are fetched keeping order and without writing to stdout."""
+    fields = [SimpleNamespace(fill_model_class='Attribute', fill_col='name')]
+    remote_fetches = [(0, [i, i + 1]) for i in range(0, 10, 2)]
+    results = FillBulkSaveFields._fetch_microservice(
+        fields=fields, remote_fetches=remote_fetches,
+        microservice=FakeMicroservice())
+    assert results == [
+        {i: 'Attribute-{}'.format(i), i + 1: 'Attribute-{}'.format(i + 1)}
+        for i in range(0, 10, 2)]
+    assert capsys.readouterr().out == ''
+
+
+def test_fill_group_float_keys_use_cache(db_app):
+    """Keys read as floats hit values cached under integer pks."""
+    model_class = 'ModelingUnit{}'.format(uuid.uuid4().hex)
+    field = BulkSaveMicroserviceAutoFillField(
+        field='name', fill_model_class=model_class,
+        fill_col='name', object_fk_column='modeling_unit_id')
+    microservice = FakeMicroservice()
+    data = pd.DataFrame({'modeling_unit_id': [1, 2, 2]})
+    with db_app.test_request_context():
+        FillBulkSaveFields.fill_group(
+            data=data, fields=[field], microservice=microservice)
+    assert microservice.calls == [[1, 2]]
+
+    data = pd.DataFrame({'modeling_unit_id': [1.0, 2.0]})
+    with db_app.test_request_context():
+        data = FillBulkSaveFields.fill_group(
+            data=data, fields=[field], microservice=microservice)
+    assert microservice.calls == [[1, 2]]
+    assert data['modeling_unit_id'].tolist() == [1, 2]
+    assert data['name'].tolist() == [
+        '{}-1'.format(model_class), '{}-2'.format(model_class)]
+
+
+def test_normalize_fk_column():
+    """Integral floats are cast to integers and nulls to None."""
+    field = BulkSaveMicroserviceAutoFillField(
+        field='name', fill_model_class='ModelingUnit',
+        fill_col='name', object_fk_column='modeling_unit_id')
+    data = FillBulkSaveFields._normalize_fk_column(
+        data=pd.DataFrame({'modeling_unit_id': [1.0, None, 3.0]}),
+        field=field)
+    assert data['modeling_unit_id'].tolist() == [1, None, 3]
+    assert type(data['modeling_unit_id'].iloc[0]) is int
+
+    data = FillBulkSaveFields._normalize_fk_column(
+        data=pd.DataFrame({'modeling_unit_id': [1.5, 2.0]}), field=field)
+    assert data['modeling_unit_id'].tolist() == [1.5, 2.0]
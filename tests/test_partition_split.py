@@ -0,0 +1,97 @@
+"""Test AuxPartitionSplit split of request filters."""
+import datetime
+import pytest
+
+pytest.importorskip("pumpwood_database_error")
+from pumpwood_flaskviews.views.classes.aux import AuxPartitionSplit
+
+
+class PartitionedModel:
+    """Model stub with table partitions."""
+
+    table_partition = ['time', 'attribute_id']
+
+
+def test_get_split_column():
+    """View column is used, else the first model partition."""
+    assert AuxPartitionSplit.get_split_column(
+        model_class=PartitionedModel) == 'time'
+    assert AuxPartitionSplit.get_split_column(
+        model_class=PartitionedModel, split_column='attribute_id') == \
+        'attribute_id'
+    assert AuxPartitionSplit.get_split_column(model_class=object) is None
+
+
+def test_split_in_list():
+    """Sorted unique values are divided in contiguous groups."""
+    results = AuxPartitionSplit.split_filter_dict(
+        filter_dict={'attribute_id__in': [5, 1, 3, 2, 4, 1], 'value': 1},
+        order_by=[], column='attribute_id', n_splits=2)
+    assert results == [
+        {'attribute_id__in': [1, 2], 'value': 1},
+        {'attribute_id__in': [3, 4, 5], 'value': 1}]
+
+
+def test_split_numeric_range():
+    """Closed ranges are divided in disjoint sub-ranges."""
+    results = AuxPartitionSplit.split_filter_dict(
+        filter_dict={'attribute_id__gt': 0, 'attribute_id__lte': 9},
+        order_by=['-attribute_id'], column='attribute_id', n_splits=3)
+    assert results == [
+        {'attribute_id__gte': 6, 'attribute_id__lte': 9},
+        {'attribute_id__gte': 3, 'attribute_id__lt': 6},
+        {'attribute_id__gt': 0, 'attribute_id__lt': 3}]
+
+
+def test_split_date_range():
+    """Date only ranges are split on date boundaries."""
+    results = AuxPartitionSplit.split_filter_dict(
+        filter_dict={
+            'time__gte': datetime.date(2024, 1, 1),
+            'time__lt': '2024-01-05'},
+        order_by=['time'], column='time', n_splits=2)
+    assert results == [
+        {'time__gte': datetime.date(2024, 1, 1), 'time__lt': '2024-01-03'},
+        {'time__gte': '2024-01-03', 'time__lt': '2024-01-05'}]
+
+
+@pytest.mark.parametrize('filter_dict, order_by', [
+    ({'time__gte': '2024-01-01'}, []),
+    ({'time__in': ['2024-01-01', '2024-01-02']}, ['value']),
+    ({}, [])])
+def test_split_not_possible(filter_dict, order_by):
+    """Open ranges or other order by columns are not split."""
+    assert AuxPartitionSplit.split_filter_dict(
+        filter_dict=filter_dict, order_by=order_by, column='time',
+        n_splits=2) is None
+
+
+def test_split_in_list_mixed_types():
+    """Values that can not be sorted are not split."""
+    assert AuxPartitionSplit.split_filter_dict(
+        filter_dict={'attribute_id__in': [1, 'a', None]}, order_by=[],
+        column='attribute_id', n_splits=2) is None
+
+
+def test_get_g_attributes(db_app):
+    """Only authentication and database attributes are copied."""
+    from flask import g
+    with db_app.test_request_context():
+        g.user = {'pk': 1}
+        g.pumpwood_statement_timeout = 1000
+        g.model_object = object()
+        assert AuxPartitionSplit.get_g_attributes() == {
+            'user': {'pk': 1}, 'pumpwood_statement_timeout': 1000}
+
+
+@pytest.mark.parametrize('pool_size, max_overflow, expected', [
+    (2, 0, 1), (5, 10, 4), (1, 0, 1), (2, -1, 4)])
+def test_get_pool_max_workers(pool_size, max_overflow, expected):
+    """Threads are limited to pool connections minus the request one."""
+    from sqlalchemy import create_engine
+    from sqlalchemy.pool import QueuePool
+    engine = create_engine(
+        'sqlite://', poolclass=QueuePool, pool_size=pool_size,
+        max_overflow=max_overflow)
+    assert AuxPartitionSplit.get_pool_max_workers(
+        engine=engine, max_workers=4) == expected
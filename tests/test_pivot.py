@@ -0,0 +1,235 @@
+"""Test pivot end-point on database and using pandas."""
+import datetime
+import orjson
+import pytest
+
+pytest.importorskip("pumpwood_database_error")
+from pumpwood_communication.exceptions import PumpWoodWrongParameters
+from conftest import db, DataValue, AUTH_HEADER
+from pumpwood_flaskviews.views.classes.data.pivot import SqlPivotManager
+
+
+def _pivot(app, **payload):
+    """Post pivot request and return the JSON response."""
+    client = app.test_client()
+    response = client.post(
+        '/rest/datavalue/pivot/', headers=AUTH_HEADER, json=payload)
+    assert response.status_code == 200
+    return response.json
+
+
+def _long_subquery():
+    """Return long data subquery with time index and attribute columns."""
+    return DataValue.query.with_entities(
+        DataValue.time, DataValue.attribute_id, DataValue.value).subquery()
+
+
+@pytest.mark.parametrize('format', ['dict', 'list', 'records', 'split'])
+def test_sql_pivot_matches_pandas(data_value_app, data_value_view,
+                                  monkeypatch, format):
+    """Database pivot returns the same payload of pandas pivot."""
+    calls = []
+    run = SqlPivotManager.run
+
+    def counted_run(*args, **kwargs):
+        calls.append(1)
+        return run(*args, **kwargs)
+
+    monkeypatch.setattr(SqlPivotManager, 'run', counted_run)
+    payload = {
+        'columns': ['attribute_id'], 'format': format,
+        'filter_dict': {'modeling_unit_id__in': [0, 1]}}
+    sql_results = _pivot(data_value_app, **payload)
+    assert len(calls) == 1
+
+    monkeypatch.setattr(data_value_view, 'pivot_sql_max_columns', 0)
+    pandas_results = _pivot(data_value_app, **payload)
+    assert len(calls) == 1
+    assert sql_results == pandas_results
+    assert '2024-01-01T00:00:00' in str(sql_results)
+    assert '+00:00' not in str(sql_results)
+
+
+def test_sql_pivot_fallback(data_value_app, data_value_view, monkeypatch):
+    """Pivot with more columns than the maximum falls back to pandas."""
+    payload = {'columns': ['attribute_id'], 'format': 'list'}
+    expected = _pivot(data_value_app, **payload)
+
+    monkeypatch.setattr(data_value_view, 'pivot_sql_max_columns', 1)
+    assert _pivot(data_value_app, **payload) == expected
+
+
+def test_run(db_app):
+    """Columns are named as pandas and rows ordered by index."""
+    with db_app.app_context():
+        result_columns, rows = SqlPivotManager.run(
+            session=db.session, subquery=_long_subquery(), index=['time'],
+            columns=['attribute_id'], max_columns=2)
+    assert result_columns == ['time', 1, 2]
+    assert len(rows) == 40
+    assert [row[0] for row in rows] == sorted(row[0] for row in rows)
+    assert rows[0][1:] == (0.0, None)
+    assert rows[1][1:] == (None, 1.0)
+
+
+def test_run_max_columns(db_app):
+    """None is returned if there are more values than `max_columns`."""
+    with db_app.app_context():
+        assert SqlPivotManager.run(
+            session=db.session, subquery=_long_subquery(), index=['time'],
+            columns=['attribute_id'], max_columns=1) is None
+
+
+def _pivot_pages(app, page_size: int) -> list[dict]:
+    """Request pivot pages following `next_cursor` until the last one."""
+    pages = []
+    cursor = None
+    while True:
+        page = _pivot(
+            app, columns=['attribute_id'], format='records',
+            page_size=page_size, cursor=cursor)
+        pages.append(page)
+        cursor = page['next_cursor']
+        if cursor is None:
+            return pages
+
+
+def test_pivot_page_cursor_round_trip(data_value_app):
+    """Pages following JSON cursors return every wide row once."""
+    pages = _pivot_pages(data_value_app, page_size=7)
+    assert [len(page['data']) for page in pages] == [7, 7, 7, 7, 7, 5]
+    assert pages[0]['next_cursor'] == ['2024-01-01T03:00:00', 0]
+    assert pages[-1]['next_cursor'] is None
+
+    paged_rows = [row for page in pages for row in page['data']]
+    expected = _pivot(
+        data_value_app, columns=['attribute_id'], format='records')
+    assert paged_rows == expected
+
+
+def test_pivot_page_groups_not_split(data_value_app):
+    """Wide rows of an index group are never split across pages."""
+    with data_value_app.app_context():
+        db.session.add_all([
+            DataValue(
+                id=100 + i, attribute_id=2, modeling_unit_id=0,
+                time=datetime.datetime(2024, 1, 1, 0, 0),
+                value=float(i), deleted=False)
+            for i in range(10)])
+        db.session.commit()
+
+    pages = _pivot_pages(data_value_app, page_size=1)
+    index_keys = [
+        (row['time'], row['modeling_unit_id'])
+        for page in pages for row in page['data']]
+    assert len(index_keys) == len(set(index_keys)) == 40
+    first_row = pages[0]['data'][0]
+    assert first_row['1'] == 0.0
+    assert first_row['2'] == 4.5
+
+
+def test_convert_cursor():
+    """Cursor datetimes are parsed as naive values of naive columns."""
+    index_columns = [DataValue.time, DataValue.modeling_unit_id]
+    assert SqlPivotManager.convert_cursor(
+        index_columns=index_columns,
+        cursor=['2024-01-01T03:00:00+00:00', 0]) == [
+            datetime.datetime(2024, 1, 1, 3), 0]
+    assert SqlPivotManager.convert_cursor(
+        index_columns=index_columns,
+        cursor=['2024-01-01T03:00:00', 0]) == [
+            datetime.datetime(2024, 1, 1, 3), 0]
+
+
+@pytest.mark.parametrize('cursor', [
+    ['2024-01-01T03:00:00'], ['2024-01-01T03:00:00', 0, 1], 'cursor'])
+def test_convert_cursor_wrong_length(cursor):
+    """Cursors not matching index columns raise PumpWoodWrongParameters."""
+    with pytest.raises(PumpWoodWrongParameters):
+        SqlPivotManager.convert_cursor(
+            index_columns=[DataValue.time, DataValue.modeling_unit_id],
+            cursor=cursor)
+
+
+def test_pivot_page_wrong_cursor(data_value_app):
+    """Wrong cursor is returned as a wrong parameters error."""
+    client = data_value_app.test_client()
+    response = client.post(
+        '/rest/datavalue/pivot/', headers=AUTH_HEADER, json={
+            'columns': ['attribute_id'], 'page_size': 5,
+            'cursor': ['2024-01-01T03:00:00']})
+    assert response.status_code == 400
+    assert response.json['type'] == 'PumpWoodWrongParameters'
+
+
+def _pivot_streaming(app, **payload) -> list[dict]:
+    """Post pivot streaming request and return the NDJSON lines."""
+    client = app.test_client()
+    response = client.post(
+        '/rest/datavalue/pivot-streaming/', headers=AUTH_HEADER,
+        json=payload)
+    assert response.status_code == 200
+    return [orjson.loads(line) for line in response.data.splitlines()]
+
+
+def _add_index_group(app, time: datetime.datetime, n_rows: int):
+    """Add rows of one index group with attribute 2 values 0..n_rows."""
+    with app.app_context():
+        db.session.add_all([
+            DataValue(
+                id=100 + i, attribute_id=2, modeling_unit_id=0, time=time,
+                value=float(i), deleted=False)
+            for i in range(n_rows)])
+        db.session.commit()
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 100])
+def test_pivot_streaming_matches_pivot(data_value_app, chunk_size):
+    """Streamed wide rows are the pivot records without empty cells."""
+    rows = _pivot_streaming(
+        data_value_app, columns=['attribute_id'], chunk_size=chunk_size)
+    expected = _pivot(
+        data_value_app, columns=['attribute_id'], format='records')
+    assert rows == [
+        {key: value for key, value in row.items() if value is not None}
+        for row in expected]
+
+
+def test_pivot_streaming_group_across_chunks(data_value_app):
+    """Index groups larger than chunk size are pivoted as one row."""
+    _add_index_group(
+        data_value_app, time=datetime.datetime(2024, 1, 1), n_rows=10)
+    rows = _pivot_streaming(
+        data_value_app, columns=['attribute_id'], chunk_size=3)
+    index_keys = [(row['time'], row['modeling_unit_id']) for row in rows]
+    assert len(index_keys) == len(set(index_keys)) == 40
+    assert rows[0] == {
+        'time': '2024-01-01T00:00:00', 'modeling_unit_id': 0,
+        '1': 0.0, '2': 4.5}
+
+
+def test_pivot_streaming_error_record(data_value_app, data_value_view,
+                                      monkeypatch):
+    """Errors after rows were streamed are written as a last line."""
+    monkeypatch.setattr(data_value_view, 'pivot_stream_max_group_rows', 5)
+    _add_index_group(
+        data_value_app, time=datetime.datetime(2024, 1, 1, 19, 30),
+        n_rows=10)
+    rows = _pivot_streaming(
+        data_value_app, columns=['attribute_id'], chunk_size=3)
+    assert len(rows) == 40
+    assert rows[-2]['time'] == '2024-01-01T19:00:00'
+    error = rows[-1]['__error__']
+    assert error['type'] == 'PumpWoodException'
+    assert error['payload'] == {
+        'index_values': ['2024-01-01T19:30:00', 0], 'max_group_rows': 5}
+
+
+def test_pivot_streaming_multiple_columns(data_value_app):
+    """Keys of multiple pivot columns are joined by "__"."""
+    rows = _pivot_streaming(
+        data_value_app, columns=['attribute_id', 'modeling_unit_id'],
+        chunk_size=7)
+    assert len(rows) == 40
+    assert rows[0] == {'time': '2024-01-01T00:00:00', '1__0': 0.0}
+    assert rows[1] == {'time': '2024-01-01T00:30:00', '2__1': 1.0}
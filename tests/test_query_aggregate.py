@@ -0,0 +1,128 @@
+"""Test SqlalchemyQueryMisc aggregation of related model fields."""
+import pytest
+from sqlalchemy.dialects import postgresql
+from pumpwood_communication.exceptions import (
+    PumpWoodQueryException, PumpWoodNotImplementedError)
+from pumpwood_flaskviews.query import SqlalchemyQueryMisc
+from conftest import db, Attribute, DataValue
+
+
+def test_aggregate_to_one_path(db_app):
+    """Many-to-one paths are joined without repeating rows."""
+    with db_app.app_context():
+        rows = SqlalchemyQueryMisc.aggregate(
+            session=db.session, object_model=DataValue,
+            query=DataValue.query, group_by=['attribute__description'],
+            agg={
+                'total': {'field': 'value', 'function': 'sum'},
+                'n': {'field': 'id', 'function': 'count'}},
+            order_by=['attribute__description']).all()
+    assert [tuple(row) for row in rows] == [
+        ('a', float(sum(range(0, 40, 2))), 20),
+        ('b', float(sum(range(1, 40, 2))), 20)]
+
+
+@pytest.mark.parametrize('group_by, agg', [
+    (['data_values__modeling_unit_id'],
+     {'n': {'field': 'id', 'function': 'count'}}),
+    (['description'],
+     {'total': {'field': 'data_values__value', 'function': 'sum'}})])
+def test_aggregate_to_many_path(db_app, group_by, agg):
+    """Paths crossing to-many relationships are rejected."""
+    with db_app.app_context():
+        with pytest.raises(PumpWoodQueryException) as error:
+            SqlalchemyQueryMisc.aggregate(
+                session=db.session, object_model=Attribute,
+                query=Attribute.query, group_by=group_by, agg=agg,
+                order_by=[])
+    assert error.value.payload['relationship'] == 'data_values'
+
+
+def _compile_aggregate(app, group_by: list, agg: dict) -> str:
+    """Return aggregation query compiled for Postgres on a single line."""
+    with app.app_context():
+        query = SqlalchemyQueryMisc.aggregate(
+            session=db.session, object_model=DataValue,
+            query=DataValue.query, group_by=group_by, agg=agg)
+        statement = query.statement.compile(
+            dialect=postgresql.dialect(),
+            compile_kwargs={'literal_binds': True})
+    return ' '.join(str(statement).split())
+
+
+@pytest.mark.parametrize('item, expected', [
+    ({'field': 'value', 'function': 'median'},
+     'percentile_cont(0.5) WITHIN GROUP (ORDER BY anon_1.value) AS x'),
+    ({'field': 'value', 'function': 'percentile_cont', 'percentile': 0.9},
+     'percentile_cont(0.9) WITHIN GROUP (ORDER BY anon_1.value) AS x'),
+    ({'field': 'modeling_unit_id', 'function': 'count_distinct'},
+     'count(DISTINCT anon_1.modeling_unit_id) AS x'),
+    ({'field': 'value', 'function': 'first', 'order_by': 'time'},
+     '(array_agg(anon_1.value ORDER BY anon_1.time))[1] AS x'),
+    ({'field': 'value', 'function': 'last'},
+     '(array_agg(anon_1.value ORDER BY anon_1.id DESC))[1] AS x')])
+def test_aggregate_function_sql(db_app, item, expected):
+    """Aggregation functions are compiled as Postgres expressions."""
+    sql = _compile_aggregate(
+        db_app, group_by=['attribute_id'], agg={'x': item})
+    assert sql.startswith('SELECT anon_1.attribute_id, ' + expected + ' ')
+    assert sql.endswith('GROUP BY anon_1.attribute_id')
+
+
+@pytest.mark.parametrize('g_col, expected', [
+    ({'field': 'time', 'trunc': 'hour'},
+     "date_trunc('hour', anon_1.time)"),
+    ({'field': 'time', 'bucket': '15 minutes'},
+     "time_bucket(INTERVAL '15 minutes', anon_1.time)")])
+def test_aggregate_group_by_sql(db_app, g_col, expected):
+    """Truncated group by uses the same expression on select and group."""
+    sql = _compile_aggregate(
+        db_app, group_by=[dict(g_col, label='period')],
+        agg={'n': {'field': 'id', 'function': 'count'}})
+    assert sql.startswith('SELECT {} AS period, '.format(expected))
+    assert sql.endswith('GROUP BY {}'.format(expected))
+
+
+@pytest.mark.parametrize('percentile', [-0.1, 1.5, '0.5', True, None])
+def test_aggregate_percentile_not_valid(db_app, percentile):
+    """Percentile must be a number between 0 and 1."""
+    with pytest.raises(PumpWoodQueryException) as error:
+        _compile_aggregate(db_app, group_by=[], agg={'p': {
+            'field': 'value', 'function': 'percentile_cont',
+            'percentile': percentile}})
+    assert error.value.payload == {'key': 'p', 'percentile': percentile}
+
+
+@pytest.mark.parametrize('g_col, payload_key', [
+    ({'field': 'time', 'trunc': 'hours'}, 'trunc'),
+    ({'field': 'time', 'trunc': "hour', time) --"}, 'trunc'),
+    ({'field': 'time', 'bucket': '15 minutes; DROP TABLE data_value'},
+     'bucket'),
+    ({'field': 'time', 'bucket': 'fifteen minutes'}, 'bucket'),
+    ({'field': 'time', 'bucket': 15}, 'bucket'),
+    ({'field': 'time'}, 'group_by'),
+    ({'field': 'time', 'trunc': 'hour', 'bucket': '1 hour'}, 'group_by')])
+def test_aggregate_group_by_not_valid(db_app, g_col, payload_key):
+    """Trunc units and bucket intervals are validated, not interpolated."""
+    with pytest.raises(PumpWoodQueryException) as error:
+        _compile_aggregate(
+            db_app, group_by=[g_col],
+            agg={'n': {'field': 'id', 'function': 'count'}})
+    assert payload_key in error.value.payload
+
+
+@pytest.mark.parametrize('item', [
+    {'field': 'value'}, {'field': 1, 'function': 'sum'},
+    {'field': 'not_a_field', 'function': 'sum'},
+    {'field': 'value', 'function': 'first', 'order_by': 'not_a_field'}])
+def test_aggregate_function_not_valid(db_app, item):
+    """Aggregation definitions with wrong fields are rejected."""
+    with pytest.raises(PumpWoodQueryException):
+        _compile_aggregate(db_app, group_by=[], agg={'x': item})
+
+
+def test_aggregate_function_not_implemented(db_app):
+    """Unknown functions raise PumpWoodNotImplementedError."""
+    with pytest.raises(PumpWoodNotImplementedError):
+        _compile_aggregate(db_app, group_by=[], agg={
+            'x': {'field': 'value', 'function': 'mode'}})
@@ -0,0 +1,139 @@
+"""Test routing of read-only end-points to read replica database."""
+import time
+import uuid
+import pytest
+from flask import Flask, g
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import Column, Integer, Float
+
+pytest.importorskip("pumpwood_database_error")
+from pumpwood_flaskviews.model import FlaskPumpWoodBaseModel
+from pumpwood_flaskviews.sqlalchemy import (
+    PumpwoodRoutingSession, ReadReplicaRouter)
+from conftest import TEST_USER
+
+
+routing_db = SQLAlchemy(
+    model_class=FlaskPumpWoodBaseModel,
+    session_options={"class_": PumpwoodRoutingSession})
+"""Database with a `replica` bind, sessions route read-only requests."""
+
+
+class ReplicaValue(routing_db.Model):
+    """Model stored on primary and replica databases."""
+
+    __tablename__ = 'replica_value'
+    id = Column(Integer, primary_key=True)
+    value = Column(Float)
+
+
+@pytest.fixture
+def replica_app() -> Flask:
+    """App with a view routing reads to the `replica` bind.
+
+    Primary and replica are different in-memory databases, primary has
+    value 1.0 and replica value 2.0, so responses show the database used.
+    """
+    from pumpwood_flaskviews.auth import AuthFactory
+    from pumpwood_flaskviews.json import PumpWoodFlaskJSONProvider
+    from pumpwood_flaskviews.serializers import PumpWoodSerializer
+    from pumpwood_flaskviews.views import (
+        PumpWoodFlaskView, register_pumpwood_view)
+
+    class ReplicaValueSerializer(PumpWoodSerializer):
+        class Meta:
+            model = ReplicaValue
+            fields = ['pk', 'model_class', 'value']
+            list_fields = ['pk', 'model_class', 'value']
+
+    class ReplicaValueView(PumpWoodFlaskView):
+        db = routing_db
+        model_class = ReplicaValue
+        serializer = ReplicaValueSerializer
+        read_replica_bind = 'replica'
+
+        def get_available_microservices(self):
+            return []
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['SQLALCHEMY_BINDS'] = {'replica': 'sqlite://'}
+    routing_db.init_app(app)
+    AuthFactory.set_as_dummy()
+    app.json = PumpWoodFlaskJSONProvider(app)
+    register_pumpwood_view(app, ReplicaValueView)
+
+    @app.before_request
+    def set_test_user():
+        g.user = dict(TEST_USER)
+
+    with app.app_context():
+        for bind_key, value in [(None, 1.0), ('replica', 2.0)]:
+            engine = routing_db.engines[bind_key]
+            routing_db.metadata.create_all(engine)
+            with engine.begin() as connection:
+                connection.execute(
+                    ReplicaValue.__table__.insert().values(id=1, value=value))
+    return app
+
+
+def _auth_header() -> dict:
+    """Return a new token, so host cache sticky windows are not shared."""
+    return {'Authorization': 'Token {}'.format(uuid.uuid4().hex)}
+
+
+def _list_values(client, headers: dict) -> list[float]:
+    """Return values of list end-point."""
+    response = client.post(
+        '/rest/replicavalue/list/', headers=headers, json={})
+    assert response.status_code == 200
+    return [x['value'] for x in response.json]
+
+
+def test_read_only_end_point_on_replica(replica_app):
+    """Read-only end-points use the replica bind."""
+    client = replica_app.test_client()
+    assert _list_values(client, headers=_auth_header()) == [2.0]
+    response = client.get(
+        '/rest/replicavalue/retrieve/1/', headers=_auth_header())
+    assert response.json['value'] == 2.0
+
+
+def test_write_sets_sticky_window(replica_app):
+    """Writes return the sticky window on header and cookie."""
+    client = replica_app.test_client()
+    auth_header = _auth_header()
+    start = time.time()
+    response = client.post(
+        '/rest/replicavalue/save/', headers=auth_header,
+        json={'model_class': 'ReplicaValue', 'value': 3.0})
+    assert response.status_code == 200
+
+    sticky_until = float(
+        response.headers[ReadReplicaRouter.STICKY_HEADER])
+    assert start < sticky_until <= time.time() + 5
+    cookie = client.get_cookie(ReadReplicaRouter.STICKY_COOKIE)
+    assert float(cookie.value) == sticky_until
+    assert cookie.http_only
+
+    # Token and cookie keep the client on primary, where it wrote
+    assert _list_values(client, headers=auth_header) == [1.0, 3.0]
+
+    # Host cache keeps the token on primary without the cookie
+    other_client = replica_app.test_client()
+    assert _list_values(other_client, headers=auth_header) == [1.0, 3.0]
+    assert _list_values(other_client, headers=_auth_header()) == [2.0]
+
+
+def test_sticky_header_on_primary(replica_app):
+    """Requests carrying the sticky header stay on primary."""
+    client = replica_app.test_client()
+    sticky_until = "{:.3f}".format(time.time() + 2)
+    headers = dict(
+        _auth_header(), **{ReadReplicaRouter.STICKY_HEADER: sticky_until})
+    assert _list_values(client, headers=headers) == [1.0]
+
+    # Expired windows and windows beyond the sticky expire are ignored
+    for sticky_until in [time.time() - 1, time.time() + 3600]:
+        headers[ReadReplicaRouter.STICKY_HEADER] = str(sticky_until)
+        assert _list_values(client, headers=headers) == [2.0]
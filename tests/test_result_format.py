@@ -0,0 +1,88 @@
+"""Test AuxResultFormat against pandas `to_dict` outputs."""
+import datetime
+import pytest
+import pandas as pd
+
+pytest.importorskip("pumpwood_database_error")
+from pumpwood_communication.exceptions import PumpWoodWrongParameters
+from pumpwood_communication.serializers import pumpJsonDump
+from pumpwood_flaskviews.views.classes.aux import AuxResultFormat
+
+
+COLUMNS = ['attribute_id', 'time', 'value', 'description']
+ROWS = [
+    (i % 3, datetime.datetime(2024, 1, 1, i), float(i), 'value {}'.format(i))
+    for i in range(7)]
+
+
+@pytest.mark.parametrize('format', AuxResultFormat.FORMATS)
+def test_to_dict_matches_pandas(format):
+    """Output has the same shape and values of pandas `to_dict`."""
+    expected = pd.DataFrame(ROWS, columns=COLUMNS).to_dict(format)
+    results = AuxResultFormat.to_dict(
+        columns=COLUMNS, rows=ROWS, format=format)
+    assert results == expected
+
+
+@pytest.mark.parametrize('format', AuxResultFormat.FORMATS)
+def test_to_dict_json_matches_pandas(format):
+    """Serialized output is the same of pandas, naive without offset."""
+    utc = datetime.timezone.utc
+    rows = ROWS + [(1, None, None, None)]
+    aware_rows = [
+        (row[0], datetime.datetime(2024, 1, 1, i, tzinfo=utc))
+        for i, row in enumerate(ROWS)]
+    for columns, test_rows in [
+            (COLUMNS, rows), (['attribute_id', 'time'], aware_rows)]:
+        expected = pd.DataFrame(test_rows, columns=columns).to_dict(format)
+        results = AuxResultFormat.to_dict(
+            columns=columns, rows=test_rows, format=format)
+        assert pumpJsonDump(results) == pumpJsonDump(expected)
+    assert b'"2024-01-01T00:00:00"' in pumpJsonDump(
+        AuxResultFormat.to_dict(columns=COLUMNS, rows=ROWS, format=format))
+
+
+@pytest.mark.parametrize('format', AuxResultFormat.FORMATS)
+def test_to_dict_empty_matches_pandas(format):
+    """Empty results do not have columns, as pandas built from []."""
+    expected = pd.DataFrame([]).to_dict(format)
+    results = AuxResultFormat.to_dict(
+        columns=COLUMNS, rows=[], format=format)
+    assert results == expected
+
+
+def test_validate_format():
+    """Formats not implemented raise PumpWoodWrongParameters."""
+    assert AuxResultFormat.validate_format(format='records') == 'records'
+    with pytest.raises(PumpWoodWrongParameters):
+        AuxResultFormat.validate_format(format='series')
+
+
+@pytest.mark.parametrize('format', AuxResultFormat.FORMATS)
+def test_aggregate_matches_pandas(data_value_app, format):
+    """Aggregate end-point returns the pandas shape for every format."""
+    from conftest import db, DataValue, AUTH_HEADER
+    from pumpwood_flaskviews.query import SqlalchemyQueryMisc
+
+    group_by = ['time', 'attribute_id']
+    agg = {
+        'total': {'field': 'value', 'function': 'sum'},
+        'n': {'field': 'id', 'function': 'count'}}
+    order_by = ['time', 'attribute_id', '-total']
+    client = data_value_app.test_client()
+    response = client.post(
+        '/rest/datavalue/aggregate/', headers=AUTH_HEADER, json={
+            'group_by': group_by, 'agg': agg, 'order_by': order_by,
+            'format': format})
+    assert response.status_code == 200
+
+    # Output of the previous implementation using pandas
+    with data_value_app.app_context():
+        rows = SqlalchemyQueryMisc.aggregate(
+            session=db.session, object_model=DataValue,
+            query=DataValue.query, group_by=group_by, agg=agg,
+            order_by=order_by).all()
+        expected = pd.DataFrame(rows).to_dict(format)
+        expected = data_value_app.json.loads(
+            data_value_app.json.dumps(expected))
+    assert response.json == expected
@@ -0,0 +1,261 @@
+"""Test rollup tables maintained by data views."""
+import datetime
+from types import SimpleNamespace
+import pytest
+import pandas as pd
+from sqlalchemy import Column, Integer, Float, DateTime, UniqueConstraint
+from sqlalchemy.dialects import postgresql
+
+pytest.importorskip("pumpwood_database_error")
+from pumpwood_communication.exceptions import PumpWoodOtherException
+from pumpwood_flaskviews.query import BaseQueryRowPermission
+from pumpwood_flaskviews.views.classes.data import AggregateRollup
+from pumpwood_flaskviews.views.classes.data.rollup import (
+    AggregateRollupManager)
+from conftest import db, DataValue, AUTH_HEADER
+
+
+class DataValueRollup(db.Model):
+    """Sum and count of values by attribute and modeling unit."""
+
+    __tablename__ = 'data_value_rollup'
+    id = Column(Integer, primary_key=True)
+    attribute_id = Column(Integer)
+    modeling_unit_id = Column(Integer)
+    value_sum = Column(Float)
+    value_count = Column(Integer)
+    __table_args__ = (
+        UniqueConstraint('attribute_id', 'modeling_unit_id'), )
+
+
+class PermissionValue(db.Model):
+    """Values filtered by row permission."""
+
+    __tablename__ = 'permission_value'
+    id = Column(Integer, primary_key=True)
+    row_permission_id = Column(Integer)
+    attribute_id = Column(Integer)
+    value = Column(Float)
+    base_query = BaseQueryRowPermission(
+        row_permission_col='row_permission_id')
+
+
+class PermissionValueRollup(db.Model):
+    """Sum of values by row permission and attribute."""
+
+    __tablename__ = 'permission_value_rollup'
+    id = Column(Integer, primary_key=True)
+    row_permission_id = Column(Integer)
+    attribute_id = Column(Integer)
+    value_sum = Column(Float)
+    base_query = BaseQueryRowPermission(
+        row_permission_col='row_permission_id')
+
+
+class MonthlyDataValue(db.Model):
+    """Sum of values by attribute and month."""
+
+    __tablename__ = 'monthly_data_value'
+    id = Column(Integer, primary_key=True)
+    attribute_id = Column(Integer)
+    time = Column(DateTime)
+    value_sum = Column(Float)
+
+
+ROLLUP = AggregateRollup(
+    model_class=DataValueRollup,
+    group_by=['attribute_id', 'modeling_unit_id'],
+    agg={
+        'value_sum': {'field': 'value', 'function': 'sum'},
+        'value_count': {'field': 'value', 'function': 'count'}})
+MONTHLY_ROLLUP = AggregateRollup(
+    model_class=MonthlyDataValue,
+    group_by=['attribute_id', {'field': 'time', 'trunc': 'month'}],
+    agg={'value_sum': {'field': 'value', 'function': 'sum'}})
+
+
+@pytest.fixture
+def rollup_app(data_value_view, data_value_app):
+    """Data value app with `ROLLUP` filled from source table."""
+    data_value_view.aggregate_rollups = [ROLLUP]
+    with data_value_app.app_context():
+        AggregateRollupManager.refresh_groups(
+            session=db.session, rollup=ROLLUP, source_model=DataValue,
+            keys=[(a, m) for a in (1, 2) for m in (0, 1, 2)])
+        db.session.commit()
+    return data_value_app
+
+
+def assert_rollup_consistent(app):
+    """Check rollup rows against aggregation of source table."""
+    with app.app_context():
+        expected = AggregateRollupManager.keys_from_query(
+            rollup=ROLLUP, source_model=DataValue,
+            query=DataValue.query.filter(DataValue.deleted.is_(False)))
+        expected = {
+            key: (
+                sum(x.value for x in DataValue.query.filter_by(
+                    attribute_id=key[0], modeling_unit_id=key[1],
+                    deleted=False)),
+                DataValue.query.filter_by(
+                    attribute_id=key[0], modeling_unit_id=key[1],
+                    deleted=False).count())
+            for key in expected}
+        rollup = {
+            (x.attribute_id, x.modeling_unit_id): (
+                x.value_sum, x.value_count)
+            for x in DataValueRollup.query}
+    assert rollup == expected
+
+
+def test_bulk_save(rollup_app):
+    """Bulk saved rows are added to the rollup."""
+    client = rollup_app.test_client()
+    response = client.post(
+        '/rest/datavalue/bulk-save/', headers=AUTH_HEADER, json=[
+            {'time': '2024-02-01T00:00:00', 'attribute_id': 1,
+             'modeling_unit_id': i % 4, 'value': 1.0}
+            for i in range(5)])
+    assert response.status_code == 200
+    assert_rollup_consistent(rollup_app)
+
+
+def test_save_moving_group(rollup_app):
+    """Groups of the object before and after save are refreshed."""
+    client = rollup_app.test_client()
+    response = client.post(
+        '/rest/datavalue/save/', headers=AUTH_HEADER, json={
+            'model_class': 'DataValue', 'pk': 5, 'attribute_id': 2,
+            'modeling_unit_id': 1, 'value': 1000.0,
+            'time': '2024-01-01T00:00:00'})
+    assert response.status_code == 200
+    assert_rollup_consistent(rollup_app)
+
+
+def test_save_many(rollup_app):
+    """Groups of objects before and after save-many are refreshed."""
+    client = rollup_app.test_client()
+    response = client.post(
+        '/rest/datavalue/save-many/', headers=AUTH_HEADER, json=[
+            {'pk': 5, 'attribute_id': 2, 'modeling_unit_id': 1,
+             'value': 1000.0},
+            {'pk': 6, 'modeling_unit_id': 0, 'value': 10.0},
+            {'attribute_id': 1, 'modeling_unit_id': 3, 'value': 1.0,
+             'time': '2024-03-01T00:00:00'}])
+    assert response.status_code == 200
+    assert_rollup_consistent(rollup_app)
+
+
+def test_delete(rollup_app):
+    """Deleted objects are removed from the rollup."""
+    client = rollup_app.test_client()
+    response = client.delete(
+        '/rest/datavalue/delete/1/', headers=AUTH_HEADER)
+    assert response.status_code == 200
+    response = client.post(
+        '/rest/datavalue/delete/', headers=AUTH_HEADER, json={
+            'filter_dict': {'attribute_id': 2, 'modeling_unit_id': 0}})
+    assert response.status_code == 200
+    assert_rollup_consistent(rollup_app)
+
+
+def test_refresh_error_rollbacks_save(rollup_app, monkeypatch):
+    """Source rows are not committed if rollup refresh fails."""
+    def refresh_groups(*args, **kwargs):
+        raise RuntimeError("rollup refresh failed")
+
+    monkeypatch.setattr(
+        AggregateRollupManager, 'refresh_groups', refresh_groups)
+    client = rollup_app.test_client()
+    response = client.post(
+        '/rest/datavalue/save/', headers=AUTH_HEADER, json={
+            'model_class': 'DataValue', 'pk': 5, 'attribute_id': 2,
+            'modeling_unit_id': 1, 'value': 1000.0,
+            'time': '2024-01-01T00:00:00'})
+    assert response.status_code != 200
+    monkeypatch.undo()
+
+    with rollup_app.app_context():
+        assert db.session.get(DataValue, 5).value == 4.0
+    assert_rollup_consistent(rollup_app)
+
+
+class PostgresSession:
+    """Session collecting statements compiled for Postgres."""
+
+    def __init__(self):
+        """Start without statements."""
+        self.statements = []
+
+    def execute(self, statement):
+        """Compile statement for Postgres instead of executing it."""
+        self.statements.append(
+            str(statement.compile(dialect=postgresql.dialect())))
+
+    def get_bind(self):
+        """Return a bind with the Postgres dialect."""
+        return SimpleNamespace(dialect=postgresql.dialect())
+
+
+def test_postgres_truncation_in_sql(db_app):
+    """Bulk save delta and refresh use the same `date_trunc` rule."""
+    session = PostgresSession()
+    data = pd.DataFrame({
+        'attribute_id': [1, 1, 2],
+        'time': [
+            datetime.datetime(2024, 1, 5), datetime.datetime(2024, 1, 20),
+            datetime.datetime(2024, 2, 3)],
+        'value': [1.0, 2.0, 3.0]})
+    with db_app.app_context():
+        AggregateRollupManager.bulk_save_delta(
+            session=session, rollup=MONTHLY_ROLLUP,
+            source_model=DataValue, data=data)
+        AggregateRollupManager.refresh_groups(
+            session=session, rollup=MONTHLY_ROLLUP,
+            source_model=DataValue,
+            keys=[(1, datetime.datetime(2024, 1, 1))])
+
+    delta, _, refresh = session.statements
+    assert "date_trunc('month', pumpwood_rollup_delta.time)" in delta
+    assert "ON CONFLICT (attribute_id, time) DO UPDATE" in delta
+    assert (
+        "CASE WHEN (monthly_data_value.value_sum IS NULL AND "
+        "excluded.value_sum IS NULL) THEN NULL") in delta
+    assert "date_trunc('month', data_value.time)" in refresh
+
+
+def test_bulk_save_keys_truncation(db_app):
+    """Keys of bulk saved rows are computed by the database."""
+    rollup = AggregateRollup(
+        model_class=DataValueRollup, group_by=['attribute_id'],
+        agg={'value_sum': {'field': 'value', 'function': 'sum'}})
+    data = pd.DataFrame({'attribute_id': [1, 1, 2, 3]})
+    with db_app.app_context():
+        keys = AggregateRollupManager._bulk_save_keys(
+            session=db.session, rollup=rollup, source_model=DataValue,
+            data=data)
+    assert sorted(keys) == [(1, ), (2, )]
+
+
+@pytest.mark.parametrize('group_by, is_valid', [
+    (['attribute_id'], False),
+    (['row_permission_id', 'attribute_id'], True)])
+def test_rollup_scope_column(group_by, is_valid):
+    """Rollups of scoped models must group by the scope column."""
+    rollup = AggregateRollup(
+        model_class=PermissionValueRollup, group_by=group_by,
+        agg={'value_sum': {'field': 'value', 'function': 'sum'}})
+    match = AggregateRollupManager.match(
+        rollups=[rollup], source_model=PermissionValue,
+        group_by=['attribute_id'],
+        agg={'value': {'field': 'value', 'function': 'sum'}},
+        filter_dict={}, exclude_dict={}, show_deleted=False)
+    if is_valid:
+        AggregateRollupManager.validate(
+            rollup=rollup, source_model=PermissionValue)
+        assert match is not None
+    else:
+        with pytest.raises(PumpWoodOtherException):
+            AggregateRollupManager.validate(
+                rollup=rollup, source_model=PermissionValue)
+        assert match is None
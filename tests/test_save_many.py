@@ -0,0 +1,42 @@
+"""Test save-many end-point of PumpWoodFlaskView."""
+from conftest import AUTH_HEADER
+
+
+class FakeMicroservice:
+    """Microservice collecting the executed actions."""
+
+    def __init__(self):
+        """Start without actions."""
+        self.actions = []
+
+    def login(self):
+        """Do nothing, there is no authentication on tests."""
+
+    def execute_action(self, model_class, action, parameters):
+        """Collect action instead of calling ETL microservice."""
+        self.actions.append(parameters)
+
+
+def test_save_many_etl_without_pk_field(data_value_view, data_value_app,
+                                        monkeypatch):
+    """ETL trigger receives pks even if `fields` does not return them."""
+    microservice = FakeMicroservice()
+    monkeypatch.setattr(data_value_view, 'microservice', microservice)
+    monkeypatch.setattr(data_value_view, 'broadcast', True)
+    monkeypatch.setattr(
+        data_value_view, 'get_available_microservices',
+        lambda self: ['pumpwood-etl-app'])
+
+    client = data_value_app.test_client()
+    response = client.post(
+        '/rest/datavalue/save-many/?fields=["value"]',
+        headers=AUTH_HEADER, json=[
+            {'pk': 5, 'value': 1000.0},
+            {'attribute_id': 1, 'modeling_unit_id': 3, 'value': 1.0,
+             'time': '2024-03-01T00:00:00'}])
+    assert response.status_code == 200
+    assert 'pk' not in response.json[0]
+
+    extra_info = microservice.actions[0]['extra_info']
+    assert extra_info['updated'] == [5]
+    assert len(extra_info['created']) == 1
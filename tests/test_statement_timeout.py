@@ -0,0 +1,96 @@
+"""Test StatementTimeout resolution, transactions and error handler."""
+import pytest
+import sqlalchemy
+from flask import g
+from sqlalchemy.sql import text
+from pumpwood_communication.exceptions import PumpWoodWrongParameters
+from pumpwood_flaskviews.sqlalchemy import StatementTimeout
+from conftest import db, AUTH_HEADER
+
+
+HEADER = StatementTimeout.REQUEST_HEADER
+
+
+@pytest.mark.parametrize('view_timeout, header, expected', [
+    (5000, None, 5000), (5000, '1000', 1000), (1000, '5000', 1000),
+    (None, '1000', 1000), (0, '1000', 1000), (None, None, None),
+    (0, None, None)])
+def test_resolve(db_app, view_timeout, header, expected):
+    """Header can only lower the timeout set on the view."""
+    headers = {} if header is None else {HEADER: header}
+    with db_app.test_request_context(headers=headers):
+        assert StatementTimeout.resolve(view_timeout=view_timeout) == \
+            expected
+
+
+@pytest.mark.parametrize('header', ['0', '-10', 'abc'])
+def test_resolve_wrong_header(db_app, header):
+    """Header must be a positive integer."""
+    with db_app.test_request_context(headers={HEADER: header}):
+        with pytest.raises(PumpWoodWrongParameters):
+            StatementTimeout.resolve(view_timeout=5000)
+
+
+def test_view_timeout(db_app, data_value_view, monkeypatch):
+    """End-point timeout of view is lowered by the header."""
+    monkeypatch.setattr(
+        data_value_view, 'statement_timeout', {'aggregate': 5000})
+    view = data_value_view()
+    with db_app.test_request_context(headers={HEADER: '1000'}):
+        assert view.get_statement_timeout(end_point='aggregate') == 1000
+        assert view.get_statement_timeout(end_point='list') == 1000
+    with db_app.test_request_context(headers={HEADER: '9000'}):
+        assert view.get_statement_timeout(end_point='aggregate') == 5000
+
+
+def test_apply_not_postgres(db_app):
+    """Timeout is not applied on databases other than Postgres."""
+    with db_app.test_request_context():
+        assert not StatementTimeout.apply(session=db.session, timeout=1000)
+        assert StatementTimeout.get_applied_timeout() is None
+
+
+def test_apply_each_transaction(db_app, monkeypatch):
+    """Timeout is set again on transactions begun after a commit."""
+    calls = []
+    with db_app.test_request_context():
+        connection = db.session.connection().connection.driver_connection
+        connection.create_function(
+            'set_config', 3, lambda *args: calls.append(args))
+        monkeypatch.setattr(db.engine.dialect, 'name', 'postgresql')
+
+        assert StatementTimeout.apply(session=db.session, timeout=1000)
+        db.session.commit()
+        db.session.execute(text("SELECT 1"))
+        db.session.commit()
+        db.session.execute(text("SELECT 1"))
+    assert calls == [('statement_timeout', '1000ms', 1)] * 3
+
+    # Transactions of requests without timeout are not changed
+    with db_app.test_request_context():
+        db.session.execute(text("SELECT 1"))
+    assert len(calls) == 3
+
+
+class QueryCanceledError(Exception):
+    """Error raised by psycopg2 when statement timeout is reached."""
+
+    pgcode = StatementTimeout.QUERY_CANCELED_PGCODE
+
+
+def test_timeout_error_handler(data_value_view):
+    """Canceled statements are returned with 408 status code."""
+    from conftest import create_app
+    app = create_app(data_value_view)
+
+    @app.route('/timeout/')
+    def timeout():
+        setattr(g, StatementTimeout.G_ATTRIBUTE, 1000)
+        raise sqlalchemy.exc.OperationalError(
+            "SELECT 1", {}, QueryCanceledError("canceling statement"))
+
+    response = app.test_client().get('/timeout/', headers=AUTH_HEADER)
+    assert response.status_code == 408
+    assert response.json['type'] == 'PumpWoodQueryException'
+    assert response.json['payload'] == {
+        'statement_timeout': 1000, 'error': 'canceling statement'}
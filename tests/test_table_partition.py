@@ -0,0 +1,103 @@
+"""Test checks of table partition columns on list and get queries."""
+import pytest
+from loguru import logger
+from sqlalchemy import Column, Integer, Float
+from pumpwood_communication.exceptions import PumpWoodQueryException
+from pumpwood_communication.serializers import CompositePkBase64Converter
+from pumpwood_flaskviews.model import general
+from conftest import db, DataValue
+
+
+class PartitionedValue(db.Model):
+    """Model partitioned by `attribute_id` with a composite primary key."""
+
+    __tablename__ = 'partitioned_value'
+    id = Column(Integer, primary_key=True)
+    attribute_id = Column(Integer, primary_key=True)
+    value = Column(Float)
+    table_partition = ['attribute_id']
+
+
+@pytest.fixture
+def log_records(monkeypatch) -> list[tuple[str, str]]:
+    """Capture (level, message) of logs, partition warnings are reset."""
+    monkeypatch.setattr(general, '_partition_warned_models', set())
+    records = []
+    handler_id = logger.add(
+        lambda message: records.append(
+            (message.record['level'].name, message.record['message'])),
+        level='DEBUG')
+    yield records
+    logger.remove(handler_id)
+
+
+@pytest.fixture
+def partitioned_app(db_app):
+    """App with `PartitionedValue` objects on attributes 1 and 2."""
+    with db_app.app_context():
+        db.session.add_all([
+            PartitionedValue(id=1, attribute_id=1, value=1.0),
+            PartitionedValue(id=2, attribute_id=2, value=2.0)])
+        db.session.commit()
+    return db_app
+
+
+def test_not_partitioned(log_records):
+    """Models without table partition are not checked."""
+    assert DataValue.check_table_partition_filter(filter_dict={})
+    assert log_records == []
+
+
+def test_warning_logged_once(log_records):
+    """Missing partition filter is warned once per model, then debug."""
+    for _ in range(3):
+        assert not PartitionedValue.check_table_partition_filter(
+            filter_dict={'value__gt': 0})
+    assert [level for level, _ in log_records] == [
+        'WARNING', 'DEBUG', 'DEBUG']
+    assert 'PartitionedValue' in log_records[0][1]
+    assert 'attribute_id' in log_records[0][1]
+
+    # Filters on the partition column are not logged
+    assert PartitionedValue.check_table_partition_filter(
+        filter_dict={'attribute_id__in': [1, 2]})
+    assert len(log_records) == 3
+
+
+def test_partition_required(partitioned_app, log_records, monkeypatch):
+    """Lists without partition filter are rejected if required."""
+    with pytest.raises(PumpWoodQueryException) as error:
+        PartitionedValue.check_table_partition_filter(
+            filter_dict={'value': 1.0}, raise_error=True)
+    assert error.value.payload['partition_column'] == 'attribute_id'
+    assert error.value.payload['filter_dict'] == ['value']
+
+    monkeypatch.setattr(PartitionedValue, 'table_partition_required', True)
+    with partitioned_app.test_request_context():
+        with pytest.raises(PumpWoodQueryException):
+            PartitionedValue.default_query_list(filter_dict={})
+        results = PartitionedValue.default_query_list(
+            filter_dict={'attribute_id': 2}).all()
+    assert [x.value for x in results] == [2.0]
+    assert log_records == []
+
+
+def test_composite_pk_opened(partitioned_app, log_records):
+    """Partition values carried on composite pks are used as filters."""
+    pk = CompositePkBase64Converter.dump(
+        {'id': 2, 'attribute_id': 2}, primary_keys=['id', 'attribute_id'])
+    assert PartitionedValue.check_table_partition_filter(
+        filter_dict={'pk': pk}, raise_error=True)
+
+    with partitioned_app.test_request_context():
+        obj = PartitionedValue.default_query_get(pk=pk, use_cache=False)
+        assert obj.value == 2.0
+        results = PartitionedValue.default_query_list(
+            filter_dict={'pk__in': [pk]}).all()
+        assert [x.value for x in results] == [2.0]
+
+        # Gets without partition values are logged as debug
+        obj = PartitionedValue.default_query_get(
+            pk={'id': 1}, use_cache=False)
+        assert obj.value == 1.0
+    assert log_records == [('DEBUG', log_records[0][1])]